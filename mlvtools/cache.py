@@ -0,0 +1,220 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from functools import lru_cache
+from os import makedirs
+from os.path import join, abspath, expanduser, realpath
+from typing import Optional, Tuple, Callable, List
+
+from mlvtools.conf.conf import MlVToolConf
+from mlvtools.helper import RACY_DELAY
+
+CACHE_DIR_NAME = '.mlvtools_cache'
+CACHE_DB_NAME = 'mlvtools.db'
+
+
+@lru_cache(maxsize=None)
+def get_mlvtools_version() -> str:
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        import pkg_resources
+        try:
+            return pkg_resources.get_distribution('mlvtools').version
+        except pkg_resources.DistributionNotFound:
+            return 'unknown'
+    try:
+        return metadata.version('mlvtools')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def get_signature(path: str) -> Tuple[int, int, int]:
+    """
+        Return the (inode, size, mtime) stat signature of a file
+    """
+    path_stat = os.stat(path)
+    return path_stat.st_ino, path_stat.st_size, path_stat.st_mtime_ns
+
+
+def get_user_cache_dir() -> str:
+    return join(os.environ.get('XDG_CACHE_HOME') or join(expanduser('~'), '.cache'), 'mlvtools')
+
+
+def get_default_cache_dir(working_directory: str) -> str:
+    """
+        Return the cache directory of a working directory, in the user cache directory: checks do not
+        write in the working directory
+    """
+    return join(get_user_cache_dir(), hash_content(realpath(working_directory).encode())[:16])
+
+
+def hash_content(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_notebook(content: bytes) -> str:
+    """
+        Hash notebook normalised sources: cell types and code sources only, outputs, metadata and
+        markdown contents do not change the generated script syntax tree
+    """
+    notebook = json.loads(content.decode())
+    if 'cells' not in notebook:
+        # Old notebook format, fallback on raw content
+        return hash_content(content)
+    cells = notebook['cells']
+    normalised = [(cell.get('cell_type'),
+                   ''.join(cell.get('source', '')) if cell.get('cell_type') == 'code' else '')
+                  for cell in cells]
+    return hash_content(json.dumps(normalised).encode())
+
+
+def hash_conf(conf: MlVToolConf) -> str:
+    """
+        Hash configuration parts involved in notebook conversion
+    """
+    return hash_content(json.dumps({'ignore_keys': conf.ignore_keys}).encode())
+
+
+def hash_dvc_conf(conf: MlVToolConf, docstring_conf: dict = None) -> str:
+    """
+        Hash configuration parts involved in DVC command generation
+    """
+    return hash_content(json.dumps({'conf': conf.dict(), 'docstring_conf': docstring_conf},
+                                   sort_keys=True, default=str).encode())
+
+
+class MlVToolCache:
+    """
+        Persistent cache stored in a SQLite database.
+        File content hashes are indexed by path and validated using stat metadata
+        (inode, size, mtime) to avoid reading unchanged files.
+        The cache can be shared between processes, the connection is opened lazily in each one.
+    """
+    TABLES = ('CREATE TABLE IF NOT EXISTS file_hash (path TEXT, kind TEXT, inode INTEGER, size INTEGER, '
+              'mtime_ns INTEGER, hash TEXT, PRIMARY KEY (path, kind))',
+              'CREATE TABLE IF NOT EXISTS consistency (key TEXT PRIMARY KEY, equals INTEGER)')
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = abspath(cache_dir)
+        self.version = get_mlvtools_version()
+        self._connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return state
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            makedirs(self.cache_dir, exist_ok=True)
+            self._connection = sqlite3.connect(join(self.cache_dir, CACHE_DB_NAME), timeout=30)
+            for table in self.TABLES:
+                self._connection.execute(table)
+        return self._connection
+
+    def get_file_hash(self, path: str, kind: str = 'raw') -> str:
+        """
+            Return a file content hash. Kind 'notebook' hashes notebook normalised sources.
+            Hashes are reused while the file stat is unchanged.
+        """
+        path = abspath(path)
+        signature = get_signature(path)
+        file_hash = self.lookup_file_hash(path, kind, signature)
+        if file_hash:
+            return file_hash
+
+        with open(path, 'rb') as fd:
+            content = fd.read()
+        file_hash = hash_notebook(content) if kind == 'notebook' else hash_content(content)
+        self.store_file_hash(path, kind, signature, file_hash)
+        return file_hash
+
+    def lookup_file_hash(self, path: str, kind: str, signature: Tuple[int, int, int]) -> Optional[str]:
+        """
+            Return the hash of a file absolute path if its stat signature is unchanged, None otherwise
+        """
+        try:
+            row = self.connection.execute('SELECT inode, size, mtime_ns, hash FROM file_hash '
+                                          'WHERE path = ? AND kind = ?', (path, kind)).fetchone()
+            if row and tuple(row[:3]) == signature:
+                return row[3]
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f'Cannot read cache in {self.cache_dir}: {e}')
+        return None
+
+    def store_file_hash(self, path: str, kind: str, signature: Tuple[int, int, int], file_hash: str):
+        # A file modified in the same timestamp granularity could change without stat change
+        if signature[2] < (time.time() - RACY_DELAY) * 1e9:
+            self.execute('INSERT OR REPLACE INTO file_hash VALUES (?, ?, ?, ?, ?, ?)',
+                         (path, kind, *signature, file_hash))
+
+    def execute(self, query: str, parameters: tuple):
+        try:
+            with self.connection:
+                self.connection.execute(query, parameters)
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f'Cannot write cache in {self.cache_dir}: {e}')
+
+    def get_consistency_key(self, notebook_path: str, script_path: str, conf: MlVToolConf) -> Optional[str]:
+        """
+            Return the consistency verdict key of a notebook and script pair, None if a file can not be read
+        """
+        try:
+            key_parts = (self.get_file_hash(notebook_path, 'notebook'), self.get_file_hash(script_path),
+                         hash_conf(conf), self.version, os.path.basename(notebook_path))
+        except (IOError, ValueError) as e:
+            logging.debug(f'Cannot compute consistency cache key: {e}')
+            return None
+        return hash_content(':'.join(key_parts).encode())
+
+    def get_dvc_consistency_key(self, script_path: str, dvc_cmd_path: str, conf: MlVToolConf,
+                                docstring_conf: dict = None) -> Optional[str]:
+        """
+            Return the consistency verdict key of a script and DVC command pair, None if a file can not be read
+        """
+        try:
+            key_parts = ('dvc', self.get_file_hash(script_path), self.get_file_hash(dvc_cmd_path),
+                         hash_dvc_conf(conf, docstring_conf), self.version,
+                         os.path.relpath(abspath(script_path), conf.top_directory))
+        except (IOError, ValueError) as e:
+            logging.debug(f'Cannot compute DVC consistency cache key: {e}')
+            return None
+        return hash_content(':'.join(key_parts).encode())
+
+    def get_consistency(self, key: str) -> Optional[bool]:
+        try:
+            row = self.connection.execute('SELECT equals FROM consistency WHERE key = ?', (key,)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f'Cannot read cache in {self.cache_dir}: {e}')
+            return None
+        return bool(row[0]) if row else None
+
+    def set_consistency(self, key: str, equals: bool):
+        self.execute('INSERT OR REPLACE INTO consistency VALUES (?, ?)', (key, int(equals)))
+
+
+def count_cache_misses(cache: MlVToolCache, checks: List[tuple], get_key: Callable[[tuple], Optional[str]]) -> int:
+    """
+        Count checks without cached verdict, get_key returns the verdict key of a check or None
+        if it can not be computed
+    """
+    misses = 0
+    for check in checks:
+        cache_key = get_key(check)
+        if not cache_key or cache.get_consistency(cache_key) is None:
+            misses += 1
+    return misses
+
+
+def get_checks_jobs(jobs: int, cache: Optional[MlVToolCache], checks: List[tuple],
+                    get_key: Callable[[tuple], Optional[str]]) -> int:
+    """
+        Return the number of processes to run checks: a process pool is not worth starting
+        when at most one verdict is not cached
+    """
+    return jobs if not cache or count_cache_misses(cache, checks, get_key) > 1 else 1
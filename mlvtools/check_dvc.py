@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import re
+import sys
+from collections import namedtuple
+from os.path import join, basename, exists
+from typing import Optional, Tuple
+
+from mlvtools.cache import MlVToolCache, get_checks_jobs
+from mlvtools.cmd import CommandHelper, ArgumentBuilder
+from mlvtools.conf.conf import MlVToolConf, get_dvc_cmd_output_path, load_docstring_conf
+from mlvtools.docstring_helpers.extract import extract_docstring_from_file
+from mlvtools.discovery import discover_files, PathFilter
+from mlvtools.exception import MlVToolException
+from mlvtools.gen_dvc import get_dvc_command
+from mlvtools.parallel import parallel_map
+
+#: The working directory is an absolute path which depends on the machine, it is not compared
+WORKING_DIRECTORY_LINE = re.compile(r'^pushd ".*"$')
+
+DvcCommandDifference = namedtuple('DvcCommandDifference', ('line', 'expected', 'actual'))
+
+
+def normalize_line(line: str) -> str:
+    line = line.rstrip()
+    return 'pushd "<working directory>"' if WORKING_DIRECTORY_LINE.match(line) else line
+
+
+def get_first_line_difference(expected: str, actual: str) -> Optional[DvcCommandDifference]:
+    """
+        Return the first line difference between the expected and the actual DVC commands, None if they are equal.
+        Trailing whitespaces and the working directory path are ignored.
+    """
+    expected_lines = [normalize_line(line) for line in expected.rstrip().split('\n')]
+    actual_lines = [normalize_line(line) for line in actual.rstrip().split('\n')]
+    for index, (expected_line, actual_line) in enumerate(zip(expected_lines, actual_lines)):
+        if expected_line != actual_line:
+            return DvcCommandDifference(index + 1, expected_line, actual_line)
+    if len(expected_lines) != len(actual_lines):
+        index = min(len(expected_lines), len(actual_lines))
+        return DvcCommandDifference(index + 1, expected_lines[index] if index < len(expected_lines) else None,
+                                    actual_lines[index] if index < len(actual_lines) else None)
+    return None
+
+
+def compare_dvc_command(script_path: str, dvc_cmd_path: str, conf: MlVToolConf, docstring_conf: dict = None) -> bool:
+    """
+        Compare the DVC command with the one generated in memory from the script docstring, as gen_dvc would do.
+        The first difference is logged.
+    """
+    docstring_info = extract_docstring_from_file(script_path, docstring_conf)
+    expected = get_dvc_command(docstring_info, script_path, conf, dvc_cmd_path)
+    try:
+        with open(dvc_cmd_path, 'r') as fd:
+            actual = fd.read()
+    except IOError as e:
+        raise MlVToolException(f'Cannot read DVC command {dvc_cmd_path}') from e
+
+    difference = get_first_line_difference(expected, actual)
+    if difference:
+        logging.warning(f'First difference at line {difference.line} of {dvc_cmd_path}: '
+                        f'expected "{difference.expected}", found "{difference.actual}"')
+    return difference is None
+
+
+def run_dvc_consistency_check(script_path: str, dvc_cmd_path: str, conf: MlVToolConf, docstring_conf: dict = None,
+                              cache: MlVToolCache = None) -> bool:
+    """
+        Call comparison on script and DVC command then display the result.
+        If a cache is provided, the verdict is reused while script, DVC command and conf are unchanged.
+    """
+    logging.info(f'Run DVC consistency check on ({script_path}, {dvc_cmd_path})')
+
+    if not exists(dvc_cmd_path):
+        logging.error(f'DVC command path {dvc_cmd_path} does not exists.')
+        return False
+
+    cache_key = cache.get_dvc_consistency_key(script_path, dvc_cmd_path, conf, docstring_conf) if cache else None
+    equals = cache.get_consistency(cache_key) if cache_key else None
+    if equals is None:
+        equals = compare_dvc_command(script_path, dvc_cmd_path, conf, docstring_conf)
+        if cache_key:
+            cache.set_consistency(cache_key, equals)
+    else:
+        logging.debug(f'DVC consistency verdict found in cache for ({script_path}, {dvc_cmd_path})')
+
+    if equals:
+        logging.log(logging.WARNING + 1, f'DVC command is up to date for {basename(script_path)} '
+                                         f'and {basename(dvc_cmd_path)}')
+    else:
+        logging.error(f'Difference found between {script_path} and {dvc_cmd_path}. '
+                      f'Ensure DVC command generation is up to date (gen_dvc)')
+    return equals
+
+
+def run_dvc_consistency_check_task(check: Tuple[str, str, MlVToolConf, dict, MlVToolCache]) -> bool:
+    """
+        Run a DVC consistency check on a (script, dvc command, conf, docstring conf, cache) tuple,
+        used as process pool worker
+    """
+    return run_dvc_consistency_check(*check)
+
+
+def get_dvc_check_cache_key(check: Tuple[str, str, MlVToolConf, dict, MlVToolCache]) -> Optional[str]:
+    script, dvc_cmd, conf, docstring_conf, cache = check
+    return cache.get_dvc_consistency_key(script, dvc_cmd, conf, docstring_conf) if exists(dvc_cmd) else None
+
+
+class DvcCheckCommand(CommandHelper):
+
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Checks a DVC command is up to date with its python script docstring') \
+            .add_work_dir_argument() \
+            .add_conf_path_argument() \
+            .add_docstring_conf() \
+            .add_path_argument('-i', '--input-script', type=str, required=True, help='The python script to check') \
+            .add_path_argument('-d', '--dvc-cmd', type=str,
+                               help='The DVC command to check. Defaults to the conf DVC command path.') \
+            .add_cache_arguments() \
+            .parse(args)
+
+        self.set_log_level(args)
+        conf = self.get_conf(args.working_directory, args.input_script, args.conf_path)
+        if not conf.path and not args.dvc_cmd:
+            raise MlVToolException('Parameter --dvc-cmd is mandatory if no conf provided')
+        docstring_conf_path = args.docstring_conf or conf.docstring_conf
+        docstring_conf = load_docstring_conf(docstring_conf_path) if docstring_conf_path else None
+        dvc_cmd_path = args.dvc_cmd or get_dvc_cmd_output_path(args.input_script, conf)
+
+        equals = run_dvc_consistency_check(args.input_script, dvc_cmd_path, conf, docstring_conf,
+                                           self.get_cache(args))
+        sys.exit(0 if equals else 1)
+
+
+class DvcCheckAllCommands(CommandHelper):
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Checks all DVC commands are up to date with their python scripts.\n'
+                                           'Run the up to date checks on all scripts from the script directory. '
+                                           'DVC command names are deduce from the conf.') \
+            .add_work_dir_argument() \
+            .add_conf_path_argument() \
+            .add_docstring_conf() \
+            .add_path_argument('-s', '--scripts-dir', type=str,
+                               help='Python scripts directory. Defaults to the conf python script directory.') \
+            .add_discovery_arguments('script') \
+            .add_jobs_argument() \
+            .add_cache_arguments() \
+            .parse(args)
+
+        self.set_log_level(args)
+        conf = self.get_conf(args.working_directory, args.scripts_dir, args.conf_path)
+        if not conf.path:
+            raise MlVToolException('Configuration file is mandatory')
+        docstring_conf_path = args.docstring_conf or conf.docstring_conf
+        docstring_conf = load_docstring_conf(docstring_conf_path) if docstring_conf_path else None
+        cache = self.get_cache(args)
+
+        scripts_dir = args.scripts_dir or join(conf.top_directory, conf.path.python_script_root_dir)
+        scripts = discover_files(scripts_dir, '.py', PathFilter(args.include, args.ignore), args.recursive)
+        checks = [(script, get_dvc_cmd_output_path(script, conf), conf, docstring_conf, cache) for script in scripts]
+
+        jobs = get_checks_jobs(args.jobs, cache, checks, get_dvc_check_cache_key)
+        results = parallel_map(run_dvc_consistency_check_task, checks, jobs)
+        sys.exit(0 if all(results) else 1)
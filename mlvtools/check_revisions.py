@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import sys
+from collections import namedtuple, OrderedDict
+from os.path import basename, relpath, realpath
+from typing import List, Tuple, Dict, Set
+
+from mlvtools.check_script import compare_content
+from mlvtools.cmd import CommandHelper, ArgumentBuilder
+from mlvtools.conf.conf import MlVToolConf, get_script_output_path
+from mlvtools.discovery import PathFilter
+from mlvtools.exception import MlVToolException
+from mlvtools.ipynb_to_python import get_exporter
+from mlvtools.mlv_git.git_objects import get_git_top_directory, get_revisions, get_tree_entries, GitObjectReader, \
+    TreeEntry, get_index_entries, get_staged_paths
+from mlvtools.parallel import parallel_map
+
+#: A notebook and script pair for a given revision, paths are relative to the git top directory
+RevisionPair = namedtuple('RevisionPair', ('notebook_path', 'notebook_sha', 'script_path', 'script_sha'))
+PairVerdict = namedtuple('PairVerdict', ('equals', 'error'))
+#: Name of the git index in reports
+STAGED = 'staged'
+
+
+def get_revision_pairs(revision: str, git_top_dir: str, notebooks_rel_dir: str, conf: MlVToolConf,
+                       path_filter: PathFilter, recursive: bool = False) -> List[RevisionPair]:
+    """
+        Return notebook and script pairs of a revision. Notebooks are looked up in the
+        notebooks directory, associated scripts are deduced from the conf.
+    """
+    return get_pairs(get_tree_entries(revision, git_top_dir), git_top_dir, notebooks_rel_dir, conf, path_filter,
+                     recursive)
+
+
+def get_pairs(entries: Dict[str, TreeEntry], git_top_dir: str, notebooks_rel_dir: str, conf: MlVToolConf,
+              path_filter: PathFilter, recursive: bool = False) -> List[RevisionPair]:
+    """
+        Return notebook and script pairs from tree or index entries.
+        Notebooks are selected as discover_files would do in the notebooks directory.
+    """
+    prefix = '' if notebooks_rel_dir == '.' else f'{notebooks_rel_dir}/'
+    pairs = []
+    for path, entry in sorted(entries.items()):
+        if not path.startswith(prefix) or not path.endswith('.ipynb'):
+            continue
+        notebook_rel_path = path[len(prefix):]
+        if not recursive and '/' in notebook_rel_path:
+            continue
+        if not path_filter.is_selected(notebook_rel_path):
+            logging.debug(f'Ignore notebook {path}')
+            continue
+        script_path = relpath(realpath(get_script_output_path(path, conf)), realpath(git_top_dir))
+        script_entry = entries.get(script_path)
+        pairs.append(RevisionPair(path, entry.sha, script_path, script_entry.sha if script_entry else None))
+    return pairs
+
+
+def get_conflicting_scripts(pairs: List[RevisionPair]) -> Set[str]:
+    """
+        Return script paths shared by several notebooks, notebooks of different directories with the same name
+    """
+    scripts = [pair.script_path for pair in pairs]
+    return {script for script in scripts if scripts.count(script) > 1}
+
+
+def compare_blobs(task: Tuple[bytes, bytes, str, str, MlVToolConf]) -> PairVerdict:
+    """
+        Compare notebook and script blob contents, used as process pool worker
+    """
+    notebook_blob, script_blob, notebook_path, script_path, conf = task
+    # The git object reader returns None for objects missing from the object database
+    missing = [path for path, blob in ((notebook_path, notebook_blob), (script_path, script_blob)) if blob is None]
+    if missing:
+        return PairVerdict(False, f'object missing for {", ".join(missing)}')
+    try:
+        equals = compare_content(notebook_blob.decode(), script_blob.decode(), conf, notebook_path, script_path)
+        return PairVerdict(equals, None)
+    except (MlVToolException, UnicodeDecodeError) as e:
+        return PairVerdict(False, str(e))
+
+
+def check_revisions_consistency(revision_range: str, notebooks_dir: str, conf: MlVToolConf,
+                                path_filter: PathFilter = None, jobs: int = None, recursive: bool = False) -> bool:
+    """
+        Check notebooks and scripts consistency for each commit of a revision range.
+        Contents are read from the git object database, the working tree is never used.
+        Identical (notebook, script) blob pairs are only compared once.
+    """
+    git_top_dir = get_git_top_directory(conf.top_directory)
+    notebooks_rel_dir = relpath(realpath(notebooks_dir), realpath(git_top_dir))
+    revisions = get_revisions(revision_range, git_top_dir)
+    logging.info(f'Check consistency on {len(revisions)} revision(s) of {revision_range}')
+
+    path_filter = path_filter or PathFilter()
+    revision_pairs = OrderedDict((revision, get_revision_pairs(revision, git_top_dir, notebooks_rel_dir,
+                                                               conf, path_filter, recursive))
+                                 for revision in revisions)
+
+    # Deduplicate pairs across revisions, the notebook name is part of the generated script
+    unique_pairs = OrderedDict()
+    for pairs in revision_pairs.values():
+        conflicting_scripts = get_conflicting_scripts(pairs)
+        for pair in pairs:
+            if pair.script_sha and pair.script_path not in conflicting_scripts:
+                unique_pairs.setdefault((basename(pair.notebook_path), pair.notebook_sha, pair.script_sha), pair)
+    logging.info(f'{len(unique_pairs)} distinct notebook and script pair(s) to compare')
+
+    with GitObjectReader(git_top_dir) as reader:
+        blobs = reader.read_all({sha for _, nb_sha, script_sha in unique_pairs for sha in (nb_sha, script_sha)})
+
+    tasks = [(blobs[pair.notebook_sha], blobs[pair.script_sha], pair.notebook_path, pair.script_path, conf)
+             for pair in unique_pairs.values()]
+    verdicts = parallel_map(compare_blobs, tasks, jobs, warm_up=get_exporter)
+    verdict_by_key = dict(zip(unique_pairs.keys(), verdicts))
+
+    return all([log_revision_report(revision, pairs, verdict_by_key)
+                for revision, pairs in revision_pairs.items()])
+
+
+def check_staged_consistency(notebooks_dir: str, conf: MlVToolConf, path_filter: PathFilter = None,
+                             jobs: int = None, recursive: bool = False) -> bool:
+    """
+        Check consistency of staged notebooks and of notebooks whose script is staged.
+        Contents are read from the git index, unstaged changes are not taken into account.
+    """
+    git_top_dir = get_git_top_directory(conf.top_directory)
+    notebooks_rel_dir = relpath(realpath(notebooks_dir), realpath(git_top_dir))
+    staged_paths = get_staged_paths(git_top_dir)
+    pairs = [pair for pair in get_pairs(get_index_entries(git_top_dir), git_top_dir, notebooks_rel_dir, conf,
+                                        path_filter or PathFilter(), recursive)
+             if pair.notebook_path in staged_paths or pair.script_path in staged_paths]
+    logging.info(f'{len(pairs)} staged notebook and script pair(s) to compare')
+
+    conflicting_scripts = get_conflicting_scripts(pairs)
+    compared_pairs = [pair for pair in pairs if pair.script_sha and pair.script_path not in conflicting_scripts]
+    with GitObjectReader(git_top_dir) as reader:
+        blobs = reader.read_all({sha for pair in compared_pairs for sha in (pair.notebook_sha, pair.script_sha)})
+
+    tasks = [(blobs[pair.notebook_sha], blobs[pair.script_sha], pair.notebook_path, pair.script_path, conf)
+             for pair in compared_pairs]
+    verdicts = parallel_map(compare_blobs, tasks, jobs, warm_up=get_exporter)
+    verdict_by_key = {(basename(pair.notebook_path), pair.notebook_sha, pair.script_sha): verdict
+                      for pair, verdict in zip(compared_pairs, verdicts)}
+    return log_revision_report(STAGED, pairs, verdict_by_key)
+
+
+def log_revision_report(revision: str, pairs: List[RevisionPair], verdicts: Dict[tuple, PairVerdict]) -> bool:
+    """
+        Display the consistency report of a revision.
+        Notebooks converted to the same script are failures, they are not compared.
+    """
+    equals = True
+    conflicting_scripts = get_conflicting_scripts(pairs)
+    for script in sorted(conflicting_scripts):
+        notebooks = ', '.join(pair.notebook_path for pair in pairs if pair.script_path == script)
+        logging.error(f'{revision[:10]}: notebooks {notebooks} are converted to the same script {script}')
+        equals = False
+    for pair in pairs:
+        if pair.script_path in conflicting_scripts:
+            continue
+        if not pair.script_sha:
+            logging.error(f'{revision[:10]}: script {pair.script_path} does not exist '
+                          f'for notebook {pair.notebook_path}')
+            equals = False
+            continue
+        verdict = verdicts[(basename(pair.notebook_path), pair.notebook_sha, pair.script_sha)]
+        if verdict.error:
+            logging.error(f'{revision[:10]}: cannot compare {pair.notebook_path} and {pair.script_path}: '
+                          f'{verdict.error}')
+        elif not verdict.equals:
+            logging.error(f'{revision[:10]}: difference found between {pair.notebook_path} and {pair.script_path}')
+        equals = equals and verdict.equals
+    if equals:
+        logging.log(logging.WARNING + 1, f'{revision[:10]}: {len(pairs)} notebook(s) consistent')
+    return equals
+
+
+class IPynbCheckRevisions(CommandHelper):
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Checks notebooks and scripts consistency for each commit of a '
+                                           'revision range, or for staged changes, reading contents from the git '
+                                           'object database. The configuration of the working directory is used '
+                                           'for all revisions.') \
+            .add_work_dir_argument() \
+            .add_conf_path_argument() \
+            .add_path_argument('-n', '--notebooks-dir', type=str, required=True, help='Notebooks directory') \
+            .add_argument('-r', '--revisions', type=str,
+                          help='Git revision range to check (example: v1.0..HEAD)') \
+            .add_argument('--staged', action='store_true',
+                          help='Check staged notebooks and scripts from the git index instead of a revision range') \
+            .add_discovery_arguments('notebook') \
+            .add_jobs_argument() \
+            .parse(args)
+
+        self.set_log_level(args)
+        conf = self.get_conf(args.working_directory, args.notebooks_dir, args.conf_path)
+        if not conf.path:
+            raise MlVToolException('Configuration file is mandatory')
+
+        if bool(args.revisions) == args.staged:
+            raise MlVToolException('Exactly one of --revisions or --staged must be provided')
+
+        path_filter = PathFilter(args.include, args.ignore)
+        if args.staged:
+            equals = check_staged_consistency(args.notebooks_dir, conf, path_filter, args.jobs, args.recursive)
+        else:
+            equals = check_revisions_consistency(args.revisions, args.notebooks_dir, conf, path_filter, args.jobs,
+                                                 args.recursive)
+        sys.exit(0 if equals else 1)
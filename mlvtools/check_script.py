@@ -1,41 +1,145 @@
 #!/usr/bin/env python3
 import argparse
-import glob
+import ast
 import logging
 import sys
-from os.path import join, basename, exists
+import time
+from os.path import basename, exists, splitext, realpath, relpath, abspath, getsize
+from typing import Tuple, List, Optional, Set, Dict, Any
 
+import nbformat
+from nbformat import NotebookNode
+
+from mlvtools.cache import MlVToolCache, get_checks_jobs
 from mlvtools.cmd import CommandHelper, ArgumentBuilder
-from mlvtools.conf.conf import MlVToolConf, get_script_output_path
-from mlvtools.diff.parse import get_ast, get_ast_from_file, is_ast_equal
+from mlvtools.conf.conf import MlVToolConf, get_script_output_path, check_script_output_paths
+from mlvtools.diff.notebook import compare_notebook_to_script, ScriptDifference, UnsupportedNotebookException
+from mlvtools.diff.parse import get_ast, find_first_difference
+from mlvtools.discovery import discover_files, PathFilter
 from mlvtools.exception import MlVToolException
-from mlvtools.ipynb_to_python import get_converted_script
+from mlvtools.fingerprint import is_fingerprint_consistent
+from mlvtools.ipynb_to_python import convert_notebook_node, get_exporter, get_notebook_cell_index
+from mlvtools.mlv_git.git_objects import get_changed_paths
+from mlvtools.parallel import parallel_map
+from mlvtools.report import CheckResult, timed, write_report, check_report_formats, JSON_FORMAT
+from mlvtools.shard import parse_shard, load_timings, select_shard, format_shard
 
 
-def compare(notebook_path: str, script_path: str, conf: MlVToolConf) -> bool:
+def compare(notebook_path: str, script_path: str, conf: MlVToolConf, stats: Dict[str, Any] = None) -> bool:
     """
-        Compare the script obtained by notebook conversion using ipynb_to_python
-        with the actual script.
+        Compare the notebook with the actual script, as if it was converted using ipynb_to_python.
+        If provided, stats are filled with the comparison method, phases timings and difference location.
     """
-    generated_script = get_converted_script(notebook_path, conf)
-    generated_ast = get_ast(generated_script, name=notebook_path)
+    with timed(stats, 'read'):
+        notebook_content = read_file(notebook_path)
+        script_content = read_file(script_path)
+
+    return compare_content(notebook_content, script_content, conf, notebook_path, script_path, stats)
+
+
+def read_file(path: str) -> str:
+    try:
+        with open(path, 'r') as fd:
+            return fd.read()
+    except IOError as e:
+        raise MlVToolException(f'Cannot read file {path}') from e
+
+
+def compare_content(notebook_content: str, script_content: str, conf: MlVToolConf,
+                    notebook_path: str, script_path: str, stats: Dict[str, Any] = None) -> bool:
+    """
+        Compare in memory notebook and script contents.
+        Paths are only used to name the generated method and in error messages.
+        A script with a valid fingerprint is consistent without any parsing.
+    """
+    notebook_name = splitext(basename(notebook_path))[0]
+    with timed(stats, 'fingerprint'):
+        fingerprint_consistent = is_fingerprint_consistent(notebook_content, script_content, notebook_name, conf)
+    if fingerprint_consistent:
+        logging.debug(f'{script_path} fingerprint matches {notebook_path}')
+        set_stat(stats, 'method', 'fingerprint')
+        return True
+    with timed(stats, 'parse'):
+        try:
+            notebook = nbformat.reads(notebook_content, as_version=4)
+        except Exception as e:
+            raise MlVToolException(e) from e
+        script_ast = get_ast(script_content, name=script_path)
 
-    script_ast = get_ast_from_file(script_path)
+    return compare_notebook(notebook, script_ast, conf, notebook_path, script_path, stats)
 
-    return is_ast_equal(generated_ast, script_ast)
+
+def compare_notebook(notebook: NotebookNode, script_ast: ast.Module, conf: MlVToolConf,
+                     notebook_path: str, script_path: str, stats: Dict[str, Any] = None) -> bool:
+    """
+        Compare a notebook with a script ast tree cell by cell, without generating the script.
+        Fallback on the generated script comparison if the notebook can not be compared directly.
+        The first difference location is logged.
+    """
+    notebook_name = splitext(basename(notebook_path))[0]
+    try:
+        with timed(stats, 'compare'):
+            set_stat(stats, 'method', 'direct')
+            difference = compare_notebook_to_script(notebook, notebook_name, script_ast, conf)
+    except UnsupportedNotebookException as e:
+        logging.debug(f'{e}. Compare {script_path} with the script generated from {notebook_path}')
+        with timed(stats, 'conversion'):
+            set_stat(stats, 'method', 'generated')
+            difference = get_generated_script_difference(notebook, script_ast, conf, notebook_path)
+    if difference:
+        cell_number = difference.cell_index + 1 if difference.cell_index is not None else None
+        cell_info = f'notebook cell {cell_number}' if cell_number else 'outside notebook cells'
+        logging.warning(f'First difference at line {difference.script_line} of {script_path} '
+                        f'({cell_info} of {notebook_path}): {difference.reason}')
+        set_stat(stats, 'location', {'script_line': difference.script_line, 'notebook_cell': cell_number,
+                                     'reason': difference.reason})
+    return difference is None
+
+
+def set_stat(stats: Optional[Dict[str, Any]], name: str, value: Any):
+    if stats is not None:
+        stats[name] = value
+
+
+def get_generated_script_difference(notebook: NotebookNode, script_ast: ast.Module, conf: MlVToolConf,
+                                    notebook_path: str) -> Optional[ScriptDifference]:
+    """
+        Compare the script generated from the notebook with the actual script ast tree
+    """
+    generated_script, resources = convert_notebook_node(notebook, conf, notebook_path)
+    generated_ast = get_ast(generated_script, name=notebook_path)
+    difference = find_first_difference(generated_ast, script_ast)
+    if not difference:
+        return None
+    cell_index = get_notebook_cell_index(generated_script, resources, difference.line_a) \
+        if difference.line_a else None
+    return ScriptDifference(difference.line_b, cell_index, difference.reason)
 
 
-def run_consistency_check(notebook_path: str, script_path: str, conf: MlVToolConf) -> bool:
+def run_consistency_check(notebook_path: str, script_path: str, conf: MlVToolConf,
+                          cache: MlVToolCache = None, stats: Dict[str, Any] = None) -> bool:
     """
         Call comparison on notebook and script then display the result.
+        If a cache is provided, the verdict is reused while notebook, script and conf are unchanged.
     """
     logging.info(f'Run consistency check on ({notebook_path}, {script_path})')
 
     if not exists(script_path):
         logging.error(f'Script path {script_path} does not exists.')
+        set_stat(stats, 'error', f'Script {script_path} does not exist')
         return False
 
-    equals = compare(notebook_path, script_path, conf)
+    with timed(stats, 'cache'):
+        cache_key = cache.get_consistency_key(notebook_path, script_path, conf) if cache else None
+        equals = cache.get_consistency(cache_key) if cache_key else None
+    if equals is None:
+        equals = compare(notebook_path, script_path, conf, stats)
+        if cache_key:
+            cache.set_consistency(cache_key, equals)
+    else:
+        logging.debug(f'Consistency verdict found in cache for ({notebook_path}, {script_path})')
+        set_stat(stats, 'method', 'cache')
+
     if equals:
         logging.log(logging.WARNING + 1, f'Script content is the same for {basename(notebook_path)} '
                                          f'and {basename(script_path)}')
@@ -45,6 +149,48 @@ def run_consistency_check(notebook_path: str, script_path: str, conf: MlVToolCon
     return equals
 
 
+def run_consistency_check_task(check: Tuple[str, str, MlVToolConf, MlVToolCache]) -> CheckResult:
+    """
+        Run a consistency check on a (notebook, script, conf, cache) tuple, used as process pool worker
+    """
+    return get_consistency_check_result(*check)
+
+
+def get_consistency_check_result(notebook_path: str, script_path: str, conf: MlVToolConf,
+                                 cache: MlVToolCache = None) -> CheckResult:
+    """
+        Run a consistency check and return its result with timings and sizes.
+        A check which cannot be run is a failed check, its error is part of the result.
+    """
+    stats = {}
+    start = time.perf_counter()
+    try:
+        equals = run_consistency_check(notebook_path, script_path, conf, cache, stats)
+    except MlVToolException as e:
+        logging.error(f'Cannot check consistency of ({notebook_path}, {script_path}): {e}')
+        set_stat(stats, 'error', str(e))
+        equals = False
+    duration = time.perf_counter() - start
+    sizes = {name: getsize(path) for name, path in (('notebook', notebook_path), ('script', script_path))
+             if exists(path)}
+    return CheckResult(relpath(abspath(notebook_path), conf.top_directory),
+                       relpath(abspath(script_path), conf.top_directory), equals, duration,
+                       stats.get('method'), stats.get('location'), stats.get('timings'), sizes, stats.get('error'))
+
+
+def get_check_cache_key(check: Tuple[str, str, MlVToolConf, MlVToolCache]) -> Optional[str]:
+    notebook, script, conf, cache = check
+    return cache.get_consistency_key(notebook, script, conf) if exists(script) else None
+
+
+def get_affected_notebooks(notebooks: List[str], changed_paths: Set[str], conf: MlVToolConf) -> List[str]:
+    """
+        Return notebooks changed or whose script changed
+    """
+    return [notebook for notebook in notebooks
+            if realpath(notebook) in changed_paths or realpath(get_script_output_path(notebook, conf)) in changed_paths]
+
+
 class IPynbCheckScript(CommandHelper):
 
     def run(self, *args, **kwargs):
@@ -54,14 +200,20 @@ class IPynbCheckScript(CommandHelper):
             .add_conf_path_argument() \
             .add_path_argument('-n', '--notebook', type=str, help='The notebook to check') \
             .add_path_argument('-s', '--script', required=True, type=str, help='The script to check') \
+            .add_cache_arguments() \
+            .add_report_argument() \
             .parse(args)
 
         self.set_log_level(args)
+        check_report_formats(args.report)
 
         conf = self.get_conf(args.working_directory, args.notebook, args.conf_path)
+        cache = self.get_cache(args)
 
-        equals = run_consistency_check(args.notebook, args.script, conf)
-        sys.exit(0 if equals else 1)
+        result = get_consistency_check_result(args.notebook, args.script, conf, cache)
+        for report_format, report_path in args.report:
+            write_report(report_format, report_path, [result])
+        sys.exit(0 if result.equals else 1)
 
 
 class IPynbCheckAllScripts(CommandHelper):
@@ -73,20 +225,45 @@ class IPynbCheckAllScripts(CommandHelper):
             .add_work_dir_argument() \
             .add_conf_path_argument() \
             .add_path_argument('-n', '--notebooks-dir', type=str, help='Notebooks directory') \
-            .add_argument('-i', '--ignore', action='append', help='Notebook filename to ignore', default=[]) \
+            .add_discovery_arguments('notebook') \
+            .add_argument('--since', type=str,
+                          help='Only check notebooks changed since the given git revision, or whose script changed') \
+            .add_argument('--shard', type=parse_shard,
+                          help='Only check notebooks of the shard i/N, assigned by a stable hash of their path') \
+            .add_argument('--timings', type=str,
+                          help='JSON file of notebooks check durations used to balance shards') \
+            .add_argument('--shard-report', type=str,
+                          help='Write a JSON report which can be merged with merge_consistency_reports') \
+            .add_jobs_argument() \
+            .add_cache_arguments() \
+            .add_report_argument() \
             .parse(args)
 
         self.set_log_level(args)
+        check_report_formats(args.report)
         conf = self.get_conf(args.working_directory, args.notebooks_dir, args.conf_path)
         if not conf.path:
             raise MlVToolException('Configuration file is mandatory')
+        cache = self.get_cache(args)
+
+        notebooks = discover_files(args.notebooks_dir, '.ipynb', PathFilter(args.include, args.ignore),
+                                   args.recursive)
+        check_script_output_paths(notebooks, conf)
+        if args.since:
+            notebooks = get_affected_notebooks(notebooks, get_changed_paths(args.since, args.working_directory), conf)
+            logging.info(f'{len(notebooks)} notebook(s) affected by changes since {args.since}')
+        if args.shard:
+            timings = load_timings(args.timings) if args.timings else None
+            notebooks = select_shard(notebooks, args.shard, conf.top_directory, timings)
+            logging.info(f'{len(notebooks)} notebook(s) in shard {format_shard(args.shard)}')
 
-        equals = True
-        for notebook in glob.glob(join(args.notebooks_dir, '*.ipynb')):
-            if basename(notebook) in args.ignore:
-                logging.info(f'Ignore notebook {notebook}')
-                continue
+        checks = [(notebook, get_script_output_path(notebook, conf), conf, cache) for notebook in notebooks]
 
-            associated_script = get_script_output_path(notebook, conf)
-            equals = run_consistency_check(notebook, associated_script, conf) and equals
-        sys.exit(0 if equals else 1)
+        jobs = get_checks_jobs(args.jobs, cache, checks, get_check_cache_key)
+        results = parallel_map(run_consistency_check_task, checks, jobs, warm_up=get_exporter)
+        shard = format_shard(args.shard) if args.shard else None
+        if args.shard_report:
+            write_report(JSON_FORMAT, args.shard_report, results, shard)
+        for report_format, report_path in args.report:
+            write_report(report_format, report_path, results, shard)
+        sys.exit(0 if all(result.equals for result in results) else 1)
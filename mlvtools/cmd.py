@@ -5,11 +5,14 @@ import os.path
 
 import argparse
 from argparse import ArgumentParser, Namespace
-from typing import Tuple, Any, List
+from typing import Tuple, Any, List, Optional
 
+from mlvtools.cache import MlVToolCache, get_default_cache_dir
 from mlvtools.conf.conf import get_conf_file_default_path, load_conf_or_default, MlVToolConf
 from mlvtools.exception import MlVToolException
-from mlvtools.helper import to_sanitized_path
+from mlvtools.helper import to_sanitized_path, is_stdio
+from mlvtools.mlv_dvc.dvc_stage import STAGE_FORMATS
+from mlvtools.report import REPORT_FORMATS
 
 
 class SanitizePath(argparse.Action):
@@ -17,6 +20,17 @@ class SanitizePath(argparse.Action):
         setattr(namespace, self.dest, to_sanitized_path(values))
 
 
+def positive_int(value: str) -> int:
+    """ Argument type for strictly positive integers """
+    try:
+        int_value = int(value)
+    except ValueError:
+        int_value = 0
+    if int_value < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive integer')
+    return int_value
+
+
 class CommandHelper:
     def set_log_level(self, args: Namespace):
         logging.addLevelName(logging.WARNING + 1, 'mlvtools')
@@ -30,7 +44,7 @@ class CommandHelper:
         if force:
             return
         for output in outputs:
-            if os.path.exists(output):
+            if not is_stdio(output) and os.path.exists(output):
                 raise MlVToolException(f'Output file {output} already exists, '
                                        f'use --force option to overwrite it')
 
@@ -38,6 +52,11 @@ class CommandHelper:
         conf_path = conf_path_arg or get_conf_file_default_path(working_dir_arg)
         return load_conf_or_default(conf_path, working_dir_arg)
 
+    def get_cache(self, args: Namespace) -> Optional[MlVToolCache]:
+        if args.no_cache:
+            return None
+        return MlVToolCache(args.cache_dir or get_default_cache_dir(args.working_directory))
+
     def run_cmd(self, *args, **kwargs):
         try:
             self.run(*args, **kwargs)
@@ -81,6 +100,43 @@ class ArgumentBuilder:
                                       'Relative to working directory.')
         return self
 
+    def add_jobs_argument(self) -> 'ArgumentBuilder':
+        self.parser.add_argument('-j', '--jobs', type=positive_int, default=os.cpu_count(),
+                                 help='Number of parallel jobs. Defaults to the number of CPUs.')
+        return self
+
+    def add_cache_arguments(self) -> 'ArgumentBuilder':
+        self.parser.add_argument('--cache-dir', type=str,
+                                 help='Cache directory. Defaults to a directory of the working directory in the user '
+                                      'cache directory, $XDG_CACHE_HOME/mlvtools or ~/.cache/mlvtools.')
+        self.parser.add_argument('--no-cache', action='store_true', help='Disable the cache.')
+        return self
+
+    def add_discovery_arguments(self, kind: str) -> 'ArgumentBuilder':
+        self.parser.add_argument('-i', '--ignore', action='append', default=[],
+                                 help=f'Gitignore style pattern of {kind} paths to ignore, relative to the '
+                                      f'directory. A {kind} filename is ignored at any depth. Can be repeated.')
+        self.parser.add_argument('--include', action='append', default=[],
+                                 help=f'Gitignore style pattern of {kind} paths to check, relative to the '
+                                      f'directory. All {kind}s by default. Can be repeated.')
+        self.parser.add_argument('--recursive', action='store_true',
+                                 help=f'Discover {kind}s in sub directories, except .ipynb_checkpoints and '
+                                      f'ignored directories')
+        return self
+
+    def add_report_argument(self) -> 'ArgumentBuilder':
+        self.parser.add_argument('--report', nargs=2, action='append', default=[], metavar=('FORMAT', 'PATH'),
+                                 type=str, help=f'Write a report of checks, FORMAT is one of '
+                                                f'{", ".join(REPORT_FORMATS)}. Can be repeated.')
+        return self
+
+    def add_dvc_stage_argument(self) -> 'ArgumentBuilder':
+        self.parser.add_argument('--dvc-stage', type=str, choices=STAGE_FORMATS,
+                                 help='Write the DVC stage definition directly in this format instead of a DVC '
+                                      'command: the stage is registered without running it. Not available for '
+                                      'whole DVC commands.')
+        return self
+
     def add_argument(self, *args, **kwargs) -> 'ArgumentBuilder':
         self.parser.add_argument(*args, **kwargs)
         return self
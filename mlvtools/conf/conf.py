@@ -2,14 +2,14 @@ import json
 import logging
 import re
 from json import JSONDecodeError
-from os.path import join, exists, basename
+from os.path import join, exists, basename, abspath
 from typing import List
 
 import yaml
 from pydantic import BaseModel, validator, ValidationError, root_validator
 
-from mlvtools.exception import MlVToolConfException
-from mlvtools.helper import to_script_name, to_dvc_cmd_name, to_dvc_meta_filename
+from mlvtools.exception import MlVToolConfException, MlVToolException
+from mlvtools.helper import to_script_name, to_dvc_cmd_name, to_dvc_meta_filename, load_yaml_file
 
 DEFAULT_CONF_FILENAME = '.mlvtools'
 
@@ -96,6 +96,21 @@ def get_script_output_path(notebook_path: str, conf: MlVToolConf) -> str:
     return join(conf.top_directory, conf.path.python_script_root_dir, file_name)
 
 
+def check_script_output_paths(notebooks: List[str], conf: MlVToolConf):
+    """
+        Raise if notebooks of different directories would be converted to the same python script,
+        script names only depend on notebook file names
+    """
+    notebooks_by_script = {}
+    for notebook in notebooks:
+        notebooks_by_script.setdefault(abspath(get_script_output_path(notebook, conf)), []).append(notebook)
+    conflicts = [f'{", ".join(script_notebooks)} -> {script}'
+                 for script, script_notebooks in notebooks_by_script.items() if len(script_notebooks) > 1]
+    if conflicts:
+        raise MlVToolException(f'Notebooks are converted to the same script, rename or ignore them: '
+                               f'{"; ".join(conflicts)}')
+
+
 def get_dvc_cmd_output_path(script_path: str, conf: MlVToolConf) -> str:
     """ Generate dvc command path according to conf and python script file name """
     file_name = to_dvc_cmd_name(basename(script_path))
@@ -116,8 +131,7 @@ def load_docstring_conf(docstring_conf_path: str) -> dict:
     """ Load a Yaml format docstring configuration """
     try:
         logging.info(f'Load docstring configuration from {docstring_conf_path}')
-        with open(docstring_conf_path, 'r') as fd:
-            return yaml.safe_load(fd)
+        return load_yaml_file(docstring_conf_path)
     except yaml.YAMLError as e:
         raise MlVToolConfException(f'Cannot load docstring conf {docstring_conf_path}. Format error {e}.') from e
     except IOError as e:
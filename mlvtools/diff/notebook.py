@@ -0,0 +1,175 @@
+import ast
+import copy
+from collections import namedtuple
+from typing import Optional, List, Dict, Any
+
+from nbconvert.filters import ipython2python
+from nbformat import NotebookNode
+
+from mlvtools.conf.conf import MlVToolConf
+from mlvtools.diff.parse import find_first_difference, get_ast
+from mlvtools.exception import MlVToolException
+from mlvtools.helper import to_method_name, to_instructions_list
+from mlvtools.ipynb_to_python import DocstringWrapper, get_data_from_docstring, filter_trailing_cells, is_no_effect
+
+ScriptDifference = namedtuple('ScriptDifference', ('script_line', 'cell_index', 'reason'))
+
+IMPORT_STATEMENT = 'import argparse'
+FUNCTION_WRAPPER = 'def wrapper():'
+INDENT = '    '
+
+
+class UnsupportedNotebookException(MlVToolException):
+    """
+        The notebook can not be compared directly, the generated script must be compared instead
+    """
+    pass
+
+
+def get_cell_statements(instructions: List[str]) -> List[ast.stmt]:
+    """
+        Return the statements of a cell as written in the generated method body.
+        The cell is parsed in a method to keep the template indentation, which matters
+        in multi-line strings. A final pass statement ensures the cell is complete.
+    """
+    content = '\n'.join([FUNCTION_WRAPPER] + [f'{INDENT}{instruction}' for instruction in instructions] +
+                        [f'{INDENT}pass'])
+    try:
+        body = ast.parse(content).body[0].body
+    except SyntaxError as e:
+        raise UnsupportedNotebookException(f'Cell can not be parsed on its own: {e}') from e
+    if not isinstance(body[-1], ast.Pass) or body[-1].col_offset != len(INDENT):
+        raise UnsupportedNotebookException('Cell is not complete on its own')
+    return body[:-1]
+
+
+def get_docstring_statements(docstring_wrapper: DocstringWrapper) -> List[ast.stmt]:
+    if not docstring_wrapper.docstring:
+        return []
+    return get_cell_statements(docstring_wrapper.docstring.split('\n'))
+
+
+def get_function_header(func_name: str, docstring_wrapper: DocstringWrapper) -> ast.FunctionDef:
+    return get_ast(f'def {func_name}({docstring_wrapper.params}):\n{INDENT}pass').body[0]
+
+
+def get_main_block(func_name: str, docstring_wrapper: DocstringWrapper) -> ast.If:
+    """
+        Return the main block written by the template
+    """
+    lines = ["if __name__ == '__main__':",
+             f"{INDENT}parser = argparse.ArgumentParser(description='Command for script {func_name}')"]
+    for argument in docstring_wrapper.arguments:
+        nargs = " nargs='+'," if argument['is_list'] else ''
+        lines.append(f"{INDENT}parser.add_argument('--{argument['name']}', type={argument['type']}, "
+                     f"required=True,{nargs} help=\"{argument['help']}\")")
+    lines.append(f'{INDENT}args = parser.parse_args()')
+    lines.append(f'{INDENT}{func_name}({docstring_wrapper.arg_params})')
+    try:
+        return ast.parse('\n'.join(lines)).body[0]
+    except SyntaxError as e:
+        raise UnsupportedNotebookException(f'Main block can not be parsed: {e}') from e
+
+
+def get_cell_instructions(cell: Dict[str, Any], resource: Dict[str, Any]) -> Optional[List[str]]:
+    """
+        Return cell instructions as formatted by the conversion, None for cells without statements
+    """
+    if cell['cell_type'] != 'code' or is_no_effect(cell['source'], resource):
+        return None
+    return to_instructions_list(ipython2python(cell['source']))
+
+
+def compare_notebook_to_script(notebook: NotebookNode, notebook_name: str, script_ast: ast.Module,
+                               conf: MlVToolConf) -> Optional[ScriptDifference]:
+    """
+        Compare a notebook with a script syntax tree without generating the script.
+        The script method body is compared cell by cell applying the conversion rules
+        (docstring cell, ignore keys, trailing cells), the comparison stops at the first difference.
+        Return the first difference, None if the script is the notebook conversion.
+        Raise UnsupportedNotebookException if a cell can not be compared on its own.
+    """
+    resource = {'ignore_keys': conf.ignore_keys}
+    cells = list(notebook.cells)
+    docstring_wrapper = get_data_from_docstring(cells, resource)
+    cells = filter_trailing_cells(cells, resource)
+    docstring_cell_index = resource.get('docstring_cell_index')
+    func_name = to_method_name(notebook_name)
+
+    script_body = script_ast.body
+    if len(script_body) != 3:
+        return ScriptDifference(script_body[-1].lineno if script_body else None, None,
+                                f'3 top level statements expected, found {len(script_body)}')
+    import_node, function_node, main_node = script_body
+
+    if find_first_difference(get_ast(IMPORT_STATEMENT).body[0], import_node):
+        return ScriptDifference(import_node.lineno, None, f'"{IMPORT_STATEMENT}" expected')
+
+    if not isinstance(function_node, ast.FunctionDef):
+        return ScriptDifference(function_node.lineno, None, f'{func_name} method expected')
+    header, function_header = get_function_header(func_name, docstring_wrapper), copy.copy(function_node)
+    header.body = function_header.body = []
+    difference = find_first_difference(header, function_header)
+    if difference:
+        return ScriptDifference(function_node.lineno, None, difference.reason)
+
+    difference = compare_method_body(cells, docstring_wrapper, docstring_cell_index, function_node, resource)
+    if difference:
+        return difference
+
+    difference = find_first_difference(get_main_block(func_name, docstring_wrapper), main_node)
+    if difference:
+        return ScriptDifference(difference.line_b, None, difference.reason)
+    return None
+
+
+def compare_method_body(cells: List[Dict[str, Any]], docstring_wrapper: DocstringWrapper,
+                        docstring_cell_index: Optional[int], function_node: ast.FunctionDef,
+                        resource: Dict[str, Any]) -> Optional[ScriptDifference]:
+    """
+        Compare the method body statements with the docstring and the cells statements,
+        one cell at a time
+    """
+    script_statements = function_node.body
+    cursor = 0
+
+    def compare_statements(statements: List[ast.stmt], cell_index: Optional[int]) -> Optional[ScriptDifference]:
+        nonlocal cursor
+        for statement in statements:
+            if cursor >= len(script_statements):
+                last_line = getattr(script_statements[-1], 'end_lineno', None) or script_statements[-1].lineno \
+                    if script_statements else function_node.lineno
+                return ScriptDifference(last_line, cell_index, f'missing {type(statement).__name__} statement')
+            difference = find_first_difference(statement, script_statements[cursor])
+            if difference:
+                return ScriptDifference(difference.line_b, cell_index, difference.reason)
+            cursor += 1
+        return None
+
+    difference = compare_statements(get_docstring_statements(docstring_wrapper), None)
+    if difference:
+        return difference
+
+    if not cells:
+        difference = compare_statements([ast.Pass()], None)
+        if difference:
+            return difference
+
+    cell_index = None
+    for index, cell in enumerate(cells):
+        instructions = get_cell_instructions(cell, resource)
+        if instructions is None:
+            continue
+        cell_index = index + 1 if docstring_cell_index is not None and index >= docstring_cell_index else index
+        difference = compare_statements(get_cell_statements(instructions), cell_index)
+        if difference:
+            return difference
+
+    if cursor == 0:
+        # Nothing to compare, the generated method body would be invalid
+        raise UnsupportedNotebookException('No statement found in notebook')
+    if cursor < len(script_statements):
+        # Extra statements follow the last cell
+        return ScriptDifference(script_statements[cursor].lineno, cell_index,
+                                f'unexpected {type(script_statements[cursor]).__name__} statement')
+    return None
@@ -1,4 +1,6 @@
 import ast
+from collections import namedtuple
+from typing import Optional, Any
 
 from mlvtools.exception import MlVToolException
 
@@ -26,8 +28,77 @@ def get_ast_from_file(file_path: str):
         raise MlVToolException(f'Cannot read file {file_path} for ast tree extraction') from e
 
 
+AstDifference = namedtuple('AstDifference', ('line_a', 'line_b', 'reason'))
+
+
 def is_ast_equal(node_a: ast.AST, node_b: ast.AST) -> bool:
     """
-        Compare two ast tree using ast dump
+        Compare two ast tree, positions are ignored
+    """
+    return find_first_difference(node_a, node_b) is None
+
+
+def find_first_difference(node_a: ast.AST, node_b: ast.AST) -> Optional[AstDifference]:
     """
-    return ast.dump(node_a) == ast.dump(node_b)
+        Walk both ast trees in lockstep and stop at the first difference. Node types and fields
+        are compared as in ast dump, positions are ignored.
+        Return the line of the closest positioned node in each tree, None if trees are equal.
+    """
+    return _compare_values(node_a, node_b, None, None, 'node')
+
+
+def _get_line(node: Any, default: Optional[int]) -> Optional[int]:
+    return getattr(node, 'lineno', default)
+
+
+def _get_end_line(node: Any, default: Optional[int]) -> Optional[int]:
+    return getattr(node, 'end_lineno', None) or _get_line(node, default)
+
+
+def _compare_values(value_a: Any, value_b: Any, line_a: Optional[int], line_b: Optional[int],
+                    field: str) -> Optional[AstDifference]:
+    if isinstance(value_a, ast.AST) and isinstance(value_b, ast.AST):
+        return _compare_nodes(value_a, value_b, line_a, line_b)
+    if isinstance(value_a, list) and isinstance(value_b, list):
+        return _compare_lists(value_a, value_b, line_a, line_b, field)
+    if isinstance(value_a, (ast.AST, list)) or isinstance(value_b, (ast.AST, list)) or repr(value_a) != repr(value_b):
+        return AstDifference(_get_line(value_a, line_a), _get_line(value_b, line_b),
+                             f'{field}: {_describe(value_a)} != {_describe(value_b)}')
+    return None
+
+
+def _compare_nodes(node_a: ast.AST, node_b: ast.AST, line_a: Optional[int],
+                   line_b: Optional[int]) -> Optional[AstDifference]:
+    line_a = _get_line(node_a, line_a)
+    line_b = _get_line(node_b, line_b)
+    if type(node_a) is not type(node_b):
+        return AstDifference(line_a, line_b, f'{_describe(node_a)} != {_describe(node_b)}')
+    for field in node_a._fields:
+        difference = _compare_values(getattr(node_a, field, None), getattr(node_b, field, None),
+                                     line_a, line_b, field)
+        if difference:
+            return difference
+    return None
+
+
+def _compare_lists(values_a: list, values_b: list, line_a: Optional[int], line_b: Optional[int],
+                   field: str) -> Optional[AstDifference]:
+    for value_a, value_b in zip(values_a, values_b):
+        difference = _compare_values(value_a, value_b, line_a, line_b, field)
+        if difference:
+            return difference
+    if len(values_a) == len(values_b):
+        return None
+    # One list has extra elements: point to the first extra one and to the end of the other list
+    common = min(len(values_a), len(values_b))
+    if len(values_a) > common:
+        extra_line_a = _get_line(values_a[common], line_a)
+        extra_line_b = _get_end_line(values_b[-1], line_b) if values_b else line_b
+        return AstDifference(extra_line_a, extra_line_b, f'{field}: extra {_describe(values_a[common])} in first tree')
+    extra_line_a = _get_end_line(values_a[-1], line_a) if values_a else line_a
+    extra_line_b = _get_line(values_b[common], line_b)
+    return AstDifference(extra_line_a, extra_line_b, f'{field}: extra {_describe(values_b[common])} in second tree')
+
+
+def _describe(value: Any) -> str:
+    return type(value).__name__ if isinstance(value, ast.AST) else repr(value)
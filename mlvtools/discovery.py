@@ -0,0 +1,148 @@
+import logging
+import os
+import re
+from collections import namedtuple
+from os.path import join
+from typing import List, Optional, Pattern
+
+#: Paths never discovered, unless a negated pattern re-includes them: Jupyter checkpoints directories
+#: and temporary save files
+DEFAULT_EXCLUDE = ('.ipynb_checkpoints/', '.~*')
+
+PathRule = namedtuple('PathRule', ('regex', 'negated', 'dir_only'))
+
+
+def translate_pattern(pattern: str) -> Pattern:
+    """
+        Translate a gitignore style pattern, without negation and trailing slash, to a regex matching
+        paths relative to the discovery root.
+        Patterns without slash match at any depth, '*' and '?' do not match '/', '**' matches any directories.
+    """
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    regex = '' if anchored else '(?:.*/)?'
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith('**/', index):
+            regex += '(?:.*/)?'
+            index += 3
+        elif pattern.startswith('**', index):
+            regex += '.*'
+            index += 2
+        elif pattern[index] == '*':
+            regex += '[^/]*'
+            index += 1
+        elif pattern[index] == '?':
+            regex += '[^/]'
+            index += 1
+        elif pattern[index] == '[' and ']' in pattern[index + 2:]:
+            end = pattern.index(']', index + 2)
+            characters = pattern[index + 1:end]
+            regex += '[' + ('^' + characters[1:] if characters.startswith('!') else characters) + ']'
+            index = end + 1
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+    return re.compile(f'{regex}$')
+
+
+def parse_rules(patterns: List[str]) -> List[PathRule]:
+    rules = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith('#'):
+            continue
+        negated = pattern.startswith('!')
+        pattern = pattern[1:] if negated else pattern
+        dir_only = pattern.endswith('/')
+        rules.append(PathRule(translate_pattern(pattern.rstrip('/')), negated, dir_only))
+    return rules
+
+
+def match_rules(rules: List[PathRule], rel_path: str, is_dir: bool) -> Optional[bool]:
+    """
+        Return True if the last matching rule selects the path, False if it is negated, None if no rule matches
+    """
+    for rule in reversed(rules):
+        if (is_dir or not rule.dir_only) and rule.regex.match(rel_path):
+            return not rule.negated
+    return None
+
+
+class PathFilter:
+    """
+        Select discovered paths with gitignore style include and exclude patterns,
+        relative to the discovery root. The last matching pattern wins and '!' negates a pattern.
+        Excluded directories are pruned: nothing below them is discovered.
+        Without include pattern, all files are included.
+    """
+
+    def __init__(self, include: List[str] = None, exclude: List[str] = None, use_default_exclude: bool = True):
+        self.include_rules = parse_rules(include or [])
+        self.exclude_rules = parse_rules((list(DEFAULT_EXCLUDE) if use_default_exclude else []) + (exclude or []))
+
+    def is_excluded_dir(self, rel_path: str) -> bool:
+        return bool(match_rules(self.exclude_rules, rel_path, is_dir=True))
+
+    def is_selected_file(self, rel_path: str) -> bool:
+        if match_rules(self.exclude_rules, rel_path, is_dir=False):
+            return False
+        return not self.include_rules or bool(match_rules(self.include_rules, rel_path, is_dir=False))
+
+    def is_selected(self, rel_path: str) -> bool:
+        """
+            Select a file path which was not discovered from the file system, applying directories pruning
+        """
+        parts = rel_path.split('/')
+        if any(self.is_excluded_dir('/'.join(parts[:index])) for index in range(1, len(parts))):
+            return False
+        return self.is_selected_file(rel_path)
+
+
+def discover_files(root_dir: str, suffix: str, path_filter: PathFilter = None, recursive: bool = True) -> List[str]:
+    """
+        Return sorted paths of files with the given suffix found in the root directory, and its sub
+        directories if recursive. Directories excluded by the filter are never scanned, symbolic links
+        to directories are not followed.
+    """
+    path_filter = path_filter or PathFilter()
+    files = []
+    directories = [(root_dir, '')]
+    while directories:
+        directory, rel_directory = directories.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel_path = f'{rel_directory}{entry.name}'
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not path_filter.is_excluded_dir(rel_path):
+                            directories.append((entry.path, f'{rel_path}/'))
+                    elif entry.name.endswith(suffix) and entry.is_file() and path_filter.is_selected_file(rel_path):
+                        files.append(join(directory, entry.name))
+        except OSError as e:
+            logging.warning(f'Cannot scan directory {directory}: {e}')
+    return sorted(files)
+
+
+def discover_directories(root_dir: str, path_filter: PathFilter = None, recursive: bool = True) -> List[str]:
+    """
+        Return sorted paths of the root directory and, if recursive, of its sub directories which are not
+        excluded by the filter. Symbolic links to directories are not followed.
+    """
+    path_filter = path_filter or PathFilter()
+    found = []
+    directories = [(root_dir, '')]
+    while directories:
+        directory, rel_directory = directories.pop()
+        found.append(directory)
+        if not recursive:
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel_path = f'{rel_directory}{entry.name}'
+                    if entry.is_dir(follow_symlinks=False) and not path_filter.is_excluded_dir(rel_path):
+                        directories.append((entry.path, f'{rel_path}/'))
+        except OSError as e:
+            logging.warning(f'Cannot scan directory {directory}: {e}')
+    return sorted(found)
@@ -1,12 +1,16 @@
 import ast
+import io
 import logging
+import tokenize
 from collections import namedtuple
+from typing import Callable, Optional, Tuple
 
-from docstring_parser import parse as dc_parse
+from docstring_parser.parser import Style
 
 from mlvtools.diff.parse import get_ast
-from mlvtools.docstring_helpers.parse import resolve_docstring
+from mlvtools.docstring_helpers.parse import resolve_docstring, parse_docstring
 from mlvtools.exception import MlVToolException
+from mlvtools.helper import is_stdio, read_stdin
 
 
 def extract_docstring(cell_content: str) -> str:
@@ -34,28 +38,106 @@ def extract_docstring_from_file(input_path: str, docstring_conf: dict = None) ->
         Extract method docstring information (docstring, method_name, input_path)
         The provided python script must have one and only one method
         The extracted docstring is parsed and returned in docstring info
+        The script is read from stdin if its path is '-'
     """
     logging.info(f'Extract docstring from "{input_path}".')
+    if is_stdio(input_path):
+        return extract_docstring_from_content(read_stdin(), input_path, docstring_conf)
     try:
         with open(input_path, 'r') as fd:
-            root = ast.parse(fd.read())
+            first_docstring = get_first_function_docstring(fd.readline)
+            if first_docstring:
+                return get_docstring_info(*first_docstring, input_path, docstring_conf)
+            fd.seek(0)
+            content = fd.read()
     except FileNotFoundError as e:
         raise MlVToolException(
             f'Python input script {input_path} not found.') from e
+    return extract_docstring_from_ast(content, input_path, docstring_conf)
+
+
+def extract_docstring_from_content(content: str, input_path: str, docstring_conf: dict = None) -> DocstringInfo:
+    """
+        Extract method docstring information from an in memory python script
+    """
+    first_docstring = get_first_function_docstring(io.StringIO(content).readline)
+    if first_docstring:
+        return get_docstring_info(*first_docstring, input_path, docstring_conf)
+    return extract_docstring_from_ast(content, input_path, docstring_conf)
+
+
+def get_first_function_docstring(readline: Callable[[], str]) -> Optional[Tuple[str, str]]:
+    """
+        Return the name and the docstring of the first top level function of a script, reading and
+        tokenizing it only up to the end of this docstring.
+        Return None if the function has no docstring on its own lines or the script cannot be tokenized:
+        the whole script syntax tree must be used. Syntax errors after the docstring are not detected.
+    """
+    lines = []
+
+    def read_line() -> str:
+        line = readline()
+        lines.append(line)
+        return line
+
+    def_line = None
+    header_end = None
+    body_started = False
+    docstring_end = None
+    try:
+        for token in tokenize.generate_tokens(read_line):
+            if token.type in (tokenize.COMMENT, tokenize.NL):
+                continue
+            if docstring_end:
+                if token.type != tokenize.NEWLINE:
+                    return None
+                break
+            if not def_line:
+                if token.type == tokenize.NAME and token.string == 'def' and token.start[1] == 0:
+                    def_line = token.start[0]
+            elif not header_end:
+                header_end = token.type == tokenize.NEWLINE
+            elif not body_started:
+                # A function body on the header line is not handled
+                if token.type != tokenize.INDENT:
+                    return None
+                body_started = True
+            elif token.type == tokenize.STRING:
+                docstring_end = token.end[0]
+            else:
+                return None
+        if not docstring_end:
+            return None
+        node = ast.parse(''.join(lines[def_line - 1:docstring_end])).body[0]
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    return node.name, ast.get_docstring(node)
+
+
+def extract_docstring_from_ast(content: str, input_path: str, docstring_conf: dict = None) -> DocstringInfo:
+    """
+        Extract method docstring information from the whole syntax tree of a python script
+    """
+    try:
+        root = ast.parse(content)
     except SyntaxError as e:
         raise MlVToolException(f'Invalid python script format: {input_path}') from e
 
     for node in ast.walk(root):
         if isinstance(node, ast.FunctionDef):
-            method_name = node.name
-            docstring_str = ast.get_docstring(node)
-            if docstring_conf:
-                docstring_str = resolve_docstring(docstring_str, docstring_conf)
-            docstring = dc_parse(docstring_str)
-            break
-    else:
-        logging.error(f'Not method found in {input_path}')
-        raise MlVToolException(f'Not method found in {input_path}')
+            return get_docstring_info(node.name, ast.get_docstring(node), input_path, docstring_conf)
+    logging.error(f'Not method found in {input_path}')
+    raise MlVToolException(f'Not method found in {input_path}')
+
+
+def get_docstring_info(method_name: str, docstring_str: str, input_path: str,
+                       docstring_conf: dict = None) -> DocstringInfo:
+    """
+        Resolve then parse a method docstring
+    """
+    if docstring_conf:
+        docstring_str = resolve_docstring(docstring_str, docstring_conf)
+    docstring = parse_docstring(docstring_str, Style.auto)
 
     logging.debug(f'Docstring extracted from method {method_name}: {docstring_str}')
     docstring_info = DocstringInfo(method_name=method_name,
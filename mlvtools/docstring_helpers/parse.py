@@ -1,5 +1,6 @@
 from collections import namedtuple
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
 
 import jinja2
 from docstring_parser import parse as dc_parse
@@ -8,20 +9,21 @@ from docstring_parser.parser import Docstring, ParseError, Style
 from mlvtools.exception import MlVToolException
 from mlvtools.helper import render_string_template
 
+#: Maximum number of parsed docstrings and DVC parameters kept in memory
+DOCSTRING_CACHE_SIZE = 1024
 
-class DocstringDvc:
+ParsedMeta = namedtuple('ParsedMeta', ('args', 'description'))
+ParsedParam = namedtuple('ParsedParam', ('args', 'description', 'arg_name', 'type_name', 'is_optional', 'default'))
+#: Immutable parsed docstring, it can be shared between callers of the memoized parsing
+ParsedDocstring = namedtuple('ParsedDocstring', ('short_description', 'long_description', 'meta', 'params'))
+
+
+class DocstringDvc(namedtuple('DocstringDvc', ('file_path', 'related_param'))):
     """
         Syntax
         :dvc-[in|out] [{related_param}]?: {{file_path}}
     """
-
-    def __init__(self, file_path: str, related_param: str = None):
-        self.related_param = related_param
-        self.file_path = file_path
-
-    def __eq__(self, other):
-        return self.file_path == other.file_path and \
-               self.related_param == other.related_param
+    __slots__ = ()
 
     @staticmethod
     def meta_checks(params: Dict[str, Optional[str]], args: List[str], description: str, expected_key: str):
@@ -44,17 +46,17 @@ class DocstringDvc:
             raise MlVToolException(f'Unsupported type {params[related_param]} for {args}. Discard.')
 
 
+DocstringDvc.__new__.__defaults__ = (None,)
+
+
 class DocstringDvcIn(DocstringDvc):
     DVC_IN_KEY = 'dvc-in'
-
     """
         Syntax
         :dvc-in param2: path/to/in/file
         :dvc-in: path/to/other/infile.test
     """
-
-    def __init__(self, path: str, related_param: str = None):
-        super().__init__(path, related_param)
+    __slots__ = ()
 
     @staticmethod
     def from_meta(params: Dict[str, Optional[str]], args: List[str], description: str) -> 'DocstringDvcIn':
@@ -69,9 +71,7 @@ class DocstringDvcOut(DocstringDvc):
         :dvc-out: path/to/file.txt
         :dvc-out param1: path/to/other
     """
-
-    def __init__(self, path: str, related_param: str = None):
-        super().__init__(path, related_param)
+    __slots__ = ()
 
     @staticmethod
     def from_meta(params: Dict[str, Optional[str]], args: List[str], description: str) -> 'DocstringDvcOut':
@@ -86,9 +86,7 @@ class DocstringDvcOutPersist(DocstringDvc):
         :dvc-out-persist: path/to/file.txt
         :dvc-out-persist param1: path/to/other
     """
-
-    def __init__(self, path: str, related_param: str = None):
-        super().__init__(path, related_param)
+    __slots__ = ()
 
     @staticmethod
     def from_meta(params: Dict[str, Optional[str]], args: List[str], description: str) -> 'DocstringDvcOutPersist':
@@ -96,7 +94,7 @@ class DocstringDvcOutPersist(DocstringDvc):
         return DocstringDvcOutPersist(description, args[1] if len(args) == 2 else None)
 
 
-class DocstringDvcExtra:
+class DocstringDvcExtra(namedtuple('DocstringDvcExtra', ('extra',))):
     DVC_EXTRA_KEY = 'dvc-extra'
     """
         Syntax
@@ -105,8 +103,7 @@ class DocstringDvcExtra:
         :dvc-extra: --mode train --rate 12
     """
 
-    def __init__(self, extra: str):
-        self.extra = extra
+    __slots__ = ()
 
     @staticmethod
     def from_meta(args: List[str], description: str) -> 'DocstringDvcExtra':
@@ -118,7 +115,7 @@ class DocstringDvcExtra:
         return DocstringDvcExtra(description)
 
 
-class DocstringDvcMetaFile:
+class DocstringDvcMetaFile(namedtuple('DocstringDvcMetaFile', ('file_name',))):
     DVC_META_FILE_KEY = 'dvc-meta-file'
     """
         Syntax
@@ -127,8 +124,7 @@ class DocstringDvcMetaFile:
         :dvc-meta-file: pipeline.dvc
     """
 
-    def __init__(self, file_name: str):
-        self.file_name = file_name
+    __slots__ = ()
 
     @staticmethod
     def from_meta(args: List[str], description: str) -> 'DocstringDvcMetaFile':
@@ -141,7 +137,7 @@ class DocstringDvcMetaFile:
         return DocstringDvcMetaFile(description)
 
 
-class DocstringDvcCommand:
+class DocstringDvcCommand(namedtuple('DocstringDvcCommand', ('cmd',))):
     DVC_CMD_KEY = 'dvc-cmd'
     """
         Syntax
@@ -151,8 +147,7 @@ class DocstringDvcCommand:
 
     """
 
-    def __init__(self, cmd: str):
-        self.cmd = cmd
+    __slots__ = ()
 
     @staticmethod
     def from_meta(args: List[str], description: str) -> 'DocstringDvcCommand':
@@ -167,11 +162,19 @@ class DocstringDvcCommand:
 DvcParams = namedtuple('DvcParams', ('dvc_in', 'dvc_out', 'dvc_out_persist', 'dvc_extra', 'dvc_cmd', 'meta_file_name'))
 
 
-def get_dvc_params(docstring: Docstring) -> DvcParams:
+def get_dvc_params(docstring: Union[ParsedDocstring, Docstring]) -> DvcParams:
     """
         Return a set of dvc docstring parameters
         (dvc dependencies, outputs, extra parameters or whole command)
+        Parameters are memoized by parsed docstring and immutable.
     """
+    if not isinstance(docstring, ParsedDocstring):
+        docstring = freeze_docstring(docstring)
+    return get_frozen_dvc_params(docstring)
+
+
+@lru_cache(maxsize=DOCSTRING_CACHE_SIZE)
+def get_frozen_dvc_params(docstring: ParsedDocstring) -> DvcParams:
     dvc_in = []
     dvc_out = []
     dvc_out_persist = []
@@ -201,16 +204,46 @@ def get_dvc_params(docstring: Docstring) -> DvcParams:
                                f'[{DocstringDvcExtra.DVC_EXTRA_KEY}, {DocstringDvcIn.DVC_IN_KEY}, '
                                f'{DocstringDvcOut.DVC_OUT_KEY}, {DocstringDvcOutPersist.DVC_OUT_PERSIST_KEY}]')
 
-    return DvcParams(dvc_in, dvc_out, dvc_out_persist, dvc_extra,
+    return DvcParams(tuple(dvc_in), tuple(dvc_out), tuple(dvc_out_persist), tuple(dvc_extra),
                      dvc_cmd[0] if dvc_cmd else '', dvc_meta.file_name if dvc_meta else '')
 
 
-def parse_docstring(docstring_str: str) -> Docstring:
+def freeze_docstring(docstring: Docstring) -> ParsedDocstring:
+    """
+        Copy a docstring_parser docstring to an immutable one
+    """
+    return ParsedDocstring(docstring.short_description, docstring.long_description,
+                           tuple(ParsedMeta(tuple(meta.args), meta.description) for meta in docstring.meta),
+                           tuple(ParsedParam(tuple(param.args), param.description, param.arg_name, param.type_name,
+                                             param.is_optional, param.default) for param in docstring.params))
+
+
+@lru_cache(maxsize=DOCSTRING_CACHE_SIZE)
+def parse_frozen_docstring(docstring_str: Optional[str], style: Style) -> ParsedDocstring:
+    return freeze_docstring(dc_parse(docstring_str, style=style))
+
+
+def parse_docstring(docstring_str: Optional[str], style: Style = Style.rest) -> ParsedDocstring:
+    """
+        Parse a docstring, results are memoized by docstring and style and immutable.
+        Templated docstrings must be resolved before parsing.
+    """
     try:
-        docstring = dc_parse(docstring_str, style=Style.rest)
+        return parse_frozen_docstring(docstring_str, style)
     except ParseError as e:
         raise MlVToolException(f'Docstring format error. {e}') from e
-    return docstring
+
+
+def get_docstring_cache_info() -> Dict[str, tuple]:
+    """
+        Return hits, misses, maximum and current sizes of docstring parsing and DVC parameters caches
+    """
+    return {'parse': parse_frozen_docstring.cache_info(), 'dvc_params': get_frozen_dvc_params.cache_info()}
+
+
+def clear_docstring_cache():
+    parse_frozen_docstring.cache_clear()
+    get_frozen_dvc_params.cache_clear()
 
 
 def resolve_docstring(docstring: str, docstring_conf: dict) -> str:
@@ -9,14 +9,14 @@ from typing import List
 
 from mlvtools.cmd import CommandHelper, ArgumentBuilder
 from mlvtools.exception import MlVToolException
-from mlvtools.helper import write_template
+from mlvtools.helper import write_template, BUNDLED_TEMPLATES_PREFIX
 from mlvtools.mlv_dvc.dvc_parser import get_dvc_dependencies
 
 ARG_IDENTIFIER = '-'
 
 CURRENT_DIR = realpath(dirname(__file__))
 
-PIPELINE_EXPORT_TEMPLATE_NAME = 'pipeline-export.tpl'
+PIPELINE_EXPORT_TEMPLATE_NAME = f'{BUNDLED_TEMPLATES_PREFIX}/pipeline-export.tpl'
 ConfigurableCmds = namedtuple('ConfigurableCmds', ('cmds', 'variables'))
 
 
@@ -43,8 +43,7 @@ def export_pipeline(dvc_meta_file: str, output: str, work_dir: str):
     template_data = {'work_dir': work_dir, 'cmds': [dvc_meta.cmd for dvc_meta in ordered_dvc_metas]}
     logging.debug(f'Template data: {template_data}')
 
-    templates_path = join(CURRENT_DIR, 'templates', PIPELINE_EXPORT_TEMPLATE_NAME)
-    write_template(output, templates_path, info=template_data)
+    write_template(output, PIPELINE_EXPORT_TEMPLATE_NAME, info=template_data)
     logging.log(logging.WARNING + 1, f'Pipeline successfully exported in {abspath(output)}')
 
 
@@ -0,0 +1,94 @@
+import json
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+import nbformat
+
+from mlvtools.cache import hash_content, hash_conf, get_mlvtools_version
+from mlvtools.conf.conf import MlVToolConf
+
+FINGERPRINT_PREFIX = '# mlvtools fingerprint:'
+#: Hashes are truncated to keep the fingerprint line short
+HASH_LENGTH = 32
+#: The fingerprint is written in the script header, only first lines are read
+HEADER_LINES = 5
+
+
+def get_source_hash(cells: List[Dict[str, Any]], notebook_name: str, conf: MlVToolConf) -> str:
+    """
+        Hash the notebook normalised sources, the configuration and the generator version.
+        Only cell types and code sources are involved in the generated script syntax tree.
+    """
+    normalised = [(cell['cell_type'], get_cell_source(cell) if cell['cell_type'] == 'code' else '')
+                  for cell in cells]
+    source = json.dumps([normalised, notebook_name, hash_conf(conf), get_mlvtools_version()])
+    return hash_content(source.encode())[:HASH_LENGTH]
+
+
+def get_cell_source(cell: Dict[str, Any]) -> str:
+    source = cell.get('source', '')
+    # Sources are stored as a list of lines in notebook files
+    return ''.join(source) if isinstance(source, list) else source
+
+
+def get_notebook_cells(notebook_content: str) -> List[Dict[str, Any]]:
+    """
+        Return notebook cells, loading the raw json for version 4 notebooks
+    """
+    notebook = json.loads(notebook_content)
+    if 'cells' in notebook:
+        return notebook['cells']
+    return nbformat.reads(notebook_content, as_version=4).cells
+
+
+def get_body_hash(body: str) -> str:
+    return hash_content(body.encode())[:HASH_LENGTH]
+
+
+def split_fingerprint(script_content: str) -> Tuple[Optional[str], str]:
+    """
+        Return the fingerprint line, None if not found, and the script content without it
+    """
+    lines = script_content.split('\n')
+    for index, line in enumerate(lines[:HEADER_LINES]):
+        if line.startswith(FINGERPRINT_PREFIX):
+            return line, '\n'.join(lines[:index] + lines[index + 1:])
+    return None, script_content
+
+
+def add_fingerprint(script_content: str, source_hash: str) -> str:
+    """
+        Add the fingerprint line in the generated script header, after the shebang and the generated from comment
+    """
+    lines = script_content.split('\n')
+    index = 1 if lines and lines[0].startswith('#!') else 0
+    if len(lines) > index and lines[index].startswith('# Generated from'):
+        index += 1
+    fingerprint = f'{FINGERPRINT_PREFIX} source={source_hash} body={get_body_hash(script_content)}'
+    return '\n'.join(lines[:index] + [fingerprint] + lines[index:])
+
+
+def read_fingerprint(fingerprint: str) -> Dict[str, str]:
+    return dict(item.split('=', 1) for item in fingerprint[len(FINGERPRINT_PREFIX):].split() if '=' in item)
+
+
+def is_fingerprint_consistent(notebook_content: str, script_content: str, notebook_name: str,
+                              conf: MlVToolConf) -> bool:
+    """
+        Return true if the script fingerprint proves it is the unmodified conversion of the notebook.
+        False means the consistency is unknown: there is no fingerprint, the script was modified or
+        the notebook, the configuration or mlvtools changed since the generation.
+    """
+    fingerprint_line, body = split_fingerprint(script_content)
+    if not fingerprint_line:
+        return False
+    fingerprint = read_fingerprint(fingerprint_line)
+    if fingerprint.get('body') != get_body_hash(body):
+        logging.debug('Script modified since its generation')
+        return False
+    try:
+        cells = get_notebook_cells(notebook_content)
+    except Exception as e:
+        logging.debug(f'Cannot read notebook cells: {e}')
+        return False
+    return fingerprint.get('source') == get_source_hash(cells, notebook_name, conf)
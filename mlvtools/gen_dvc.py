@@ -1,20 +1,24 @@
 #!/usr/bin/env python3
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from os.path import realpath, dirname
 from os.path import relpath, join, basename
 
 import argparse
-from typing import List
+from typing import List, Dict, Optional
 
 from mlvtools.cmd import CommandHelper, ArgumentBuilder
 from mlvtools.conf.conf import get_dvc_cmd_output_path, load_docstring_conf, MlVToolConf
+from mlvtools.discovery import discover_files, PathFilter
 from mlvtools.docstring_helpers.extract import extract_docstring_from_file, DocstringInfo
 from mlvtools.docstring_helpers.parse import get_dvc_params, DocstringDvc
 from mlvtools.exception import MlVToolException
-from mlvtools.helper import to_cmd_param, to_bash_variable, to_dvc_meta_filename, write_template
+from mlvtools.helper import to_cmd_param, to_bash_variable, to_dvc_meta_filename, write_template, is_stdio, \
+    render_template, BUNDLED_TEMPLATES_PREFIX
+from mlvtools.mlv_dvc.dvc_stage import write_dvc_stage
 
 CURRENT_DIR = realpath(dirname(__file__))
-DVC_CMD_TEMPLATE_NAME = 'dvc-cmd.tpl'
+DVC_CMD_TEMPLATE_NAME = f'{BUNDLED_TEMPLATES_PREFIX}/dvc-cmd.tpl'
 
 
 def get_dvc_template_data(docstring_info: DocstringInfo, working_directory: str,
@@ -31,6 +35,7 @@ def get_dvc_template_data(docstring_info: DocstringInfo, working_directory: str,
 
     info = {
         'variables': variables,
+        'values': {**(extra_variables or {}), meta_file_variable_name: meta_file_name},
         'meta_file_name_var_assign': f'{meta_file_variable_name}="{meta_file_name}"',
         'meta_file_name_var': meta_file_variable_name,
         'whole_command': None,
@@ -57,6 +62,7 @@ def get_dvc_template_data(docstring_info: DocstringInfo, working_directory: str,
                 variable_name = to_bash_variable(dvc_param.related_param)
                 py_cmd_param = to_cmd_param(dvc_param.related_param)
                 info['variables'].append(f'{variable_name}="{dvc_param.file_path}"')
+                info['values'][variable_name] = dvc_param.file_path
                 python_params.append(f'--{py_cmd_param} ${variable_name}')
                 info[label].append(f'${variable_name}')
             else:
@@ -73,27 +79,99 @@ def get_dvc_template_data(docstring_info: DocstringInfo, working_directory: str,
     return info
 
 
-def gen_dvc_command(input_path: str, dvc_output_path: str, conf: MlVToolConf, docstring_conf: dict = None):
-    logging.info(f'Generate DVC command "{dvc_output_path}" from "{input_path}"')
+def gen_dvc_command(input_path: str, dvc_output_path: Optional[str], conf: MlVToolConf, docstring_conf: dict = None,
+                    script_path: str = None, stage_format: str = None, force: bool = False):
+    """
+        Generate the DVC bash command of a python script.
+        The script path referenced by the command defaults to the input path, it must be
+        provided when the script content is read from stdin.
+        With a stage format, the DVC stage definition is written instead of the command, the DVC
+        output path is not used and an existing stage is only overwritten if forced.
+    """
+    if stage_format:
+        logging.info(f'Generate DVC stage ({stage_format}) from "{input_path}"')
+    else:
+        logging.info(f'Generate DVC command "{dvc_output_path}" from "{input_path}"')
     logging.debug(f'Global configuration {conf}')
     logging.debug(f'Docstring configuration {docstring_conf}')
 
+    script_path = script_path or input_path
+    if is_stdio(script_path):
+        raise MlVToolException('The python script path is mandatory if the script is read from stdin')
+
     docstring_info = extract_docstring_from_file(input_path, docstring_conf)
+    if stage_format:
+        write_dvc_stage(get_dvc_command_template_data(docstring_info, script_path, conf), stage_format, force)
+    else:
+        write_dvc_command(docstring_info, script_path, dvc_output_path, conf)
 
-    python_cmd_rel_path = relpath(input_path, conf.top_directory)
+
+def get_dvc_command_template_data(docstring_info: DocstringInfo, script_path: str, conf: MlVToolConf) -> dict:
+    """
+        Format data for the DVC bash command template of a python script from its extracted docstring
+    """
+    python_cmd_rel_path = relpath(script_path, conf.top_directory)
     extra_var = {conf.dvc_var_python_cmd_path: python_cmd_rel_path,
                  conf.dvc_var_python_cmd_name: basename(python_cmd_rel_path)}
-    info = get_dvc_template_data(docstring_info,
+    return get_dvc_template_data(docstring_info,
                                  conf.top_directory,
                                  python_cmd_rel_path,
                                  conf.dvc_var_meta_filename,
                                  conf.path.dvc_metadata_root_dir if conf.path else '',
                                  extra_var)
 
-    templates_path = join(CURRENT_DIR, 'templates', DVC_CMD_TEMPLATE_NAME)
-    write_template(dvc_output_path, templates_path, info=info)
 
-    logging.log(logging.WARNING + 1, f'DVC bash command successfully generated in {dvc_output_path}')
+def get_dvc_meta_file_path(docstring_info: DocstringInfo, script_path: str, conf: MlVToolConf) -> str:
+    """
+        Return the DVC meta file path of a python script, from its docstring if it is overridden
+    """
+    info = get_dvc_command_template_data(docstring_info, script_path, conf)
+    return join(conf.top_directory, info['values'][info['meta_file_name_var']])
+
+
+def get_dvc_command(docstring_info: DocstringInfo, script_path: str, conf: MlVToolConf,
+                    dvc_output_path: str = '-') -> str:
+    """
+        Render in memory the DVC bash command of a python script from its extracted docstring
+    """
+    info = get_dvc_command_template_data(docstring_info, script_path, conf)
+    return render_template(DVC_CMD_TEMPLATE_NAME, dvc_output_path, info=info)
+
+
+def write_dvc_command(docstring_info: DocstringInfo, script_path: str, dvc_output_path: str, conf: MlVToolConf):
+    """
+        Write the DVC bash command of a python script from its extracted docstring
+    """
+    info = get_dvc_command_template_data(docstring_info, script_path, conf)
+    write_template(dvc_output_path, DVC_CMD_TEMPLATE_NAME, info=info)
+
+    if not is_stdio(dvc_output_path):
+        logging.log(logging.WARNING + 1, f'DVC bash command successfully generated in {dvc_output_path}')
+
+
+def gen_dvc_command_task(script: str, conf: MlVToolConf, docstring_conf: dict = None,
+                         stage_format: str = None, force: bool = False) -> Optional[str]:
+    """
+        Generate the DVC command of a script to its conf output path, or its DVC stage, return the error if any
+    """
+    dvc_output_path = None if stage_format else get_dvc_cmd_output_path(script, conf)
+    try:
+        gen_dvc_command(script, dvc_output_path, conf, docstring_conf, stage_format=stage_format, force=force)
+    except MlVToolException as e:
+        return str(e)
+    return None
+
+
+def gen_dvc_commands(scripts: List[str], conf: MlVToolConf, docstring_conf: dict = None,
+                     jobs: int = None, stage_format: str = None, force: bool = False) -> Dict[str, str]:
+    """
+        Generate the DVC commands of scripts sharing the same configurations, return errors by script.
+        Generation is mostly I/O, scripts are handled in a thread pool sharing the compiled template.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        errors = executor.map(lambda script: gen_dvc_command_task(script, conf, docstring_conf, stage_format, force),
+                              scripts)
+        return {script: error for script, error in zip(scripts, errors) if error}
 
 
 class MlScriptToCmd(CommandHelper):
@@ -106,19 +184,68 @@ class MlScriptToCmd(CommandHelper):
             .add_force_argument() \
             .add_docstring_conf() \
             .add_path_argument('-i', '--input-script', type=str, required=True,
-                               help='The python input script') \
+                               help='The python input script, use - to read it from stdin') \
             .add_path_argument('-o', '--out-dvc-cmd', type=str,
-                               help='Path to the generated bash dvc command') \
+                               help='Path to the generated bash dvc command, use - to write it on stdout') \
+            .add_path_argument('--script-path', type=str,
+                               help='Path of the python script called by the DVC command. Mandatory if the '
+                                    'script is read from stdin. Defaults to the input script path.') \
+            .add_dvc_stage_argument() \
             .parse(args)
 
         self.set_log_level(args)
         conf = self.get_conf(args.working_directory, args.input_script, args.conf_path)
         docstring_conf_path = args.docstring_conf or conf.docstring_conf
 
-        if not conf.path and not args.out_dvc_cmd:
+        if not conf.path and not args.out_dvc_cmd and not args.dvc_stage:
             raise MlVToolException('Parameter --out-dvc-cmd is mandatory if no conf provided')
 
+        script_path = args.script_path or args.input_script
+        if is_stdio(script_path):
+            raise MlVToolException('Parameter --script-path is mandatory if the script is read from stdin')
+
         docstring_conf = load_docstring_conf(docstring_conf_path) if docstring_conf_path else None
-        out_dvc_cmd = args.out_dvc_cmd or get_dvc_cmd_output_path(args.input_script, conf)
+        if args.dvc_stage:
+            # Stage target depends on the docstring, it is checked when the stage is written
+            gen_dvc_command(args.input_script, None, conf, docstring_conf, script_path, args.dvc_stage, args.force)
+            return
+        out_dvc_cmd = args.out_dvc_cmd or get_dvc_cmd_output_path(script_path, conf)
         self.check_force(args.force, [out_dvc_cmd])
-        gen_dvc_command(args.input_script, out_dvc_cmd, conf, docstring_conf)
+        gen_dvc_command(args.input_script, out_dvc_cmd, conf, docstring_conf, script_path)
+
+
+class MlAllScriptsToCmd(CommandHelper):
+
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Generate DVC commands of all python scripts from the script directory. '
+                                           'DVC command names are deduce from the conf.') \
+            .add_work_dir_argument() \
+            .add_conf_path_argument() \
+            .add_force_argument() \
+            .add_docstring_conf() \
+            .add_path_argument('-s', '--scripts-dir', type=str,
+                               help='Python scripts directory. Defaults to the conf python script directory.') \
+            .add_discovery_arguments('script') \
+            .add_jobs_argument() \
+            .add_dvc_stage_argument() \
+            .parse(args)
+
+        self.set_log_level(args)
+        conf = self.get_conf(args.working_directory, args.scripts_dir, args.conf_path)
+        if not conf.path:
+            raise MlVToolException('Configuration file is mandatory')
+        docstring_conf_path = args.docstring_conf or conf.docstring_conf
+        docstring_conf = load_docstring_conf(docstring_conf_path) if docstring_conf_path else None
+
+        scripts_dir = args.scripts_dir or join(conf.top_directory, conf.path.python_script_root_dir)
+        scripts = discover_files(scripts_dir, '.py', PathFilter(args.include, args.ignore), args.recursive)
+        # DVC stages targets depend on scripts docstrings, they are checked when stages are written
+        if not args.dvc_stage:
+            self.check_force(args.force, [get_dvc_cmd_output_path(script, conf) for script in scripts])
+
+        errors = gen_dvc_commands(scripts, conf, docstring_conf, args.jobs, args.dvc_stage, args.force)
+        for script, error in errors.items():
+            logging.error(f'Cannot generate DVC command of {script}: {error}')
+        if errors:
+            raise MlVToolException(f'{len(errors)} of {len(scripts)} DVC command(s) cannot be generated')
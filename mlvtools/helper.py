@@ -1,18 +1,40 @@
 import logging
+import os
 import re
+import sys
+import time
 from collections import namedtuple
+from functools import lru_cache
 from os import chmod, makedirs
-from os.path import splitext, basename, dirname
+from os.path import splitext, basename, dirname, join, realpath, getmtime, abspath
+from typing import List, Optional, Tuple, Callable, Any, Dict
 
-from jinja2 import TemplateError, StrictUndefined, UndefinedError
+import yaml
+
+from jinja2 import TemplateError, StrictUndefined, UndefinedError, ChoiceLoader, FileSystemLoader, FunctionLoader, \
+    FileSystemBytecodeCache, Template, PrefixLoader
 from jinja2.environment import Environment
-from typing import List
 from yapf.yapflib.yapf_api import FormatCode
 
 from mlvtools.exception import MlVToolException
 
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:  # PyYAML without libyaml
+    from yaml import SafeLoader as YamlSafeLoader
+
 MLV_PREFIX = 'mlvtools_'
 MAX_LINE_LENGTH = 120
+#: Path value used on the command line to read from stdin or write to stdout
+STDIO_PATH = '-'
+#: Files modified less than this delay (in seconds) ago are not trusted from their stat
+RACY_DELAY = 2
+#: Directory of templates bundled with mlvtools, they can be rendered by name
+TEMPLATES_DIR = join(dirname(realpath(__file__)), 'templates')
+#: Namespace of bundled templates names, to not shadow user templates paths (ex: mlvtools/dvc-cmd.tpl)
+BUNDLED_TEMPLATES_PREFIX = 'mlvtools'
+#: Maximum number of compiled string templates kept in memory
+STRING_TEMPLATE_CACHE_SIZE = 256
 
 
 def to_cmd_param(variable: str) -> str:
@@ -74,10 +96,84 @@ def to_instructions_list(source: str) -> List[str]:
 
 
 def to_sanitized_path(path: str):
-    """ Ensure path starts with / """
+    """ Ensure path starts with / (stdin/stdout path is kept as is) """
+    if path == STDIO_PATH:
+        return path
     return path if path.startswith(('/', './')) else f'./{path}'
 
 
+def is_stdio(path: str) -> bool:
+    """
+        Return true if the given path means stdin or stdout
+    """
+    return path == STDIO_PATH
+
+
+def read_stdin() -> str:
+    """
+        Read the whole standard input content
+    """
+    try:
+        return sys.stdin.read()
+    except IOError as e:
+        raise MlVToolException('Cannot read from stdin') from e
+
+
+def write_output(output_path: str, content: str):
+    """
+        Write content into output path or on stdout if the output path is '-'.
+        Parent directories are created and the file is made executable.
+    """
+    if is_stdio(output_path):
+        sys.stdout.write(content)
+        sys.stdout.flush()
+        return
+    makedirs(dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as fd:
+        fd.write(content)
+    chmod(output_path, 0o755)
+
+
+#: Parsed YAML files indexed by absolute path, with the (inode, size, mtime) signature they were parsed with
+YAML_CACHE: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+
+
+def load_yaml_content(content: str) -> Any:
+    """
+        Parse YAML content as the pure Python safe loader does, with the libyaml safe loader when available.
+        libyaml also accepts tabs as separators and its errors differ: contents with tabs or rejected by
+        libyaml are parsed with the pure Python loader.
+    """
+    if '\t' not in content:
+        try:
+            return yaml.load(content, Loader=YamlSafeLoader)
+        except yaml.YAMLError:
+            pass
+    return yaml.load(content, Loader=yaml.SafeLoader)
+
+
+def load_yaml_file(path: str) -> Any:
+    """
+        Load a YAML file, see load_yaml_content.
+        Parsed contents are memoized by path and stat signature for the process lifetime, they are
+        shared between callers which must not modify them.
+    """
+    path_stat = os.stat(path)
+    signature = (path_stat.st_ino, path_stat.st_size, path_stat.st_mtime_ns)
+    key = abspath(path)
+    cached = YAML_CACHE.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(path, 'r') as fd:
+        content = fd.read()
+    data = load_yaml_content(content)
+    # A file modified too recently could be modified again with the same signature
+    if signature[2] < (time.time() - RACY_DELAY) * 1e9:
+        YAML_CACHE[key] = (signature, data)
+    return data
+
+
 TypeInfo = namedtuple('TypeInfo', ('type_name', 'is_list'))
 
 
@@ -103,24 +199,63 @@ def extract_type(type_name: str) -> TypeInfo:
     return TypeInfo(None, is_list=False)
 
 
+def load_template_file(template_path: str) -> Optional[Tuple[str, str, Callable[[], bool]]]:
+    """
+        Load a template from its path, it is reloaded when its modification time changes
+    """
+    try:
+        mtime = getmtime(template_path)
+        with open(template_path, 'r') as template_fd:
+            source = template_fd.read()
+    except IOError:
+        return None
+
+    def is_up_to_date() -> bool:
+        try:
+            return getmtime(template_path) == mtime
+        except OSError:
+            return False
+    return source, template_path, is_up_to_date
+
+
+@lru_cache(maxsize=None)
+def get_jinja_environment() -> Environment:
+    """
+        Return the process wide Jinja environment. Templates are loaded by path first, then bundled
+        templates by their namespaced name or by their bare name if no such file exists.
+        Compiled templates are cached in memory and their bytecode on disk.
+    """
+    try:
+        bytecode_cache = FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logging.debug(f'Jinja bytecode cache disabled: {e}')
+        bytecode_cache = None
+    return Environment(undefined=StrictUndefined,
+                       loader=ChoiceLoader([FunctionLoader(load_template_file),
+                                            PrefixLoader({BUNDLED_TEMPLATES_PREFIX: FileSystemLoader(TEMPLATES_DIR)}),
+                                            FileSystemLoader(TEMPLATES_DIR)]),
+                       bytecode_cache=bytecode_cache)
+
+
+@lru_cache(maxsize=STRING_TEMPLATE_CACHE_SIZE)
+def get_string_template(string_template: str) -> Template:
+    return get_jinja_environment().from_string(string_template)
+
+
 def render_string_template(string_template: str, **kwargs) -> str:
     """
-        Render a Jinja string template
+        Render a Jinja string template, compiled templates are memoized by source
     """
-    return Environment(undefined=StrictUndefined).from_string(string_template).render(**kwargs)
+    return get_string_template(string_template).render(**kwargs)
 
 
-def write_template(output_path, template_path: str, **kwargs):
+def render_template(template_path: str, output_path: str, **kwargs) -> str:
     """
-        Write an executable output file using Jinja template.
+        Render the content of an output file using Jinja template.
+        The template is a path or the namespaced name of a bundled template.
     """
-    logging.info(f'Write command {output_path} using template {basename(template_path)}')
     try:
-        makedirs(dirname(output_path), exist_ok=True)
-        with open(template_path, 'r') as template_fd, open(output_path, 'w') as fd:
-            content = render_string_template(template_fd.read(), **kwargs)
-            fd.write(content)
-        chmod(output_path, 0o755)
+        return get_jinja_environment().get_template(template_path).render(**kwargs)
     except IOError as e:
         raise MlVToolException(f'Cannot create executable {output_path} using template {template_path}') from e
     except UndefinedError as e:
@@ -130,19 +265,37 @@ def write_template(output_path, template_path: str, **kwargs):
         raise MlVToolException(f'Cannot render {output_path} using template {template_path}') from e
 
 
-def write_python_script(script_content: str, output_path: str):
+def write_template(output_path, template_path: str, **kwargs):
     """
-        Write Python 3 generated code into an executable file
-        - use yapf for code format
+        Write an executable output file using Jinja template.
+    """
+    logging.info(f'Write command {output_path} using template {basename(template_path)}')
+    content = render_template(template_path, output_path, **kwargs)
+    try:
+        write_output(output_path, content)
+    except IOError as e:
+        raise MlVToolException(f'Cannot create executable {output_path} using template {template_path}') from e
+
+
+def format_python_script(script_content: str) -> str:
+    """
+        Format Python 3 generated code using yapf
     """
     try:
-        makedirs(dirname(output_path), exist_ok=True)
         formatted_script = FormatCode(script_content, style_config=f'{{ based_on_style: pep8, '
                                                                    f'column_limit: {MAX_LINE_LENGTH} }}')
-        with open(output_path, 'w') as fd:
-            fd.write(formatted_script[0])
-        chmod(output_path, 0o755)
+        return formatted_script[0]
     except SyntaxError as e:
         raise MlVToolException(f'Cannot write generated Python, content is wrongly formatted: {script_content}') from e
+
+
+def write_python_script(script_content: str, output_path: str):
+    """
+        Write Python 3 generated code into an executable file
+        - use yapf for code format
+    """
+    formatted_script = format_python_script(script_content)
+    try:
+        write_output(output_path, formatted_script)
     except IOError as e:
         raise MlVToolException(f'Cannot write generated Python script {output_path}') from e
@@ -1,12 +1,72 @@
 #!/usr/bin/env python3
 import argparse
+import ast
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from os.path import abspath
+from typing import Dict, Any, Optional
 
 from mlvtools.cmd import CommandHelper, ArgumentBuilder
 from mlvtools.conf.conf import get_script_output_path, load_docstring_conf, \
-    get_dvc_cmd_output_path
+    get_dvc_cmd_output_path, MlVToolConf
+from mlvtools.docstring_helpers.extract import DocstringInfo, get_docstring_info, extract_docstring_from_content
 from mlvtools.exception import MlVToolException
-from mlvtools.gen_dvc import gen_dvc_command
-from mlvtools.ipynb_to_python import export_to_script
+from mlvtools.gen_dvc import write_dvc_command
+from mlvtools.helper import to_method_name
+from mlvtools.ipynb_to_python import convert_notebook, write_generated_script
+
+
+def get_generated_docstring(docstring: str) -> Optional[str]:
+    """
+        Return the docstring of the generated method as it is read back from the script,
+        without parsing the whole script. The template writes each docstring line indented
+        in the method body. Return None if it can not be evaluated.
+    """
+    indented_docstring = '\n'.join(f'    {line}' for line in docstring.split('\n')).strip()
+    try:
+        value = ast.literal_eval(indented_docstring)
+    except (SyntaxError, ValueError):
+        return None
+    return inspect.cleandoc(value) if isinstance(value, str) else None
+
+
+def get_script_docstring_info(script_content: str, resources: Dict[str, Any], script_path: str,
+                              docstring_conf: dict = None) -> DocstringInfo:
+    """
+        Get the generated script docstring information from conversion resources.
+        Fallback on the in memory script content if the docstring is not in resources.
+    """
+    docstring_wrapper = resources.get('docstring_wrapper')
+    docstring_str = get_generated_docstring(docstring_wrapper.docstring) \
+        if docstring_wrapper and docstring_wrapper.docstring else None
+    if docstring_str is None:
+        return extract_docstring_from_content(script_content, script_path, docstring_conf)
+    method_name = to_method_name(resources['metadata']['name'])
+    return get_docstring_info(method_name, docstring_str, script_path, docstring_conf)
+
+
+def export_to_script_and_dvc(notebook_path: str, output_script: str, out_dvc_cmd: str, conf: MlVToolConf,
+                             docstring_conf: dict = None):
+    """
+        Convert a notebook to a python script and generate its DVC command in a single pass.
+        The docstring extracted during conversion is directly used for DVC command generation,
+        then both outputs are written concurrently.
+    """
+    logging.info(f'Generate Python script {output_script} and DVC command {out_dvc_cmd} '
+                 f'from Jupyter Notebook {notebook_path}')
+    script_content, resources = convert_notebook(notebook_path, conf)
+    if not script_content:
+        logging.warning('Empty notebook provided. Nothing to do.')
+        return
+    docstring_info = get_script_docstring_info(script_content, resources, output_script, docstring_conf)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        script_future = executor.submit(write_generated_script, script_content, resources, output_script)
+        dvc_future = executor.submit(write_dvc_command, docstring_info, output_script, out_dvc_cmd, conf)
+        script_future.result()
+        dvc_future.result()
+    logging.log(logging.WARNING + 1, f'Python script successfully generated in {abspath(output_script)}')
 
 
 class IPynbToDvc(CommandHelper):
@@ -32,5 +92,4 @@ class IPynbToDvc(CommandHelper):
         out_dvc_cmd = get_dvc_cmd_output_path(output_script, conf)
         self.check_force(args.force, [output_script, out_dvc_cmd])
 
-        export_to_script(args.notebook, output_script, conf)
-        gen_dvc_command(output_script, out_dvc_cmd, conf, docstring_conf)
+        export_to_script_and_dvc(args.notebook, output_script, out_dvc_cmd, conf, docstring_conf)
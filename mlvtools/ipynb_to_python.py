@@ -2,11 +2,12 @@
 import argparse
 import logging
 from collections import namedtuple
+from functools import lru_cache
 from os.path import abspath
-from os.path import realpath, dirname, join
-from typing import List, Tuple, Dict, Any
+from os.path import realpath, dirname, join, basename, splitext
+from typing import List, Tuple, Dict, Any, Optional
 
-from docstring_parser.parser import Docstring
+import nbformat
 from nbconvert import PythonExporter
 from nbconvert.filters import ipython2python, comment_lines
 from nbformat import NotebookNode
@@ -14,9 +15,11 @@ from nbformat import NotebookNode
 from mlvtools.cmd import CommandHelper, ArgumentBuilder
 from mlvtools.conf.conf import get_script_output_path, MlVToolConf, DEFAULT_IGNORE_KEY
 from mlvtools.docstring_helpers.extract import extract_docstring
-from mlvtools.docstring_helpers.parse import parse_docstring
+from mlvtools.docstring_helpers.parse import parse_docstring, ParsedDocstring
 from mlvtools.exception import MlVToolException
-from mlvtools.helper import to_method_name, extract_type, to_cmd_param, to_instructions_list, write_python_script
+from mlvtools.fingerprint import get_source_hash, add_fingerprint
+from mlvtools.helper import to_method_name, extract_type, to_cmd_param, to_instructions_list, write_python_script, \
+    is_stdio, read_stdin, format_python_script, write_output
 
 CURRENT_DIR = realpath(dirname(__file__))
 TEMPLATE_PATH = join(CURRENT_DIR, 'templates', 'ml-python.tpl')
@@ -39,18 +42,21 @@ def export_to_script(input_notebook_path: str, output_path: str, conf: MlVToolCo
     logging.debug(f'Global Configuration: {conf}')
     logging.debug(f'Template path {TEMPLATE_PATH}')
 
-    script_content = get_converted_script(input_notebook_path, conf)
+    script_content, resources = convert_notebook(input_notebook_path, conf)
 
     if not script_content:
         logging.warning('Empty notebook provided. Nothing to do.')
         return
-    write_python_script(script_content, output_path)
-    logging.log(logging.WARNING + 1, f'Python script successfully generated in {abspath(output_path)}')
+    write_generated_script(script_content, resources, output_path)
+    if not is_stdio(output_path):
+        logging.log(logging.WARNING + 1, f'Python script successfully generated in {abspath(output_path)}')
 
 
-def get_converted_script(input_notebook_path: str, conf: MlVToolConf) -> str:
+@lru_cache(maxsize=None)
+def get_exporter() -> PythonExporter:
     """
-        Extract notebook python content using nbconvert
+        Return a python exporter configured with the mlvtools template and filters
+        The exporter is created once and kept warm for next conversions
     """
     exporter = PythonExporter(get_config(TEMPLATE_PATH))
     exporter.register_filter(name='filter_trailing_cells',
@@ -61,16 +67,96 @@ def get_converted_script(input_notebook_path: str, conf: MlVToolConf) -> str:
                              jinja_filter=get_data_from_docstring)
     exporter.register_filter(name='sanitize_method_name',
                              jinja_filter=to_method_name)
+    return exporter
+
+
+def get_converted_script(input_notebook_path: str, conf: MlVToolConf) -> str:
+    """
+        Extract notebook python content using nbconvert
+        The notebook is read from stdin if its path is '-'
+    """
+    script_content, _ = convert_notebook(input_notebook_path, conf)
+    return script_content
+
+
+def convert_notebook(input_notebook_path: str, conf: MlVToolConf) -> Tuple[str, Dict[str, Any]]:
+    """
+        Extract notebook python content and conversion resources using nbconvert
+        Resources hold the notebook metadata and the extracted docstring wrapper
+        The notebook is read from stdin if its path is '-'
+    """
+    if is_stdio(input_notebook_path):
+        return convert_notebook_content(read_stdin(), conf)
+    return convert_notebook_node(read_notebook(input_notebook_path), conf, input_notebook_path)
+
+
+def get_converted_script_from_content(notebook_content: str, conf: MlVToolConf, notebook_path: str = None) -> str:
+    """
+        Extract python content from an in memory notebook using nbconvert
+        The notebook path, if provided, is only used to name the generated method
+    """
+    script_content, _ = convert_notebook_content(notebook_content, conf, notebook_path)
+    return script_content
+
+
+def convert_notebook_content(notebook_content: str, conf: MlVToolConf,
+                             notebook_path: str = None) -> Tuple[str, Dict[str, Any]]:
+    """
+        Extract python content and conversion resources from an in memory notebook using nbconvert
+    """
+    try:
+        notebook = nbformat.reads(notebook_content, as_version=4)
+    except Exception as e:
+        raise MlVToolException(e) from e
+    return convert_notebook_node(notebook, conf, notebook_path)
+
+
+def convert_notebook_node(notebook: NotebookNode, conf: MlVToolConf,
+                          notebook_path: str = None) -> Tuple[str, Dict[str, Any]]:
+    """
+        Extract python content and conversion resources from a notebook node using nbconvert
+        If the notebook path is known, the notebook source hash is kept in resources to fingerprint the script
+    """
+    exporter = get_exporter()
     resources = {'ignore_keys': conf.ignore_keys}
+    if notebook_path:
+        notebook_name = splitext(basename(notebook_path))[0]
+        resources['metadata'] = {'name': notebook_name,
+                                 'path': dirname(notebook_path)}
+        resources['source_hash'] = get_source_hash(notebook.cells, notebook_name, conf)
     logging.debug(f'Template info {resources}')
     try:
-        script_content, _ = exporter.from_filename(input_notebook_path, resources=resources)
+        return exporter.from_notebook_node(notebook, resources=resources)
     except Exception as e:
         raise MlVToolException(e) from e
-    return script_content
 
 
-def get_arguments_from_docstring(docstring_data: Docstring) -> list:
+def read_notebook(notebook_path: str) -> NotebookNode:
+    """
+        Read a notebook file as a version 4 notebook node
+    """
+    try:
+        return nbformat.read(notebook_path, as_version=4)
+    except Exception as e:
+        raise MlVToolException(e) from e
+
+
+def write_generated_script(script_content: str, resources: Dict[str, Any], output_path: str):
+    """
+        Write a generated Python script with its fingerprint, if the notebook source hash is known
+    """
+    source_hash = resources.get('source_hash')
+    if not source_hash:
+        write_python_script(script_content, output_path)
+        return
+    script_content = add_fingerprint(format_python_script(script_content), source_hash)
+    try:
+        write_output(output_path, script_content)
+    except IOError as e:
+        raise MlVToolException(f'Cannot write generated Python script {output_path}') from e
+
+
+def get_arguments_from_docstring(docstring_data: ParsedDocstring) -> list:
     """
         Extract Python command line arguments from docstring
     """
@@ -89,21 +175,21 @@ def get_arguments_from_docstring(docstring_data: Docstring) -> list:
     return arguments_params
 
 
-def get_arguments_as_param(docstring_data: Docstring) -> str:
+def get_arguments_as_param(docstring_data: ParsedDocstring) -> str:
     """
         Get formatted parameter for python method call
     """
     return ', '.join([f'args.{arg.arg_name}' for arg in docstring_data.params])
 
 
-def get_param_as_python_method_format(docstring_data: Docstring) -> str:
+def get_param_as_python_method_format(docstring_data: ParsedDocstring) -> str:
     """
         Extract parameters from a docstring then format them
     """
     return ', '.join(f'{p.arg_name}' for p in docstring_data.params)
 
 
-def get_docstring_data(cell_content: str) -> Tuple[Docstring, str]:
+def get_docstring_data(cell_content: str) -> Tuple[ParsedDocstring, str]:
     """
         Extract docstring and formatted parameters from a cell content
     """
@@ -111,29 +197,37 @@ def get_docstring_data(cell_content: str) -> Tuple[Docstring, str]:
     if docstring_str:
         return parse_docstring(docstring_str), f'"""\n{docstring_str}\n"""'
     logging.warning("Docstring not found.")
-    return Docstring(), ''
+    return parse_docstring(''), ''
 
 
-def get_data_from_docstring(cells: List[NotebookNode]):
+def get_data_from_docstring(cells: List[NotebookNode], resource: Dict[str, Any] = None):
     """
         Extract parameters from the first code cell and remove it
+        The extracted data is kept in resource, if provided, to be reused after conversion
     """
     logging.info('Find docstring cell')
     try:
         first_code_cell = next(cell for cell in cells if is_code_cell(cell))
     except StopIteration:
         logging.warning('No code cell found.')
-        return DocstringWrapper('', '', [], '')
+        extracted_data = DocstringWrapper('', '', [], '')
+        if resource is not None:
+            resource['docstring_wrapper'] = extracted_data
+        return extracted_data
     docstring_data, docstring_str = get_docstring_data(first_code_cell.source)
 
     function_params = get_param_as_python_method_format(docstring_data)
     cmd_line_arguments = get_arguments_from_docstring(docstring_data)
     arguments_as_param = get_arguments_as_param(docstring_data)
     if function_params:
+        if resource is not None:
+            resource['docstring_cell_index'] = cells.index(first_code_cell)
         cells.remove(first_code_cell)
     extracted_data = DocstringWrapper(docstring_str, function_params, cmd_line_arguments,
                                       arguments_as_param)
     logging.debug(f'Extracted data from docstring cell: {extracted_data}')
+    if resource is not None:
+        resource['docstring_wrapper'] = extracted_data
     return extracted_data
 
 
@@ -172,24 +266,50 @@ def get_formatted_cells(cells: List[Dict[str, Any]], resource: Dict[str, Any]) -
     """
         Format Notebook cells as a list of string instructions. Remove no effect cells.
         Return default cell if cells list is empty
+        Formatted cells and their notebook cell index are kept in resource to locate script lines
     """
     # No code content
     if len(cells) == 0:
         logging.warning('Notebook to Python conversion: no code content')
+        resource['formatted_cells'] = []
         return [['pass']]
 
-    filtered_cells = []
-    for cell in cells:
+    # The docstring cell may have been removed from cells, keep original notebook indexes
+    docstring_cell_index = resource.get('docstring_cell_index')
+    formatted_cells = []
+    for index, cell in enumerate(cells):
         if cell['cell_type'] == 'code':
             if is_no_effect(cell['source'], resource):
                 continue
             cell_content = ipython2python(cell['source'])
-            filtered_cells.append(to_instructions_list(cell_content))
         else:
             cell_content = comment_lines(cell['source'].strip('\n'))
-            filtered_cells.append(to_instructions_list(cell_content))
+        notebook_index = index + 1 if docstring_cell_index is not None and index >= docstring_cell_index else index
+        formatted_cells.append((notebook_index, to_instructions_list(cell_content)))
 
-    return filtered_cells
+    resource['formatted_cells'] = formatted_cells
+    return [instructions for _, instructions in formatted_cells]
+
+
+def get_notebook_cell_index(script_content: str, resources: Dict[str, Any], line: int) -> Optional[int]:
+    """
+        Return the index of the notebook cell a generated script line comes from, None if the line
+        is not part of a cell. Cells are written in order and indented in the generated method body.
+    """
+    script_lines = script_content.split('\n')
+    # Start after the method definition to avoid matching the header
+    cursor = next((index + 1 for index, script_line in enumerate(script_lines) if script_line.startswith('def ')), 0)
+    for notebook_index, instructions in resources.get('formatted_cells', []):
+        cell_lines = [f'    {instruction}'.rstrip() for instruction in instructions]
+        while cursor + len(cell_lines) <= len(script_lines) and \
+                [script_line.rstrip() for script_line in script_lines[cursor:cursor + len(cell_lines)]] != cell_lines:
+            cursor += 1
+        if cursor + len(cell_lines) > len(script_lines):
+            return None
+        if cursor < line <= cursor + len(cell_lines):
+            return notebook_index
+        cursor += len(cell_lines)
+    return None
 
 
 def is_code_cell(cell: NotebookNode) -> bool:
@@ -205,15 +325,17 @@ class IPynbToPython(CommandHelper):
             .add_conf_path_argument() \
             .add_force_argument() \
             .add_path_argument('-n', '--notebook', type=str, required=True,
-                               help='The notebook to convert') \
+                               help='The notebook to convert, use - to read it from stdin') \
             .add_path_argument('-o', '--output', type=str,
-                               help='The Python script output path') \
+                               help='The Python script output path, use - to write it on stdout') \
             .parse(args)
         self.set_log_level(args)
         conf = self.get_conf(args.working_directory, args.notebook, args.conf_path)
 
         if not conf.path and not args.output:
             raise MlVToolException('Parameter --output is mandatory if no conf provided')
+        if is_stdio(args.notebook) and not args.output:
+            raise MlVToolException('Parameter --output is mandatory if the notebook is read from stdin')
 
         output = args.output or get_script_output_path(args.notebook, conf)
 
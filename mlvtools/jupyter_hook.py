@@ -0,0 +1,142 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from os.path import dirname, exists, abspath, join
+from typing import Optional, Dict, List
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME, load_conf_or_default, load_docstring_conf, \
+    get_script_output_path, get_dvc_cmd_output_path
+from mlvtools.exception import MlVToolException
+from mlvtools.ipynb_to_dvc import export_to_script_and_dvc
+
+#: Delay in seconds without new save before a notebook is regenerated
+DEBOUNCE_DELAY = 2.
+
+
+def find_conf_path(notebook_path: str) -> Optional[str]:
+    """
+        Return the closest configuration file found in the notebook directory or its parents
+    """
+    current_dir = dirname(abspath(notebook_path))
+    while True:
+        conf_path = join(current_dir, DEFAULT_CONF_FILENAME)
+        if exists(conf_path):
+            return conf_path
+        parent_dir = dirname(current_dir)
+        if parent_dir == current_dir:
+            return None
+        current_dir = parent_dir
+
+
+def regenerate_notebook(notebook_path: str):
+    """
+        Generate the python script and the DVC command of a notebook using its project configuration.
+        Notebooks outside of an mlvtools project are ignored.
+    """
+    conf_path = find_conf_path(notebook_path)
+    if not conf_path:
+        logging.debug(f'No configuration found for {notebook_path}, skip regeneration')
+        return
+    try:
+        conf = load_conf_or_default(conf_path, dirname(conf_path))
+        if not conf.path:
+            logging.debug(f'No path configuration in {conf_path}, skip regeneration')
+            return
+        docstring_conf = load_docstring_conf(conf.docstring_conf) if conf.docstring_conf else None
+        output_script = get_script_output_path(notebook_path, conf)
+        out_dvc_cmd = get_dvc_cmd_output_path(output_script, conf)
+        export_to_script_and_dvc(notebook_path, output_script, out_dvc_cmd, conf, docstring_conf)
+    except MlVToolException as e:
+        logging.error(f'Cannot regenerate script and DVC command from {notebook_path}: {e}')
+    except Exception as e:
+        logging.error(f'Unexpected error while regenerating {notebook_path}: {e}')
+        logging.debug('Reason: ', exc_info=True)
+
+
+class NotebookRegenerator:
+    """
+        Regenerate notebooks in a background worker, out of the save critical path.
+        Rapid saves of the same notebook are debounced: the regeneration only happens
+        once no save occurred during the delay.
+    """
+
+    def __init__(self, delay: float = DEBOUNCE_DELAY, regenerate=regenerate_notebook):
+        self.delay = delay
+        self.regenerate = regenerate
+        self.lock = threading.Lock()
+        self.timers: Dict[str, threading.Timer] = {}
+        self.futures: List[Future] = []
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def schedule(self, notebook_path: str):
+        """
+            Schedule a notebook regeneration, postponing any pending one
+        """
+        with self.lock:
+            pending_timer = self.timers.pop(notebook_path, None)
+            if pending_timer:
+                pending_timer.cancel()
+            timer = threading.Timer(self.delay, self._submit, args=(notebook_path,))
+            timer.daemon = True
+            self.timers[notebook_path] = timer
+            timer.start()
+
+    def _submit(self, notebook_path: str):
+        with self.lock:
+            self.timers.pop(notebook_path, None)
+            self.futures = [future for future in self.futures if not future.done()]
+            self.futures.append(self.executor.submit(self.regenerate, notebook_path))
+
+    def join(self):
+        """
+            Wait for pending and running regenerations
+        """
+        with self.lock:
+            timers = list(self.timers.values())
+        for timer in timers:
+            timer.join()
+        with self.lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.result()
+
+
+_regenerator = None
+
+
+def get_regenerator() -> NotebookRegenerator:
+    global _regenerator
+    if _regenerator is None:
+        _regenerator = NotebookRegenerator()
+    return _regenerator
+
+
+def post_save_hook(model: dict, os_path: str, contents_manager=None, **kwargs):
+    """
+        Jupyter contents manager post save hook, regenerate the saved notebook script and DVC command.
+        Configuration: c.FileContentsManager.post_save_hook = 'mlvtools.jupyter_hook.post_save_hook'
+    """
+    if model.get('type') != 'notebook':
+        return
+    get_regenerator().schedule(os_path)
+
+
+def _jupyter_server_extension_points():
+    return [{'module': 'mlvtools.jupyter_hook'}]
+
+
+def _load_jupyter_server_extension(server_app):
+    """
+        Register the post save hook on the Jupyter server contents manager
+        Activation: jupyter server extension enable mlvtools.jupyter_hook
+    """
+    contents_manager = server_app.contents_manager
+    if hasattr(contents_manager, 'register_post_save_hook'):
+        contents_manager.register_post_save_hook(post_save_hook)
+    else:
+        contents_manager.post_save_hook = post_save_hook
+    server_app.log.info('mlvtools post save hook registered')
+
+
+# Classic notebook server entry point
+load_jupyter_server_extension = _load_jupyter_server_extension
@@ -0,0 +1,49 @@
+import hashlib
+import json
+import mmap
+from typing import List, Tuple
+
+#: DVC reads files by chunks of this size, line endings of text files are converted chunk by chunk
+CHUNK_SIZE = 1024 * 1024
+#: DVC considers a file as text if less than 30% of its first block characters are not text characters
+TEXT_BLOCK_SIZE = 512
+TEXT_CHARS = bytes(range(32, 127)) + b'\n\r\t\f\b'
+DIR_SUFFIX = '.dir'
+
+
+def is_text(block: bytes) -> bool:
+    """
+        Guess if a file is a text file from its first block, as DVC does
+    """
+    if not block:
+        return True
+    if b'\x00' in block:
+        return False
+    non_text = block.translate(None, TEXT_CHARS)
+    return len(non_text) / len(block) <= 0.30
+
+
+def get_file_md5(path: str) -> str:
+    """
+        Return the DVC md5 of a file: line endings of text files are converted to unix ones before hashing.
+        The file is memory mapped to avoid copies.
+    """
+    md5 = hashlib.md5()
+    with open(path, 'rb') as fd:
+        if not fd.seek(0, 2):
+            return md5.hexdigest()
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            text = is_text(content[:TEXT_BLOCK_SIZE])
+            for offset in range(0, len(content), CHUNK_SIZE):
+                chunk = content[offset:offset + CHUNK_SIZE]
+                md5.update(chunk.replace(b'\r\n', b'\n') if text else chunk)
+    return md5.hexdigest()
+
+
+def get_dir_md5(files_md5: List[Tuple[str, str]]) -> str:
+    """
+        Return the DVC md5 of a directory from its (relative path, md5) files, relative paths use '/'.
+        It is the md5 of the JSON directory listing sorted by path, with the '.dir' suffix.
+    """
+    listing = [{'md5': md5, 'relpath': rel_path} for rel_path, md5 in sorted(files_md5)]
+    return hashlib.md5(json.dumps(listing, sort_keys=True).encode()).hexdigest() + DIR_SUFFIX
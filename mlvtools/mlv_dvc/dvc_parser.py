@@ -7,8 +7,10 @@ import networkx
 import yaml
 
 from mlvtools.exception import MlVToolException
+from mlvtools.helper import load_yaml_file
 
-DvcMeta = namedtuple('DvcMeta', ('name', 'cmd', 'deps', 'outs'))
+#: DVC meta of a stage, checksums are the recorded md5 of deps and outs indexed by path, relative to wdir
+DvcMeta = namedtuple('DvcMeta', ('name', 'cmd', 'deps', 'outs', 'wdir', 'checksums'))
 
 
 def get_dvc_meta(dvc_meta_file: str) -> DvcMeta:
@@ -17,13 +19,15 @@ def get_dvc_meta(dvc_meta_file: str) -> DvcMeta:
     """
     logging.debug(f'Get DVC meta from {dvc_meta_file}')
     try:
-        with open(dvc_meta_file, 'r') as fd:
-            raw_data = yaml.safe_load(fd.read())
-            deps = [v['path'] for v in raw_data.get('deps', [])]
-            outs = [v['path'] for v in raw_data.get('outs', [])]
-            meta = DvcMeta(basename(dvc_meta_file), raw_data.get('cmd', ''), deps, outs)
-            logging.debug(f'Meta for {dvc_meta_file}: {meta}')
-            return meta
+        raw_data = load_yaml_file(dvc_meta_file)
+        deps = [v['path'] for v in raw_data.get('deps', [])]
+        outs = [v['path'] for v in raw_data.get('outs', [])]
+        checksums = {v['path']: v['md5'] for v in raw_data.get('deps', []) + raw_data.get('outs', [])
+                     if v.get('md5')}
+        meta = DvcMeta(basename(dvc_meta_file), raw_data.get('cmd', ''), deps, outs,
+                       raw_data.get('wdir', '.'), checksums)
+        logging.debug(f'Meta for {dvc_meta_file}: {meta}')
+        return meta
     except (yaml.error.YAMLError, AttributeError) as e:
         raise MlVToolException(f'Cannot load DVC meta file {dvc_meta_file}. Wrong format') from e
     except IOError as e:
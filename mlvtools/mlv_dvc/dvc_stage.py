@@ -0,0 +1,105 @@
+import logging
+import threading
+from os import makedirs
+from os.path import join, dirname, relpath, basename, splitext, exists
+from string import Template
+
+import yaml
+
+from mlvtools.exception import MlVToolException
+from mlvtools.helper import load_yaml_file
+
+#: Legacy single stage DVC meta file (DVC < 1.0)
+DVC_FILE_FORMAT = 'dvc-file'
+#: Stage of the multi stages dvc.yaml file (DVC >= 1.0)
+DVC_YAML_FORMAT = 'dvc-yaml'
+STAGE_FORMATS = (DVC_FILE_FORMAT, DVC_YAML_FORMAT)
+DVC_YAML_FILE_NAME = 'dvc.yaml'
+
+#: dvc.yaml files are shared by stages, concurrent updates are serialized
+DVC_YAML_LOCK = threading.Lock()
+
+
+def get_stage_data(info: dict) -> dict:
+    """
+        Return the definition of a stage from DVC command template data, variables are resolved.
+        Paths are relative to the working directory, the stage working directory.
+    """
+    if info['whole_command']:
+        raise MlVToolException('Cannot write a DVC stage from a whole command, use a DVC command instead')
+
+    def resolve(value: str) -> str:
+        return Template(value).safe_substitute(info['values'])
+
+    return {
+        'cmd': resolve(f'{info["python_script"]} {info["python_params"]}'.strip()),
+        'deps': [resolve(dep) for dep in info['dvc_inputs']],
+        'outs': [resolve(output) for output in info['dvc_outputs']],
+        'outs_persist': [resolve(output) for output in info['dvc_outputs_persist']],
+        'meta_file': join(info['working_directory'], resolve(f'${info["meta_file_name_var"]}'))
+    }
+
+
+def write_dvc_file_stage(stage: dict, working_directory: str, force: bool = False) -> str:
+    """
+        Write a legacy DVC meta file, without md5: the stage is run by the next DVC repro.
+        An existing meta file is only overwritten if forced.
+    """
+    dvc_file = stage['meta_file']
+    if not force and exists(dvc_file):
+        raise MlVToolException(f'DVC meta file {dvc_file} already exists, use --force option to overwrite it')
+    outs = [{'path': output, 'cache': True, 'metric': False, 'persist': False} for output in stage['outs']]
+    outs += [{'path': output, 'cache': True, 'metric': False, 'persist': True} for output in stage['outs_persist']]
+    data = {'cmd': stage['cmd'],
+            'wdir': relpath(working_directory, dirname(dvc_file)),
+            'deps': [{'path': dep} for dep in stage['deps']],
+            'outs': outs}
+    makedirs(dirname(dvc_file), exist_ok=True)
+    with open(dvc_file, 'w') as fd:
+        yaml.safe_dump({key: value for key, value in data.items() if value}, fd, default_flow_style=False)
+    return dvc_file
+
+
+def write_dvc_yaml_stage(stage: dict, working_directory: str, force: bool = False) -> str:
+    """
+        Add or replace a stage of the dvc.yaml file of the meta file directory, the stage is named
+        after the meta file. Other stages are kept, an existing stage is only replaced if forced.
+    """
+    dvc_yaml = join(dirname(stage['meta_file']), DVC_YAML_FILE_NAME)
+    stage_name = splitext(basename(stage['meta_file']))[0]
+    wdir = relpath(working_directory, dirname(dvc_yaml))
+    data = {'cmd': stage['cmd'],
+            'wdir': wdir if wdir != '.' else None,
+            'deps': stage['deps'],
+            'outs': stage['outs'] + [{output: {'persist': True}} for output in stage['outs_persist']]}
+
+    with DVC_YAML_LOCK:
+        # Loaded contents are shared, they are copied before being updated
+        content = dict(load_yaml_file(dvc_yaml) or {}) if exists(dvc_yaml) else {}
+        content['stages'] = dict(content.get('stages') or {})
+        if not force and stage_name in content['stages']:
+            raise MlVToolException(f'DVC stage {stage_name} already exists in {dvc_yaml}, '
+                                   f'use --force option to overwrite it')
+        content['stages'][stage_name] = {key: value for key, value in data.items() if value}
+        makedirs(dirname(dvc_yaml), exist_ok=True)
+        with open(dvc_yaml, 'w') as fd:
+            yaml.safe_dump(content, fd, default_flow_style=False)
+    return dvc_yaml
+
+
+def write_dvc_stage(info: dict, stage_format: str, force: bool = False) -> str:
+    """
+        Write the stage definition of DVC command template data directly, instead of a DVC command
+        running the whole step to register it. Return the written file path.
+        An existing stage is only overwritten if forced.
+    """
+    stage = get_stage_data(info)
+    try:
+        if stage_format == DVC_YAML_FORMAT:
+            stage_file = write_dvc_yaml_stage(stage, info['working_directory'], force)
+        else:
+            stage_file = write_dvc_file_stage(stage, info['working_directory'], force)
+    except (IOError, yaml.YAMLError) as e:
+        raise MlVToolException(f'Cannot write DVC stage of {info["python_script"]}: {e}') from e
+    logging.log(logging.WARNING + 1, f'DVC stage successfully written in {stage_file}')
+    return stage_file
@@ -0,0 +1,159 @@
+import logging
+import subprocess
+import threading
+from collections import namedtuple
+from os.path import join
+from typing import List, Dict, Iterable, Optional, Set
+
+from mlvtools.exception import MlVToolException
+
+TreeEntry = namedtuple('TreeEntry', ('path', 'sha'))
+
+#: Empty tree object, staged changes of a repository without commit are compared to it
+EMPTY_TREE_SHA = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+
+def run_git(args: List[str], cwd: str) -> str:
+    """
+        Run a git command and return its standard output
+    """
+    logging.debug(f'Run git {args} in {cwd}')
+    try:
+        process = subprocess.run(['git'] + args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                 check=True)
+    except OSError as e:
+        raise MlVToolException(f'Cannot run git command {args}') from e
+    except subprocess.CalledProcessError as e:
+        raise MlVToolException(f'Git command {args} failed: {e.stderr.decode(errors="replace").strip()}') from e
+    return process.stdout.decode()
+
+
+def get_git_top_directory(cwd: str) -> str:
+    """
+        Return the top level directory of the git repository containing cwd
+    """
+    return run_git(['rev-parse', '--show-toplevel'], cwd).strip()
+
+
+def get_changed_paths(revision: str, cwd: str) -> Set[str]:
+    """
+        Return absolute paths of files changed since a revision, including staged, unstaged and untracked changes
+    """
+    top_directory = get_git_top_directory(cwd)
+    changed = run_git(['diff', '--name-only', '--no-renames', '-z', revision, '--'], top_directory).split('\0')
+    untracked = run_git(['ls-files', '--others', '--exclude-standard', '-z'], top_directory).split('\0')
+    return {join(top_directory, path) for path in changed + untracked if path}
+
+
+def get_revisions(revision_range: str, cwd: str) -> List[str]:
+    """
+        Return commit hashes of a revision range, oldest first
+    """
+    return run_git(['rev-list', '--reverse', revision_range, '--'], cwd).split()
+
+
+def get_tree_entries(revision: str, cwd: str) -> Dict[str, TreeEntry]:
+    """
+        Return blob entries of a revision tree indexed by path relative to the repository top directory
+    """
+    entries = {}
+    for line in run_git(['ls-tree', '-r', '-z', '--full-tree', revision], cwd).split('\0'):
+        if not line:
+            continue
+        meta, path = line.split('\t', 1)
+        _, object_type, sha = meta.split()
+        if object_type == 'blob':
+            entries[path] = TreeEntry(path, sha)
+    return entries
+
+
+def get_index_entries(cwd: str) -> Dict[str, TreeEntry]:
+    """
+        Return blob entries of the git index indexed by path relative to the repository top directory
+    """
+    entries = {}
+    for line in run_git(['ls-files', '--stage', '-z'], get_git_top_directory(cwd)).split('\0'):
+        if not line:
+            continue
+        meta, path = line.split('\t', 1)
+        _, sha, stage = meta.split()
+        # Unmerged paths have several stages, keep the merge result only
+        if stage == '0':
+            entries[path] = TreeEntry(path, sha)
+    return entries
+
+
+def get_staged_paths(cwd: str) -> Set[str]:
+    """
+        Return paths of staged changes relative to the repository top directory.
+        Before the first commit, all index entries are staged changes.
+    """
+    top_directory = get_git_top_directory(cwd)
+    try:
+        run_git(['rev-parse', '--verify', '--quiet', 'HEAD'], top_directory)
+        base = 'HEAD'
+    except MlVToolException:
+        base = EMPTY_TREE_SHA
+    staged = run_git(['diff', '--cached', '--name-only', '--no-renames', '-z', base, '--'], top_directory)
+    return {path for path in staged.split('\0') if path}
+
+
+class GitObjectReader:
+    """
+        Read git objects content through one long-lived 'git cat-file --batch' process.
+        Object names are any name understood by git: sha, 'revision:path' or ':path' for the index.
+    """
+
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self.process = None
+
+    def __enter__(self) -> 'GitObjectReader':
+        try:
+            self.process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=self.cwd,
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        except OSError as e:
+            raise MlVToolException('Cannot start git cat-file process') from e
+        return self
+
+    def __exit__(self, *exc):
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process.wait()
+
+    def _read_object(self) -> Optional[bytes]:
+        header = self.process.stdout.readline().decode()
+        if not header:
+            raise MlVToolException('Git cat-file process ended unexpectedly')
+        parts = header.split()
+        if parts[-1] in ('missing', 'ambiguous'):
+            return None
+        content = self.process.stdout.read(int(parts[2]))
+        # Each object content is followed by a line feed
+        self.process.stdout.read(1)
+        return content
+
+    def read(self, object_name: str) -> Optional[bytes]:
+        """
+            Return an object content or None if it does not exist
+        """
+        self.process.stdin.write(f'{object_name}\n'.encode())
+        self.process.stdin.flush()
+        return self._read_object()
+
+    def read_all(self, object_names: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        """
+            Return objects content, None for missing ones, sending all requests in one batch
+        """
+        object_names = list(object_names)
+
+        # Write requests in a separate thread to avoid a deadlock when git output fills the pipe
+        def send_requests():
+            self.process.stdin.write(''.join(f'{name}\n' for name in object_names).encode())
+            self.process.stdin.flush()
+
+        writer = threading.Thread(target=send_requests)
+        writer.start()
+        contents = {name: self._read_object() for name in object_names}
+        writer.join()
+        return contents
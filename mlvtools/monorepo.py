@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import sys
+from collections import namedtuple, OrderedDict
+from os.path import join, dirname, relpath, abspath, isdir, normpath
+from typing import List, Tuple, Callable
+
+from mlvtools.cache import MlVToolCache, CACHE_DIR_NAME
+from mlvtools.check_dvc import run_dvc_consistency_check_task
+from mlvtools.check_script import run_consistency_check_task
+from mlvtools.cmd import CommandHelper, ArgumentBuilder
+from mlvtools.conf.conf import MlVToolConf, DEFAULT_CONF_FILENAME, load_conf_or_default, load_docstring_conf, \
+    get_script_output_path, get_dvc_cmd_output_path, check_script_output_paths
+from mlvtools.discovery import discover_files, PathFilter
+from mlvtools.exception import MlVToolException
+from mlvtools.ipynb_to_dvc import export_to_script_and_dvc
+from mlvtools.ipynb_to_python import get_exporter
+from mlvtools.parallel import parallel_map
+from mlvtools.report import write_report, check_report_formats
+
+CONVERT = 'convert'
+CHECK_SCRIPTS = 'check-scripts'
+CHECK_DVC = 'check-dvc'
+ACTIONS = (CONVERT, CHECK_SCRIPTS, CHECK_DVC)
+
+#: Directories never scanned to discover projects: hidden directories (.git, .venv, cache...)
+PROJECTS_EXCLUDE = ['.*/']
+#: Directories never scanned to discover notebooks of a project
+NOTEBOOKS_EXCLUDE = ['.git/', f'{CACHE_DIR_NAME}/']
+
+#: A sub-project of the monorepo, with its configuration loaded once
+Project = namedtuple('Project', ('directory', 'conf', 'docstring_conf', 'sub_projects'))
+
+
+def discover_projects(root_dir: str, include: List[str] = None, ignore: List[str] = None) -> List[Project]:
+    """
+        Return projects of a monorepo: directories containing a configuration file.
+        Configuration files are selected with gitignore style patterns relative to the root directory,
+        hidden directories are never scanned.
+        Each configuration and docstring configuration is loaded once, project directory is its top directory.
+    """
+    path_filter = PathFilter(include, PROJECTS_EXCLUDE + (ignore or []))
+    conf_paths = [path for path in discover_files(root_dir, DEFAULT_CONF_FILENAME, path_filter)
+                  if path.endswith(f'/{DEFAULT_CONF_FILENAME}')]
+    directories = [abspath(dirname(conf_path)) for conf_path in conf_paths]
+    projects = []
+    for directory, conf_path in zip(directories, conf_paths):
+        conf = load_conf_or_default(conf_path, directory)
+        if not conf.path:
+            raise MlVToolException(f'Configuration {conf_path} must define paths')
+        docstring_conf = load_docstring_conf(conf.docstring_conf) if conf.docstring_conf else None
+        sub_projects = [relpath(other, directory) for other in directories
+                        if other != directory and other.startswith(f'{directory}/')]
+        projects.append(Project(directory, conf, docstring_conf, sub_projects))
+    return projects
+
+
+def get_notebooks(project: Project, notebooks_dir: str, include: List[str], ignore: List[str],
+                  recursive: bool) -> List[str]:
+    """
+        Return notebooks of a project notebooks directory, notebooks of nested projects are excluded
+    """
+    directory = normpath(join(project.directory, notebooks_dir))
+    if not isdir(directory):
+        return []
+    nested = [f'/{relpath(join(project.directory, sub_project), directory)}/' for sub_project in project.sub_projects]
+    return discover_files(directory, '.ipynb', PathFilter(include, NOTEBOOKS_EXCLUDE + ignore + nested), recursive)
+
+
+def get_convert_outputs(notebook: str, conf: MlVToolConf) -> Tuple[str, str]:
+    """
+        Return the script and the DVC command paths generated from a notebook
+    """
+    script = get_script_output_path(notebook, conf)
+    return script, get_dvc_cmd_output_path(script, conf)
+
+
+def convert_notebook_task(task: Tuple[str, MlVToolConf, dict]) -> bool:
+    """
+        Generate the script and the DVC command of a notebook, used as process pool worker
+    """
+    notebook, conf, docstring_conf = task
+    script, dvc_cmd = get_convert_outputs(notebook, conf)
+    try:
+        export_to_script_and_dvc(notebook, script, dvc_cmd, conf, docstring_conf)
+        return True
+    except MlVToolException as e:
+        logging.error(f'Cannot convert {notebook}: {e}')
+        return False
+
+
+def get_tasks(action: str, project: Project, notebooks: List[str], cache: MlVToolCache) -> List[tuple]:
+    conf = project.conf
+    if action == CONVERT:
+        return [(notebook, conf, project.docstring_conf) for notebook in notebooks]
+    if action == CHECK_SCRIPTS:
+        return [(notebook, get_script_output_path(notebook, conf), conf, cache) for notebook in notebooks]
+    scripts = [get_script_output_path(notebook, conf) for notebook in notebooks]
+    return [(script, get_dvc_cmd_output_path(script, conf), conf, project.docstring_conf, cache)
+            for script in scripts]
+
+
+def get_task_function(action: str) -> Callable:
+    return {CONVERT: convert_notebook_task,
+            CHECK_SCRIPTS: run_consistency_check_task,
+            CHECK_DVC: run_dvc_consistency_check_task}[action]
+
+
+def is_success(result) -> bool:
+    return result.equals if hasattr(result, 'equals') else bool(result)
+
+
+class MlVToolsMonorepo(CommandHelper):
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Run an action on all projects of a monorepo, in one process with a '
+                                           'shared worker pool. Projects are directories containing a '
+                                           f'{DEFAULT_CONF_FILENAME} configuration file, found under the working '
+                                           'directory.') \
+            .add_argument('action', choices=ACTIONS,
+                          help=f'{CONVERT}: generate scripts and DVC commands of notebooks, '
+                               f'{CHECK_SCRIPTS}: check notebooks and scripts consistency, '
+                               f'{CHECK_DVC}: check DVC commands are up to date with scripts') \
+            .add_work_dir_argument() \
+            .add_argument('-n', '--notebooks-dir', type=str, default='.',
+                          help='Notebooks directory, relative to each project directory') \
+            .add_discovery_arguments('notebook') \
+            .add_argument('--ignore-projects', action='append', default=[],
+                          help='Gitignore style pattern of projects paths to ignore, relative to the working '
+                               'directory. Hidden directories are always ignored. Can be repeated.') \
+            .add_argument('--include-projects', action='append', default=[],
+                          help='Gitignore style pattern of projects configuration files to use, relative to the '
+                               f'working directory, for instance "apps/**/{DEFAULT_CONF_FILENAME}". All projects '
+                               'by default. Can be repeated.') \
+            .add_jobs_argument() \
+            .add_cache_arguments() \
+            .add_report_argument() \
+            .add_force_argument() \
+            .parse(args)
+
+        self.set_log_level(args)
+        check_report_formats(args.report)
+        if args.report and args.action != CHECK_SCRIPTS:
+            raise MlVToolException(f'Reports are only available for {CHECK_SCRIPTS}')
+        cache = self.get_cache(args) if args.action != CONVERT else None
+
+        projects = discover_projects(args.working_directory, args.include_projects, args.ignore_projects)
+        logging.info(f'{len(projects)} project(s) found in {args.working_directory}')
+        project_tasks = OrderedDict()
+        for project in projects:
+            notebooks = get_notebooks(project, args.notebooks_dir, args.include, args.ignore, args.recursive)
+            check_script_output_paths(notebooks, project.conf)
+            project_tasks[project.directory] = get_tasks(args.action, project, notebooks, cache)
+
+        # All projects tasks share the same worker pool
+        tasks = [task for tasks in project_tasks.values() for task in tasks]
+        if args.action == CONVERT:
+            self.check_force(args.force, [output for notebook, conf, _ in tasks
+                                          for output in get_convert_outputs(notebook, conf)])
+        results = iter(parallel_map(get_task_function(args.action), tasks, args.jobs, warm_up=get_exporter))
+
+        success = True
+        all_results = []
+        for directory, tasks in project_tasks.items():
+            project_results = [next(results) for _ in tasks]
+            all_results += project_results
+            failures = sum(1 for result in project_results if not is_success(result))
+            project_name = relpath(directory, args.working_directory)
+            if failures:
+                logging.error(f'{project_name}: {failures} of {len(tasks)} notebook(s) failed')
+            else:
+                logging.log(logging.WARNING + 1, f'{project_name}: {len(tasks)} notebook(s) succeeded')
+            success = success and not failures
+
+        for report_format, report_path in args.report:
+            write_report(report_format, report_path, all_results)
+        sys.exit(0 if success else 1)
@@ -0,0 +1,79 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Any, Tuple, Iterable
+
+_recorder = None
+
+
+class LogRecorder(logging.Handler):
+    """
+        Keep log records emitted in a worker process to replay them in the main process
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord):
+        # Records must be picklable: format message and exception in the worker
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+def init_worker(log_level: int, warm_up: Callable = None):
+    """
+        Worker process set up, done on its first task: record logs instead of emitting them then
+        warm up the worker. Pool initializers are not available on Python 3.6.
+    """
+    global _recorder
+    _recorder = LogRecorder()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(_recorder)
+    root_logger.setLevel(log_level)
+    if warm_up:
+        warm_up()
+
+
+def run_recorded(task: Tuple[Callable, Any, int, Callable]) -> Tuple[Any, BaseException, List[logging.LogRecord]]:
+    """
+        Run a task in a worker and return its result, its exception and its log records
+    """
+    func, item, log_level, warm_up = task
+    if _recorder is None:
+        init_worker(log_level, warm_up)
+    _recorder.records = []
+    try:
+        return func(item), None, _recorder.records
+    except Exception as e:
+        return None, e, _recorder.records
+
+
+def parallel_map(func: Callable, items: Iterable, jobs: int = None, warm_up: Callable = None) -> List:
+    """
+        Apply func on each item using a process pool of 'jobs' workers.
+        Logs emitted by workers are replayed in the main process in items order, so the output is
+        the same as a serial run. The first task exception is raised once previous logs are replayed.
+        Func, items and results must be picklable.
+    """
+    items = list(items)
+    if jobs == 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    max_workers = min(jobs, len(items)) if jobs else None
+    results = []
+    log_level = logging.getLogger().getEffectiveLevel()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        tasks = [(func, item, log_level, warm_up) for item in items]
+        for result, exception, records in executor.map(run_recorded, tasks):
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+            if exception:
+                raise exception
+            results.append(result)
+    return results
@@ -0,0 +1,101 @@
+import json
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional
+
+from mlvtools.exception import MlVToolException
+
+JSON_FORMAT = 'json'
+JUNIT_FORMAT = 'junit'
+REPORT_FORMATS = (JSON_FORMAT, JUNIT_FORMAT)
+
+#: Result of one notebook check, paths are relative to the working directory.
+#: - method: how the verdict was obtained (cache, fingerprint, direct or generated comparison)
+#: - location: first difference script line, notebook cell (starting at 1) and reason
+#: - timings: seconds spent in each check phase (read, fingerprint, parse, compare, conversion)
+#: - sizes: notebook and script sizes in bytes
+#: - error: reason why the check could not be run
+CheckResult = namedtuple('CheckResult', ('notebook', 'script', 'equals', 'duration', 'method', 'location',
+                                         'timings', 'sizes', 'error'))
+CheckResult.__new__.__defaults__ = (None, None, None, None, None)
+
+
+@contextmanager
+def timed(stats: Optional[Dict[str, Any]], phase: str):
+    """
+        Add the time spent in the block to the phase timing of stats, if provided
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            timings = stats.setdefault('timings', {})
+            timings[phase] = timings.get(phase, 0.) + time.perf_counter() - start
+
+
+def write_json(output_path: str, data: dict):
+    try:
+        with open(output_path, 'w') as fd:
+            json.dump(data, fd, indent=2, sort_keys=True)
+    except IOError as e:
+        raise MlVToolException(f'Cannot write {output_path}') from e
+
+
+def get_json_report(results: List[CheckResult], shard: str = None) -> dict:
+    return {'shard': shard,
+            'equals': all(result.equals for result in results),
+            'checks': [result._asdict() for result in results]}
+
+
+def get_junit_report(results: List[CheckResult]) -> ET.ElementTree:
+    """
+        Return a JUnit report with one test case per notebook, timings and sizes are test case properties
+    """
+    suite = ET.Element('testsuite', name='mlvtools consistency', tests=str(len(results)),
+                       failures=str(sum(1 for result in results if not result.equals and not result.error)),
+                       errors=str(sum(1 for result in results if result.error)),
+                       time=f'{sum(result.duration for result in results):.6f}')
+    for result in results:
+        case = ET.SubElement(suite, 'testcase', classname='consistency', name=result.notebook,
+                             file=result.script, time=f'{result.duration:.6f}')
+        properties = ET.SubElement(case, 'properties')
+        for name, value in [('method', result.method)] + \
+                [(f'{phase}_time', f'{duration:.6f}') for phase, duration in sorted((result.timings or {}).items())] + \
+                [(f'{kind}_size', size) for kind, size in sorted((result.sizes or {}).items())]:
+            ET.SubElement(properties, 'property', name=name, value=str(value))
+        if result.error:
+            ET.SubElement(case, 'error', message=result.error)
+        elif not result.equals:
+            location = result.location or {}
+            message = f'Difference found between {result.notebook} and {result.script}'
+            if location:
+                message += f' at line {location["script_line"]} ({location["reason"]})'
+            failure = ET.SubElement(case, 'failure', message=message)
+            failure.text = json.dumps(location, sort_keys=True) if location else None
+    return ET.ElementTree(suite)
+
+
+def check_report_formats(reports: List[List[str]]):
+    """
+        Check requested reports formats, as (format, path) pairs, before running checks
+    """
+    for report_format, _ in reports:
+        if report_format not in REPORT_FORMATS:
+            raise MlVToolException(f'Unknown report format {report_format}, expected one of {REPORT_FORMATS}')
+
+
+def write_report(report_format: str, output_path: str, results: List[CheckResult], shard: str = None):
+    """
+        Write check results in a JSON or JUnit report
+    """
+    if report_format == JSON_FORMAT:
+        write_json(output_path, get_json_report(results, shard))
+        return
+    check_report_formats([(report_format, output_path)])
+    try:
+        get_junit_report(results).write(output_path, encoding='utf-8', xml_declaration=True)
+    except IOError as e:
+        raise MlVToolException(f'Cannot write {output_path}') from e
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import logging
+import sys
+from collections import namedtuple
+from os.path import relpath, abspath
+from typing import List, Dict
+
+from mlvtools.cmd import CommandHelper, ArgumentBuilder
+from mlvtools.exception import MlVToolException
+from mlvtools.report import write_json
+
+Shard = namedtuple('Shard', ('index', 'count'))
+
+#: Duration used for notebooks without timing when no timing is known at all
+DEFAULT_DURATION = 1.
+
+
+def parse_shard(value: str) -> Shard:
+    """
+        Argparse type for shards, formatted as 'i/N' with i in [1, N]
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid shard {value}, expected i/N')
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f'invalid shard {value}, expected 1 <= i <= N')
+    return Shard(index, count)
+
+
+def format_shard(shard: Shard) -> str:
+    return f'{shard.index}/{shard.count}'
+
+
+def get_shard_key(rel_path: str) -> int:
+    """
+        Stable hash of a relative path, independent of the machine and of the Python hash seed
+    """
+    return int(hashlib.sha1(rel_path.encode()).hexdigest(), 16)
+
+
+def load_timings(timings_path: str) -> Dict[str, float]:
+    """
+        Load historical durations in seconds indexed by notebook path relative to the working directory
+    """
+    try:
+        with open(timings_path, 'r') as fd:
+            return {path: float(duration) for path, duration in json.load(fd).items()}
+    except (IOError, ValueError, TypeError, AttributeError) as e:
+        raise MlVToolException(f'Cannot load timings file {timings_path}: {e}') from e
+
+
+def select_shard(paths: List[str], shard: Shard, top_directory: str, timings: Dict[str, float] = None) -> List[str]:
+    """
+        Return paths assigned to the shard, keeping the given order.
+        Without timings, paths are assigned by a stable hash of their relative path.
+        With timings, paths are balanced on shards from the longest to the shortest
+        (notebooks without timing get the average duration).
+    """
+    rel_paths = {path: relpath(abspath(path), top_directory) for path in paths}
+    if not timings:
+        return [path for path in paths if get_shard_key(rel_paths[path]) % shard.count == shard.index - 1]
+
+    known = [timings[rel_path] for rel_path in rel_paths.values() if rel_path in timings]
+    default_duration = sum(known) / len(known) if known else DEFAULT_DURATION
+    durations = {path: timings.get(rel_path, default_duration) for path, rel_path in rel_paths.items()}
+
+    loads = [0.] * shard.count
+    assigned = set()
+    for path in sorted(paths, key=lambda p: (-durations[p], get_shard_key(rel_paths[p]))):
+        shard_index = min(range(shard.count), key=lambda index: (loads[index], index))
+        loads[shard_index] += durations[path]
+        if shard_index == shard.index - 1:
+            assigned.add(path)
+    return [path for path in paths if path in assigned]
+
+
+def load_report(report_path: str) -> dict:
+    try:
+        with open(report_path, 'r') as fd:
+            return json.load(fd)
+    except (IOError, ValueError) as e:
+        raise MlVToolException(f'Cannot load report {report_path}: {e}') from e
+
+
+def merge_reports(reports: List[dict]) -> dict:
+    """
+        Merge shards reports in a single report. Raise if a shard is missing or duplicated.
+    """
+    try:
+        shards = [parse_shard(report['shard']) for report in reports if report.get('shard')]
+    except argparse.ArgumentTypeError as e:
+        raise MlVToolException(f'Invalid report: {e}') from e
+    counts = {shard.count for shard in shards}
+    if len(counts) > 1:
+        raise MlVToolException(f'Reports come from different shard counts: {sorted(counts)}')
+    if shards:
+        count = counts.pop()
+        indexes = sorted(shard.index for shard in shards)
+        if indexes != list(range(1, count + 1)):
+            raise MlVToolException(f'Expected one report per shard 1 to {count}, got shards {indexes}')
+
+    checks = sorted((check for report in reports for check in report['checks']), key=lambda check: check['notebook'])
+    return {'shard': None,
+            'equals': all(report['equals'] for report in reports),
+            'checks': checks}
+
+
+def get_timings(report: dict) -> Dict[str, float]:
+    return {check['notebook']: check['duration'] for check in report['checks']}
+
+
+class MergeConsistencyReports(CommandHelper):
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Merge consistency reports of check_all_scripts_consistency shards. '
+                                           'Exit with error if one check failed or if a shard is missing.') \
+            .add_argument('reports', nargs='+', help='Shard reports to merge') \
+            .add_argument('-o', '--output', type=str, help='Merged report output path') \
+            .add_argument('--timings-output', type=str,
+                          help='Write checks durations as a timings file for next shards balancing') \
+            .parse(args)
+        self.set_log_level(args)
+
+        report = merge_reports([load_report(report_path) for report_path in args.reports])
+        for check in report['checks']:
+            if not check['equals']:
+                logging.error(f'Difference found between {check["notebook"]} and {check["script"]}')
+        if args.output:
+            write_json(args.output, report)
+        if args.timings_output:
+            write_json(args.timings_output, get_timings(report))
+
+        if report['equals']:
+            logging.log(logging.WARNING + 1, f'{len(report["checks"])} notebook(s) consistent')
+        sys.exit(0 if report['equals'] else 1)
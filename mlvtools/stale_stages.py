@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join, dirname, abspath, isdir, exists, relpath
+from typing import List, Dict, Optional
+
+from mlvtools.cache import MlVToolCache, get_signature
+from mlvtools.cmd import CommandHelper, ArgumentBuilder
+from mlvtools.discovery import discover_files, PathFilter
+from mlvtools.mlv_dvc.dvc_hash import get_file_md5, get_dir_md5
+from mlvtools.mlv_dvc.dvc_parser import get_dvc_meta, DvcMeta
+
+DVC_MD5_KIND = 'dvc_md5'
+
+MISSING = 'missing'
+CHANGED = 'changed'
+NOT_RECORDED = 'no recorded md5'
+
+#: Changed dependency or output of a stage, the path is relative to the stage working directory
+StageChange = namedtuple('StageChange', ('path', 'reason'))
+
+
+class DvcHasher:
+    """
+        Compute DVC md5 of files and directories. Files are hashed in a thread pool and their
+        md5 are cached by (inode, size, mtime), only changed files are read.
+    """
+
+    def __init__(self, cache: MlVToolCache = None, jobs: int = None):
+        self.cache = cache
+        self.jobs = jobs
+
+    def get_files_md5(self, files: List[str]) -> Dict[str, str]:
+        signatures = {path: get_signature(path) for path in files}
+        files_md5 = {}
+        if self.cache:
+            for path, signature in signatures.items():
+                md5 = self.cache.lookup_file_hash(path, DVC_MD5_KIND, signature)
+                if md5:
+                    files_md5[path] = md5
+        to_hash = [path for path in files if path not in files_md5]
+        logging.debug(f'Hash {len(to_hash)} file(s), {len(files_md5)} found in cache')
+
+        # Hashing releases the GIL, threads avoid the process pool start up and data copies
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for path, md5 in zip(to_hash, executor.map(get_file_md5, to_hash)):
+                files_md5[path] = md5
+                if self.cache:
+                    self.cache.store_file_hash(path, DVC_MD5_KIND, signatures[path], md5)
+        return files_md5
+
+    def get_md5s(self, paths: List[str]) -> Dict[str, Optional[str]]:
+        """
+            Return the DVC md5 of files and directories absolute paths, None for missing paths
+        """
+        directory_files = {path: list_directory_files(path) for path in paths if isdir(path)}
+        files = {path for path in paths if path not in directory_files and exists(path)}
+        files.update(file for dir_files in directory_files.values() for file in dir_files)
+        files_md5 = self.get_files_md5(sorted(files))
+
+        md5s = {}
+        for path in paths:
+            if path in directory_files:
+                md5s[path] = get_dir_md5([(relpath(file, path).replace(os.sep, '/'), files_md5[file])
+                                          for file in directory_files[path]])
+            else:
+                md5s[path] = files_md5.get(path)
+        return md5s
+
+
+def list_directory_files(directory: str) -> List[str]:
+    return [join(root, file_name) for root, _, file_names in os.walk(directory) for file_name in file_names]
+
+
+def get_stage_paths(dvc_meta_file: str, dvc_meta: DvcMeta) -> Dict[str, str]:
+    """
+        Return absolute paths of local deps and outs of a stage, indexed by their recorded path
+    """
+    stage_dir = join(dirname(abspath(dvc_meta_file)), dvc_meta.wdir or '.')
+    return {path: abspath(join(stage_dir, path)) for path in dvc_meta.deps + dvc_meta.outs if '://' not in path}
+
+
+def get_stage_changes(dvc_meta: DvcMeta, stage_paths: Dict[str, str],
+                      md5s: Dict[str, Optional[str]]) -> List[StageChange]:
+    """
+        Compare recorded md5 of a stage deps and outs with current ones
+    """
+    changes = []
+    for path, abs_path in stage_paths.items():
+        if not md5s[abs_path]:
+            changes.append(StageChange(path, MISSING))
+        elif not dvc_meta.checksums.get(path):
+            changes.append(StageChange(path, NOT_RECORDED))
+        elif dvc_meta.checksums[path] != md5s[abs_path]:
+            changes.append(StageChange(path, CHANGED))
+    return changes
+
+
+def get_stale_stages(dvc_meta_files: List[str], cache: MlVToolCache = None,
+                     jobs: int = None) -> Dict[str, List[StageChange]]:
+    """
+        Return changed deps and outs of stale stages, indexed by DVC meta file.
+        All stages files are hashed at once, files shared by stages are hashed once.
+    """
+    dvc_metas = {dvc_meta_file: get_dvc_meta(dvc_meta_file) for dvc_meta_file in dvc_meta_files}
+    stage_paths = {dvc_meta_file: get_stage_paths(dvc_meta_file, dvc_meta)
+                   for dvc_meta_file, dvc_meta in dvc_metas.items()}
+    md5s = DvcHasher(cache, jobs).get_md5s(sorted({path for paths in stage_paths.values()
+                                                   for path in paths.values()}))
+    stale_stages = {}
+    for dvc_meta_file, dvc_meta in dvc_metas.items():
+        changes = get_stage_changes(dvc_meta, stage_paths[dvc_meta_file], md5s)
+        if changes:
+            stale_stages[dvc_meta_file] = changes
+    return stale_stages
+
+
+class MlCheckStaleStages(CommandHelper):
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Find DVC stages whose dependencies or outputs changed since their last '
+                                           'run, comparing recorded md5 with current contents as DVC does. Exit '
+                                           'with error if a stage is stale.') \
+            .add_work_dir_argument() \
+            .add_conf_path_argument() \
+            .add_path_argument('-d', '--dvc-dir', type=str,
+                               help='DVC meta files directory. Defaults to the conf DVC metadata directory, '
+                                    'or to the working directory without conf.') \
+            .add_discovery_arguments('DVC meta file') \
+            .add_jobs_argument() \
+            .add_cache_arguments() \
+            .parse(args)
+
+        self.set_log_level(args)
+        conf = self.get_conf(args.working_directory, args.dvc_dir, args.conf_path)
+        dvc_dir = args.dvc_dir or join(conf.top_directory, conf.path.dvc_metadata_root_dir if conf.path else '')
+        dvc_meta_files = discover_files(dvc_dir, '.dvc', PathFilter(args.include, args.ignore), args.recursive)
+
+        stale_stages = get_stale_stages(dvc_meta_files, self.get_cache(args), args.jobs)
+        for dvc_meta_file, changes in stale_stages.items():
+            for change in changes:
+                logging.error(f'Stage {relpath(dvc_meta_file, conf.top_directory)} is stale: {change.path} '
+                              f'{change.reason}')
+        if not stale_stages:
+            logging.log(logging.WARNING + 1, f'{len(dvc_meta_files)} stage(s) up to date')
+        sys.exit(1 if stale_stages else 0)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import namedtuple
+from os import makedirs
+from os.path import join, relpath, abspath, dirname, isdir, exists
+from typing import List, Dict, Optional
+
+from mlvtools.cache import get_default_cache_dir, hash_content, hash_notebook, get_mlvtools_version, RACY_DELAY
+from mlvtools.check_dvc import compare_dvc_command
+from mlvtools.check_script import compare
+from mlvtools.cmd import CommandHelper, ArgumentBuilder
+from mlvtools.conf.conf import MlVToolConf, get_script_output_path, get_dvc_cmd_output_path, \
+    get_dvc_metadata_output_path, load_docstring_conf, check_script_output_paths
+from mlvtools.discovery import discover_files, PathFilter
+from mlvtools.docstring_helpers.extract import extract_docstring_from_file
+from mlvtools.exception import MlVToolException
+from mlvtools.gen_dvc import get_dvc_meta_file_path
+
+INDEX_FILE_NAME = 'index.json'
+
+UP_TO_DATE = 'up to date'
+MISSING = 'missing'
+STALE = 'stale'
+ORPHANED = 'orphaned'
+ERROR = 'error'
+
+NOTEBOOK = 'notebook'
+SCRIPT = 'script'
+DVC_COMMAND = 'dvc_command'
+DVC_META = 'dvc_meta'
+ARTIFACTS = (SCRIPT, DVC_COMMAND, DVC_META)
+
+#: Status of a notebook artifact, paths are relative to the working directory.
+#: The notebook is None for orphaned artifacts.
+ArtifactStatus = namedtuple('ArtifactStatus', ('notebook', 'kind', 'path', 'state'))
+
+
+def get_stat(path: str) -> Optional[List[int]]:
+    """
+        Return the stat signature of a file, None if it does not exist.
+        The mtime of a file modified too recently to be trusted is -1.
+    """
+    try:
+        path_stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if path_stat.st_mtime_ns >= (time.time() - RACY_DELAY) * 1e9:
+        return [path_stat.st_ino, path_stat.st_size, -1]
+    return [path_stat.st_ino, path_stat.st_size, path_stat.st_mtime_ns]
+
+
+def get_file_hash(path: str, kind: str) -> str:
+    with open(path, 'rb') as fd:
+        content = fd.read()
+    return hash_notebook(content) if kind == NOTEBOOK else hash_content(content)
+
+
+class ArtifactIndex:
+    """
+        Index of notebooks artifacts: script, DVC command and DVC meta file paths, with their stat and
+        content hash last seen and the resulting status. The index is discarded when the configuration,
+        the docstring configuration or the mlvtools version changes.
+    """
+
+    def __init__(self, index_path: Optional[str], conf: MlVToolConf, docstring_conf: dict = None):
+        self.index_path = index_path
+        self.key = hash_content(json.dumps([conf.dict(), docstring_conf, get_mlvtools_version()],
+                                           sort_keys=True, default=str).encode())
+        self.entries: Dict[str, dict] = {}
+        if index_path:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r') as fd:
+                data = json.load(fd)
+        except FileNotFoundError:
+            return
+        except (IOError, ValueError) as e:
+            logging.warning(f'Cannot read index {self.index_path}: {e}')
+            return
+        if data.get('key') == self.key:
+            self.entries = data.get('entries', {})
+        else:
+            logging.debug('Index discarded, configuration or mlvtools version changed')
+
+    def save(self):
+        if not self.index_path:
+            return
+        try:
+            makedirs(dirname(self.index_path), exist_ok=True)
+            with open(self.index_path, 'w') as fd:
+                json.dump({'key': self.key, 'entries': self.entries}, fd)
+        except IOError as e:
+            logging.warning(f'Cannot write index {self.index_path}: {e}')
+
+
+class ProjectStatus:
+    """
+        Compute notebooks artifacts status from stat only checks, artifacts are compared with their source
+        only when a stat changed and content hashes differ from the index.
+        - script: missing, stale if it is not the notebook conversion
+        - DVC command: missing, stale if it is not generated from the script docstring
+        - DVC meta file: missing
+    """
+
+    def __init__(self, conf: MlVToolConf, index: ArtifactIndex, docstring_conf: dict = None):
+        self.conf = conf
+        self.index = index
+        self.docstring_conf = docstring_conf
+
+    def rel_path(self, path: str) -> str:
+        return relpath(abspath(path), self.conf.top_directory)
+
+    def get_artifact_paths(self, notebook: str, entry: Optional[dict]) -> Dict[str, str]:
+        script = get_script_output_path(notebook, self.conf)
+        return {NOTEBOOK: notebook, SCRIPT: script, DVC_COMMAND: get_dvc_cmd_output_path(script, self.conf),
+                DVC_META: self.get_dvc_meta_path(script, entry)}
+
+    def get_dvc_meta_path(self, script: str, entry: Optional[dict]) -> str:
+        """
+            Return the DVC meta file path, which can be overridden in the script docstring.
+            The indexed path is reused while the script stat is unchanged.
+        """
+        script_stat = get_stat(script)
+        if not script_stat:
+            return get_dvc_metadata_output_path(script, self.conf)
+        if entry and script_stat[2] != -1 and script_stat == entry['stats'].get(SCRIPT) \
+                and DVC_META in entry.get('paths', {}):
+            return join(self.conf.top_directory, entry['paths'][DVC_META])
+        try:
+            docstring_info = extract_docstring_from_file(script, self.docstring_conf)
+            return get_dvc_meta_file_path(docstring_info, script, self.conf)
+        except MlVToolException as e:
+            logging.debug(f'Cannot read DVC meta file path from {script} docstring: {e}')
+            return get_dvc_metadata_output_path(script, self.conf)
+
+    def get_notebook_status(self, notebook: str) -> List[ArtifactStatus]:
+        rel_notebook = self.rel_path(notebook)
+        entry = self.index.entries.get(rel_notebook)
+        paths = self.get_artifact_paths(notebook, entry)
+        stats = {kind: get_stat(path) for kind, path in paths.items()}
+
+        # Recently modified files have no trusted mtime (-1) and are always hashed
+        is_trusted = all(stat[2] != -1 for stat in stats.values() if stat)
+        if entry and is_trusted and all(stats[kind] == entry['stats'].get(kind) for kind in paths):
+            states = entry['states']
+        else:
+            logging.debug(f'Artifacts of {rel_notebook} changed')
+            entry = entry or {'stats': {}, 'hashes': {}, 'states': {}}
+            # DVC meta files are only checked for existence
+            hashes = {kind: get_file_hash(path, kind) if stats[kind] and kind != DVC_META else None
+                      for kind, path in paths.items()}
+            states = self.get_states(paths, hashes, entry)
+            self.index.entries[rel_notebook] = {'paths': {kind: self.rel_path(path) for kind, path in paths.items()},
+                                                'stats': stats, 'hashes': hashes, 'states': states}
+        return [ArtifactStatus(rel_notebook, kind, self.rel_path(paths[kind]), states[kind]) for kind in ARTIFACTS]
+
+    def get_states(self, paths: Dict[str, str], hashes: Dict[str, str], entry: dict) -> Dict[str, str]:
+        """
+            Compute artifacts states, reusing states of the index entry while involved contents are unchanged
+        """
+        def is_unchanged(artifact: str, source: str) -> bool:
+            return artifact in entry['states'] and \
+                all(entry['hashes'].get(kind) == hashes[kind] for kind in (artifact, source))
+
+        states = {}
+        if not hashes[SCRIPT]:
+            states[SCRIPT] = MISSING
+        elif is_unchanged(SCRIPT, NOTEBOOK):
+            states[SCRIPT] = entry['states'][SCRIPT]
+        else:
+            states[SCRIPT] = self.run_check(compare, paths[NOTEBOOK], paths[SCRIPT], self.conf)
+
+        if not hashes[DVC_COMMAND]:
+            states[DVC_COMMAND] = MISSING
+        elif not hashes[SCRIPT]:
+            states[DVC_COMMAND] = STALE
+        elif is_unchanged(DVC_COMMAND, SCRIPT):
+            states[DVC_COMMAND] = entry['states'][DVC_COMMAND]
+        else:
+            states[DVC_COMMAND] = self.run_check(compare_dvc_command, paths[SCRIPT], paths[DVC_COMMAND], self.conf,
+                                                 self.docstring_conf)
+
+        states[DVC_META] = UP_TO_DATE if exists(paths[DVC_META]) else MISSING
+        return states
+
+    @staticmethod
+    def run_check(check, *args) -> str:
+        try:
+            return UP_TO_DATE if check(*args) else STALE
+        except MlVToolException as e:
+            logging.error(e)
+            return ERROR
+
+    def get_orphans(self, expected: List[ArtifactStatus]) -> List[ArtifactStatus]:
+        """
+            Return scripts and DVC commands of the conf directories without notebook
+        """
+        expected_paths = {status.path for status in expected}
+        orphans = []
+        for kind, root_dir, suffix in ((SCRIPT, self.conf.path.python_script_root_dir, '.py'),
+                                       (DVC_COMMAND, self.conf.path.dvc_cmd_root_dir, '_dvc')):
+            for path in discover_files(join(self.conf.top_directory, root_dir), suffix, recursive=False):
+                if self.rel_path(path) not in expected_paths:
+                    orphans.append(ArtifactStatus(None, kind, self.rel_path(path), ORPHANED))
+        return orphans
+
+    def get_status(self, notebooks: List[str]) -> List[ArtifactStatus]:
+        """
+            Return the status of all notebooks artifacts then orphaned artifacts, and save the refreshed index
+        """
+        statuses = [status for notebook in notebooks for status in self.get_notebook_status(notebook)]
+        notebooks_rel_paths = {self.rel_path(notebook) for notebook in notebooks}
+        self.index.entries = {notebook: entry for notebook, entry in self.index.entries.items()
+                              if notebook in notebooks_rel_paths}
+        self.index.save()
+        return statuses + self.get_orphans(statuses)
+
+
+def print_status(statuses: List[ArtifactStatus], stream=None):
+    stream = stream or sys.stdout
+    changes = [status for status in statuses if status.state != UP_TO_DATE]
+    notebooks_count = len({status.notebook for status in statuses if status.notebook})
+    if not changes:
+        stream.write(f'All artifacts of {notebooks_count} notebook(s) are up to date\n')
+    for status in changes:
+        source = f' ({status.notebook})' if status.notebook else ''
+        stream.write(f'    {status.state + ":":<10}{status.path}{source}\n')
+    stream.flush()
+
+
+class MlVToolsStatus(CommandHelper):
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Show missing, stale and orphaned scripts, DVC commands and DVC meta '
+                                           'files of notebooks. Unchanged artifacts are detected from their stat '
+                                           'using an index stored in the cache directory.') \
+            .add_work_dir_argument() \
+            .add_conf_path_argument() \
+            .add_docstring_conf() \
+            .add_path_argument('-n', '--notebooks-dir', type=str, required=True, help='Notebooks directory') \
+            .add_discovery_arguments('notebook') \
+            .add_cache_arguments() \
+            .parse(args)
+
+        self.set_log_level(args)
+        conf = self.get_conf(args.working_directory, args.notebooks_dir, args.conf_path)
+        if not conf.path:
+            raise MlVToolException('Configuration file is mandatory')
+        if not isdir(args.notebooks_dir):
+            raise MlVToolException(f'Notebooks directory {args.notebooks_dir} does not exist')
+        docstring_conf_path = args.docstring_conf or conf.docstring_conf
+        docstring_conf = load_docstring_conf(docstring_conf_path) if docstring_conf_path else None
+
+        index_path = None if args.no_cache else \
+            join(args.cache_dir or get_default_cache_dir(args.working_directory), INDEX_FILE_NAME)
+        notebooks = discover_files(args.notebooks_dir, '.ipynb', PathFilter(args.include, args.ignore),
+                                   args.recursive)
+        check_script_output_paths(notebooks, conf)
+        statuses = ProjectStatus(conf, ArtifactIndex(index_path, conf, docstring_conf), docstring_conf) \
+            .get_status(notebooks)
+        print_status(statuses)
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
-{% if 'metadata' in resources -%}
+{% if 'metadata' in resources and resources['metadata'].get('path') is not none -%}
 # Generated from {{ resources['metadata'].get('path') }}/{{ resources['metadata'].get('name') }}.ipynb
 {%- endif %}
 import argparse
 {# Write main function with optional parameters and docstring #}
 {%- set func_name = resources.get('metadata', {'name': 'input_func'}).get('name') | sanitize_method_name -%}
-{%- set docstring_wrapper = nb.cells | get_data_from_docstring -%}
+{%- set docstring_wrapper = nb.cells | get_data_from_docstring(resources) -%}
 {%- set cells = nb.cells | filter_trailing_cells(resources) | get_formatted_cells(resources) %}
 
 def {{ func_name }}({{ docstring_wrapper.params }}):
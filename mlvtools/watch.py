@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from collections import OrderedDict
+from os.path import join, basename, abspath, exists, isdir, relpath
+from typing import List, Set, Dict, Tuple, Optional
+
+from mlvtools.check_script import run_consistency_check
+from mlvtools.cmd import CommandHelper, ArgumentBuilder
+from mlvtools.conf.conf import MlVToolConf, get_script_output_path, get_dvc_cmd_output_path, load_docstring_conf, \
+    check_script_output_paths
+from mlvtools.discovery import discover_files, discover_directories, PathFilter
+from mlvtools.exception import MlVToolException
+from mlvtools.gen_dvc import gen_dvc_command
+from mlvtools.ipynb_to_dvc import export_to_script_and_dvc
+
+CONSISTENT = 'consistent'
+INCONSISTENT = 'inconsistent'
+REGENERATED = 'regenerated'
+MISSING_SCRIPT = 'missing script'
+ERROR = 'error'
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class PollingObserver:
+    """
+        Detect file changes in directories comparing stat snapshots
+    """
+
+    def __init__(self, directories: List[str], poll_interval: float = 1.):
+        self.directories = directories
+        self.poll_interval = poll_interval
+        self.snapshot = self.get_snapshot()
+
+    def get_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            entry_stat = entry.stat()
+                            snapshot[entry.path] = (entry_stat.st_mtime_ns, entry_stat.st_size)
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def wait_changes(self, timeout: Optional[float]) -> Set[str]:
+        """
+            Return changed file paths, wait until a change happens or the timeout expires
+        """
+        start = time.monotonic()
+        while True:
+            snapshot = self.get_snapshot()
+            changes = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changes:
+                return changes
+            if timeout is not None and time.monotonic() - start >= timeout:
+                return set()
+            time.sleep(self.poll_interval if timeout is None else min(self.poll_interval, timeout))
+
+    def close(self):
+        pass
+
+
+class InotifyObserver:
+    """
+        Detect file changes in directories using Linux inotify
+    """
+
+    def __init__(self, directories: List[str]):
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise MlVToolException('Cannot find libc, inotify is not available')
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, 'inotify_init1'):
+            raise MlVToolException('inotify is not available on this platform')
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise MlVToolException(f'Cannot initialize inotify: {os.strerror(ctypes.get_errno())}')
+        self.watched_dirs = {}
+        for directory in directories:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), INOTIFY_MASK)
+            if wd < 0:
+                self.close()
+                raise MlVToolException(f'Cannot watch {directory}: {os.strerror(ctypes.get_errno())}')
+            self.watched_dirs[wd] = directory
+
+    def wait_changes(self, timeout: Optional[float]) -> Set[str]:
+        """
+            Return changed file paths, wait until a change happens or the timeout expires
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        changes = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            if wd in self.watched_dirs and name:
+                changes.add(join(self.watched_dirs[wd], os.fsdecode(name)))
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+
+def get_observer(directories: List[str], polling: bool = False, poll_interval: float = 1.):
+    """
+        Return an inotify observer, fallback on polling if inotify is not available
+    """
+    if not polling:
+        try:
+            return InotifyObserver(directories)
+        except MlVToolException as e:
+            logging.warning(f'{e}. Fallback on polling.')
+    return PollingObserver(directories, poll_interval)
+
+
+class ProjectWatcher:
+    """
+        Keep notebooks, scripts and DVC commands up to date and track notebooks status.
+        - a changed notebook is converted to script and DVC command
+        - a changed script is checked against its notebook and its DVC command regenerated
+        Notebooks are selected as discover_files does in the notebooks directory.
+    """
+
+    def __init__(self, notebooks_dir: str, conf: MlVToolConf, docstring_conf: dict = None,
+                 path_filter: PathFilter = None, recursive: bool = False):
+        self.notebooks_dir = abspath(notebooks_dir)
+        self.conf = conf
+        self.docstring_conf = docstring_conf
+        self.path_filter = path_filter or PathFilter()
+        self.recursive = recursive
+        self.status: Dict[str, str] = OrderedDict()
+        # Stat of scripts written by the watcher, to ignore their own change events
+        self.generated: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def script_dir(self) -> str:
+        return abspath(join(self.conf.top_directory, self.conf.path.python_script_root_dir))
+
+    def get_notebooks(self) -> List[str]:
+        return discover_files(self.notebooks_dir, '.ipynb', self.path_filter, self.recursive)
+
+    def get_watched_directories(self) -> List[str]:
+        return discover_directories(self.notebooks_dir, self.path_filter, self.recursive) + [self.script_dir]
+
+    def is_notebook(self, path: str) -> bool:
+        """
+            Return true if a changed path, which may not exist anymore, is a notebook the watcher would discover
+        """
+        rel_path = relpath(path, self.notebooks_dir)
+        if not path.endswith('.ipynb') or rel_path.startswith('..'):
+            return False
+        if not self.recursive and '/' in rel_path:
+            return False
+        return self.path_filter.is_selected(rel_path)
+
+    def get_script_notebooks(self) -> Dict[str, str]:
+        return {abspath(get_script_output_path(notebook, self.conf)): notebook for notebook in self.get_notebooks()}
+
+    @staticmethod
+    def get_stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            path_stat = os.stat(path)
+            return path_stat.st_mtime_ns, path_stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def check_notebook(self, notebook: str):
+        script = get_script_output_path(notebook, self.conf)
+        if not exists(script):
+            self.status[notebook] = MISSING_SCRIPT
+            return
+        try:
+            self.status[notebook] = CONSISTENT if run_consistency_check(notebook, script, self.conf) \
+                else INCONSISTENT
+        except MlVToolException as e:
+            logging.error(e)
+            self.status[notebook] = ERROR
+
+    def regenerate_notebook(self, notebook: str):
+        script = get_script_output_path(notebook, self.conf)
+        try:
+            export_to_script_and_dvc(notebook, script, get_dvc_cmd_output_path(script, self.conf), self.conf,
+                                     self.docstring_conf)
+            self.generated[abspath(script)] = self.get_stat(script)
+            self.status[notebook] = REGENERATED
+        except MlVToolException as e:
+            logging.error(e)
+            self.status[notebook] = ERROR
+
+    def regenerate_dvc_command(self, notebook: str, script: str):
+        try:
+            gen_dvc_command(script, get_dvc_cmd_output_path(script, self.conf), self.conf, self.docstring_conf)
+        except MlVToolException as e:
+            logging.error(e)
+            self.status[notebook] = ERROR
+
+    def check_all(self):
+        """
+            Check all notebooks consistency
+        """
+        self.status.clear()
+        for notebook in self.get_notebooks():
+            self.check_notebook(notebook)
+
+    def process_changes(self, paths: Set[str]) -> bool:
+        """
+            Regenerate or check artifacts related to changed paths only
+            Return true if at least one notebook or script was processed
+        """
+        script_notebooks = self.get_script_notebooks()
+        notebooks = set()
+        scripts = set()
+        for path in paths:
+            path = abspath(path)
+            if self.is_notebook(path):
+                notebooks.add(path)
+            elif path in script_notebooks:
+                if self.generated.get(path) == self.get_stat(path):
+                    logging.debug(f'Ignore change of generated script {path}')
+                    continue
+                scripts.add(path)
+
+        for notebook in sorted(notebooks):
+            if not exists(notebook):
+                logging.info(f'Notebook {notebook} removed')
+                self.status.pop(notebook, None)
+                continue
+            logging.info(f'Notebook {notebook} changed')
+            self.regenerate_notebook(notebook)
+
+        for script in sorted(scripts):
+            notebook = script_notebooks[script]
+            if notebook in notebooks:
+                continue
+            logging.info(f'Script {script} changed')
+            self.check_notebook(notebook)
+            if self.status[notebook] == CONSISTENT:
+                self.regenerate_dvc_command(notebook, script)
+        self.status = OrderedDict(sorted(self.status.items()))
+        return bool(notebooks or scripts)
+
+    def print_status(self, stream=sys.stdout):
+        stream.write(f'[{time.strftime("%H:%M:%S")}] Notebooks status\n')
+        for notebook, status in self.status.items():
+            stream.write(f'    {basename(notebook)}: {status}\n')
+        stream.flush()
+
+    def watch(self, observer, coalesce_delay: float = 0.2, max_iterations: int = None):
+        """
+            Wait for changes, coalesce events received during the delay then process them
+        """
+        self.check_all()
+        self.print_status()
+        iteration = 0
+        while max_iterations is None or iteration < max_iterations:
+            changes = observer.wait_changes(None)
+            while True:
+                new_changes = observer.wait_changes(coalesce_delay)
+                if not new_changes:
+                    break
+                changes |= new_changes
+            if self.process_changes(changes):
+                self.print_status()
+            iteration += 1
+
+
+class MlVToolsWatch(CommandHelper):
+    def run(self, *args, **kwargs):
+        args = ArgumentBuilder(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                               description='Watch notebooks and scripts directories. Regenerate scripts and DVC '
+                                           'commands of changed notebooks, check consistency of changed scripts '
+                                           'and display the status of every notebook.') \
+            .add_work_dir_argument() \
+            .add_conf_path_argument() \
+            .add_docstring_conf() \
+            .add_path_argument('-n', '--notebooks-dir', type=str, required=True, help='Notebooks directory') \
+            .add_discovery_arguments('notebook') \
+            .add_argument('--polling', action='store_true', help='Use polling instead of inotify') \
+            .add_argument('--poll-interval', type=float, default=1., help='Polling interval in seconds') \
+            .add_argument('--coalesce-delay', type=float, default=0.2,
+                          help='Delay in seconds used to group change events') \
+            .parse(args)
+
+        self.set_log_level(args)
+        conf = self.get_conf(args.working_directory, args.notebooks_dir, args.conf_path)
+        if not conf.path:
+            raise MlVToolException('Configuration file is mandatory')
+        if not isdir(args.notebooks_dir):
+            raise MlVToolException(f'Notebooks directory {args.notebooks_dir} does not exist')
+        docstring_conf_path = args.docstring_conf or conf.docstring_conf
+        docstring_conf = load_docstring_conf(docstring_conf_path) if docstring_conf_path else None
+
+        watcher = ProjectWatcher(args.notebooks_dir, conf, docstring_conf, PathFilter(args.include, args.ignore),
+                                 args.recursive)
+        check_script_output_paths(watcher.get_notebooks(), conf)
+        # Directories created while watching are not watched
+        observer = get_observer(watcher.get_watched_directories(), args.polling, args.poll_interval)
+        try:
+            watcher.watch(observer, args.coalesce_delay)
+        except KeyboardInterrupt:
+            logging.info('Stop watching')
+        finally:
+            observer.close()
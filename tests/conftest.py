@@ -4,6 +4,16 @@ from os.path import join, dirname
 from pytest import fixture
 
 
+@fixture(autouse=True)
+def user_cache_dir(monkeypatch):
+    """
+        Keep default caches of tested commands out of the user cache directory
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        monkeypatch.setenv('XDG_CACHE_HOME', cache_dir)
+        yield join(cache_dir, 'mlvtools')
+
+
 @fixture
 def work_dir():
     with tempfile.TemporaryDirectory() as work_dir:
@@ -13,3 +13,14 @@ def test_should_raise_if_no_conf(work_dir):
     arguments = ['-n', notebook_path, '--working-directory', work_dir]
     with pytest.raises(MlVToolException):
         IPynbCheckAllScripts().run(*arguments)
+
+
+@pytest.mark.parametrize('jobs', ('0', '-2', 'many'))
+def test_should_exit_if_jobs_is_not_a_positive_integer(work_dir, jobs):
+    """
+        Test command exits with an argument error if --jobs is not a positive integer
+    """
+    arguments = ['-n', work_dir, '--working-directory', work_dir, '--jobs', jobs]
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code == 2
@@ -1,10 +1,15 @@
+import json
+import logging
 from os import makedirs, remove
-from os.path import join, basename
+from os.path import join, basename, exists
 
 import pytest
 
+from mlvtools import check_script
 from mlvtools.check_script import IPynbCheckAllScripts
-from tests.helpers.utils import gen_notebook, write_conf
+from mlvtools.exception import MlVToolException
+from mlvtools.shard import MergeConsistencyReports
+from tests.helpers.utils import gen_notebook, write_conf, init_git_repo, git_commit
 
 
 @pytest.fixture()
@@ -140,3 +145,221 @@ def test_exit_without_error_if_a_script_is_inconsistent_but_ignored(work_dir, no
     with pytest.raises(SystemExit) as e:
         IPynbCheckAllScripts().run(*arguments)
     assert e.value.code == 0
+
+
+def test_should_check_consistency_in_parallel_with_ordered_logs(work_dir, notebook_dir, script_dir, caplog):
+    """
+         Test check consistency with several jobs keeps the serial exit code and logs order
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    write_script(join(script_dir, 'mlvtools_bye.py'), 'print("A different thing")')
+
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--jobs', '3']
+    caplog.set_level(logging.INFO)
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code != 0
+
+    checked = [record.getMessage() for record in caplog.records
+               if record.getMessage().startswith('Run consistency check')]
+    assert [basename(message.split(',')[0]) for message in checked] == ['bye.ipynb', 'hello.ipynb', 'hi.ipynb']
+
+
+def test_should_reuse_cached_verdicts_until_a_script_changes(work_dir, notebook_dir, script_dir, mocker):
+    """
+         Test a second check reuses cached verdicts and only compares the changed script
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--jobs', '1']
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code == 0
+
+    compare_spy = mocker.spy(check_script, 'compare')
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code == 0
+    compare_spy.assert_not_called()
+    assert not exists(join(work_dir, '.mlvtools_cache'))
+
+    write_script(join(script_dir, 'mlvtools_bye.py'), 'print("A different thing")')
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code != 0
+    assert compare_spy.call_count == 1
+
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments, '--no-cache')
+    assert e.value.code != 0
+    assert compare_spy.call_count == 4
+
+
+def test_should_only_check_notebooks_affected_by_changes_since_revision(work_dir, notebook_dir, script_dir, caplog):
+    """
+         Test only notebooks changed, or whose script changed, since a revision are checked
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    init_git_repo(work_dir)
+    revision = git_commit(work_dir, 'init')
+    write_script(join(script_dir, 'mlvtools_bye.py'), 'print("A different thing")')
+    gen_notebook(tmp_dir=notebook_dir, file_name='hi.ipynb', docstring=None,
+                 cells=[('comment', '# A changed comment for hi'),
+                        ('code', 'print("hi")'),
+                        ('code', '# A Tag\nprint("end")')])
+
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--since', revision,
+                 '--no-cache']
+    caplog.set_level(logging.INFO)
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code != 0
+
+    checked = [record.getMessage() for record in caplog.records
+               if record.getMessage().startswith('Run consistency check')]
+    assert [basename(message.split(',')[0]) for message in checked] == ['bye.ipynb', 'hi.ipynb']
+
+
+def test_should_check_shards_and_merge_reports(work_dir, notebook_dir, script_dir):
+    """
+         Test each notebook is checked by one shard and merged reports give the global verdict
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    write_script(join(script_dir, 'mlvtools_bye.py'), 'print("A different thing")')
+
+    report_paths = []
+    for shard in ('1/2', '2/2'):
+        report_paths.append(join(work_dir, f'report_{shard[0]}.json'))
+        arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--shard', shard,
+                     '--shard-report', report_paths[-1]]
+        with pytest.raises(SystemExit):
+            IPynbCheckAllScripts().run(*arguments)
+
+    checked = []
+    for report_path in report_paths:
+        with open(report_path, 'r') as fd:
+            checked += [check['notebook'] for check in json.load(fd)['checks']]
+    assert sorted(checked) == ['notebooks/bye.ipynb', 'notebooks/hello.ipynb', 'notebooks/hi.ipynb']
+
+    with pytest.raises(SystemExit) as e:
+        MergeConsistencyReports().run(*report_paths)
+    assert e.value.code == 1
+
+
+def test_should_write_json_and_junit_reports(work_dir, notebook_dir, script_dir):
+    """
+         Test reports give each notebook verdict, the first difference location, timings and sizes
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    write_script(join(script_dir, 'mlvtools_bye.py'), 'print("A different thing")')
+    json_path, junit_path = join(work_dir, 'report.json'), join(work_dir, 'report.xml')
+
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--no-cache',
+                 '--report', 'json', json_path, '--report', 'junit', junit_path]
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code == 1
+
+    with open(json_path, 'r') as fd:
+        checks = {check['notebook']: check for check in json.load(fd)['checks']}
+    assert checks['notebooks/hello.ipynb']['equals']
+    assert checks['notebooks/hello.ipynb']['method'] == 'direct'
+    assert set(checks['notebooks/hello.ipynb']['timings']) >= {'read', 'parse', 'compare'}
+    assert checks['notebooks/hello.ipynb']['sizes']['script'] > 0
+    assert not checks['notebooks/bye.ipynb']['equals']
+    assert checks['notebooks/bye.ipynb']['location']['notebook_cell'] == 2
+
+    with open(junit_path, 'r') as fd:
+        assert '<failure' in fd.read()
+
+
+def test_should_report_check_errors_and_check_other_notebooks(work_dir, notebook_dir, script_dir):
+    """
+         Test a notebook which cannot be checked is reported as an error without stopping other checks
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    with open(join(notebook_dir, 'bye.ipynb'), 'w') as fd:
+        fd.write('{ not a notebook')
+    json_path, junit_path = join(work_dir, 'report.json'), join(work_dir, 'report.xml')
+
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--no-cache',
+                 '--report', 'json', json_path, '--report', 'junit', junit_path]
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments)
+    assert e.value.code == 1
+
+    with open(json_path, 'r') as fd:
+        checks = {check['notebook']: check for check in json.load(fd)['checks']}
+    assert not checks['notebooks/bye.ipynb']['equals']
+    assert checks['notebooks/bye.ipynb']['error']
+    assert checks['notebooks/hello.ipynb']['equals']
+    assert checks['notebooks/hi.ipynb']['equals']
+
+    with open(junit_path, 'r') as fd:
+        junit = fd.read()
+    assert '<error' in junit
+    assert '<failure' not in junit
+
+
+def test_should_raise_if_unknown_report_format(work_dir, notebook_dir, script_dir):
+    """
+         Test an unknown report format is rejected before running checks
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir,
+                 '--report', 'html', join(work_dir, 'report.html')]
+    with pytest.raises(MlVToolException):
+        IPynbCheckAllScripts().run(*arguments)
+
+
+def test_should_check_notebooks_in_sub_directories_except_ignored_ones(work_dir, notebook_dir, script_dir):
+    """
+         Test recursive discovery checks nested notebooks, skips checkpoints and ignored directories
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    for sub_dir in ('nested', join('nested', '.ipynb_checkpoints'), 'data'):
+        makedirs(join(notebook_dir, sub_dir))
+        gen_notebook(tmp_dir=join(notebook_dir, sub_dir), file_name=f'{basename(sub_dir)}.ipynb', docstring=None,
+                     cells=[('code', 'print("nested")'), ('code', 'print("end")')])
+    write_script(join(script_dir, 'mlvtools_nested.py'), 'print("nested")')
+
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--no-cache']
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments, '--recursive')
+    assert e.value.code == 1
+
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments, '--recursive', '--ignore', 'data/')
+    assert e.value.code == 0
+
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments, '--recursive', '--include', 'nested/*')
+    assert e.value.code == 0
+
+
+def test_should_raise_if_nested_notebooks_have_the_same_script(work_dir, notebook_dir, script_dir):
+    """
+         Test notebooks of different sub directories converted to the same script are rejected
+    """
+    conf_path = join(work_dir, 'conf.json')
+    write_conf(work_dir, conf_path, script_dir=script_dir, dvc_cmd_dir=work_dir)
+    makedirs(join(notebook_dir, 'nested'))
+    gen_notebook(tmp_dir=join(notebook_dir, 'nested'), file_name='hello.ipynb', docstring=None,
+                 cells=[('code', 'print("nested")'), ('code', 'print("end")')])
+
+    arguments = ['-n', notebook_dir, '-c', conf_path, '--working-directory', work_dir, '--no-cache']
+    with pytest.raises(MlVToolException) as e:
+        IPynbCheckAllScripts().run(*arguments, '--recursive')
+    assert 'mlvtools_hello.py' in str(e.value)
+
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckAllScripts().run(*arguments, '--recursive', '--ignore', 'nested/')
+    assert e.value.code == 0
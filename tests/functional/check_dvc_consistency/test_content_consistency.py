@@ -0,0 +1,102 @@
+from os.path import join
+
+import pytest
+
+from mlvtools.check_dvc import DvcCheckCommand, DvcCheckAllCommands
+from mlvtools.gen_dvc import MlScriptToCmd
+from tests.helpers.utils import write_conf, write_min_script
+
+
+@pytest.fixture()
+def conf_path(work_dir):
+    conf_path = join(work_dir, '.mlvtools')
+    write_conf(work_dir, conf_path, script_dir='scripts', dvc_cmd_dir='dvc_cmd')
+    for name in ('step_a', 'step_b', 'step_c'):
+        script_path = join(work_dir, 'scripts', f'{name}.py')
+        write_min_script(script_path, docstring=f'""":dvc-in: ./data/{name}_in.csv\n:dvc-out: ./data/{name}.csv"""')
+        MlScriptToCmd().run('-i', script_path, '--working-directory', work_dir)
+    return conf_path
+
+
+def test_should_check_dvc_command_consistency_and_exit_without_error(work_dir, conf_path):
+    """
+        Test a DVC command generated from the current script docstring is consistent
+    """
+    arguments = ['-i', join(work_dir, 'scripts', 'step_a.py'), '--working-directory', work_dir, '--no-cache']
+    with pytest.raises(SystemExit) as e:
+        DvcCheckCommand().run(*arguments)
+    assert e.value.code == 0
+
+
+def test_should_check_dvc_command_consistency_and_exit_with_error_if_docstring_changed(work_dir, conf_path, caplog):
+    """
+        Test a DVC command is inconsistent once its script dvc output changed, the difference is logged
+    """
+    script_path = join(work_dir, 'scripts', 'step_a.py')
+    write_min_script(script_path, docstring='""":dvc-in: ./data/step_a_in.csv\n:dvc-out: ./data/other.csv"""')
+
+    arguments = ['-i', script_path, '--working-directory', work_dir, '--no-cache']
+    with pytest.raises(SystemExit) as e:
+        DvcCheckCommand().run(*arguments)
+    assert e.value.code == 1
+    assert 'expected "-o ./data/other.csv \\", found "-o ./data/step_a.csv \\"' in caplog.text
+
+
+def test_should_ignore_working_directory_path(work_dir, conf_path):
+    """
+        Test DVC commands generated in another working directory are consistent
+    """
+    dvc_cmd_path = join(work_dir, 'dvc_cmd', 'step_a_dvc')
+    with open(dvc_cmd_path, 'r') as fd:
+        content = fd.read()
+    with open(dvc_cmd_path, 'w') as fd:
+        fd.write(content.replace(f'pushd "{work_dir}"', 'pushd "/another/directory"'))
+
+    arguments = ['-i', join(work_dir, 'scripts', 'step_a.py'), '--working-directory', work_dir, '--no-cache']
+    with pytest.raises(SystemExit) as e:
+        DvcCheckCommand().run(*arguments)
+    assert e.value.code == 0
+
+
+@pytest.mark.parametrize('jobs', ('1', '2'))
+def test_should_check_all_dvc_commands_consistency(work_dir, conf_path, jobs):
+    """
+        Test all DVC commands of the conf scripts directory are checked, exit with error if one is missing
+    """
+    arguments = ['--working-directory', work_dir, '--jobs', jobs, '--no-cache']
+    with pytest.raises(SystemExit) as e:
+        DvcCheckAllCommands().run(*arguments)
+    assert e.value.code == 0
+
+    write_min_script(join(work_dir, 'scripts', 'step_d.py'))
+    with pytest.raises(SystemExit) as e:
+        DvcCheckAllCommands().run(*arguments)
+    assert e.value.code == 1
+
+    with pytest.raises(SystemExit) as e:
+        DvcCheckAllCommands().run(*arguments, '-i', 'step_d.py')
+    assert e.value.code == 0
+
+
+def test_should_reuse_cached_verdicts_until_a_script_changes(work_dir, conf_path, mocker):
+    """
+        Test DVC commands are not regenerated while scripts and DVC commands are unchanged
+    """
+    cache_dir = join(work_dir, 'cache')
+    arguments = ['--working-directory', work_dir, '--jobs', '1', '--cache-dir', cache_dir]
+    # Files modified just before the check are not trusted from their stat
+    mocker.patch('mlvtools.cache.RACY_DELAY', -10)
+    with pytest.raises(SystemExit):
+        DvcCheckAllCommands().run(*arguments)
+
+    compare_mock = mocker.patch('mlvtools.check_dvc.compare_dvc_command', return_value=False)
+    with pytest.raises(SystemExit) as e:
+        DvcCheckAllCommands().run(*arguments)
+    assert e.value.code == 0
+    compare_mock.assert_not_called()
+
+    write_min_script(join(work_dir, 'scripts', 'step_b.py'), docstring='""":dvc-in: ./data/other.csv"""')
+    with pytest.raises(SystemExit) as e:
+        DvcCheckAllCommands().run(*arguments)
+    assert e.value.code == 1
+    compare_mock.assert_called_once()
@@ -0,0 +1,174 @@
+import tempfile
+from os import makedirs, remove, symlink
+from os.path import join
+
+import pytest
+
+from mlvtools.check_revisions import IPynbCheckRevisions, compare_blobs
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME
+from mlvtools.exception import MlVToolException
+from mlvtools.ipynb_to_python import IPynbToPython
+from tests.helpers.utils import gen_notebook, write_conf, init_git_repo, git_commit, run_git
+
+
+@pytest.fixture
+def git_project(work_dir):
+    """
+        A git repository with three commits:
+            - a consistent notebook and script
+            - the notebook updated without script regeneration
+            - the script regenerated
+    """
+    init_git_repo(work_dir)
+    conf_path = join(work_dir, DEFAULT_CONF_FILENAME)
+    write_conf(work_dir, conf_path, script_dir='scripts')
+    notebook_dir = join(work_dir, 'notebooks')
+    makedirs(notebook_dir)
+
+    def write_notebook_and_script(content: str):
+        notebook_path = gen_notebook(cells=[('code', content)], tmp_dir=notebook_dir, file_name='hello.ipynb')
+        IPynbToPython().run('-n', notebook_path, '-w', work_dir, '--force')
+        return notebook_path
+
+    notebook_path = write_notebook_and_script('print("hello")')
+    consistent = git_commit(work_dir, 'consistent')
+    gen_notebook(cells=[('code', 'print("bye")')], tmp_dir=notebook_dir, file_name='hello.ipynb')
+    inconsistent = git_commit(work_dir, 'inconsistent')
+    write_notebook_and_script('print("bye")')
+    fixed = git_commit(work_dir, 'fixed')
+
+    # Working tree content must not be used
+    remove(notebook_path)
+    return work_dir, notebook_dir, consistent, inconsistent, fixed
+
+
+@pytest.mark.parametrize('jobs', ('1', '2'))
+def test_should_check_consistency_on_revision_range(git_project, jobs):
+    """
+        Test consistency is checked from git objects on a consistent revision range
+    """
+    work_dir, notebook_dir, _, inconsistent, _ = git_project
+    arguments = ['-n', notebook_dir, '-w', work_dir, '-r', f'{inconsistent}..HEAD', '--jobs', jobs]
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 0
+
+
+def test_should_check_consistency_from_a_symbolic_link(git_project, caplog):
+    """
+        Test paths are resolved when the working directory is a symbolic link to the repository
+    """
+    work_dir, _, _, inconsistent, _ = git_project
+    with tempfile.TemporaryDirectory() as link_dir:
+        link = join(link_dir, 'project')
+        symlink(work_dir, link)
+        arguments = ['-n', join(link, 'notebooks'), '-w', link, '-r', f'{inconsistent}..HEAD']
+        with pytest.raises(SystemExit) as e:
+            IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 0
+    assert any(record.getMessage().endswith(': 1 notebook(s) consistent') for record in caplog.records)
+
+
+def test_should_exit_with_error_if_one_revision_is_inconsistent(git_project):
+    """
+        Test consistency check fails if one revision of the range is inconsistent
+    """
+    work_dir, notebook_dir, *_ = git_project
+    arguments = ['-n', notebook_dir, '-w', work_dir, '-r', 'HEAD']
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 1
+
+
+def test_should_exit_without_error_if_inconsistent_notebook_is_ignored(git_project):
+    """
+        Test ignored notebooks are not checked
+    """
+    work_dir, notebook_dir, *_ = git_project
+    arguments = ['-n', notebook_dir, '-w', work_dir, '-r', 'HEAD', '-i', 'hello.ipynb']
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 0
+
+
+def test_should_report_revisions_with_notebooks_converted_to_the_same_script(git_project, caplog):
+    """
+        Test a revision with nested notebooks of the same name fails without stopping other revisions checks
+    """
+    work_dir, notebook_dir, _, _, fixed = git_project
+    run_git(work_dir, 'checkout', '--', '.')
+    makedirs(join(notebook_dir, 'nested'))
+    gen_notebook(cells=[('code', 'print("bye")')], tmp_dir=join(notebook_dir, 'nested'), file_name='hello.ipynb')
+    conflicting = git_commit(work_dir, 'conflicting')
+    remove(join(notebook_dir, 'nested', 'hello.ipynb'))
+    git_commit(work_dir, 'removed')
+
+    arguments = ['-n', notebook_dir, '-w', work_dir, '-r', f'{fixed}..HEAD', '--recursive']
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 1
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith(f'{conflicting[:10]}: notebooks') for message in messages)
+    assert f'{run_git(work_dir, "rev-parse", "HEAD")[:10]}: 1 notebook(s) consistent' in messages
+
+
+def test_should_check_staged_content_only(git_project):
+    """
+        Test staged mode reads staged contents from the index and ignores unstaged changes
+    """
+    work_dir, notebook_dir, *_ = git_project
+    run_git(work_dir, 'checkout', '--', '.')
+    arguments = ['-n', notebook_dir, '-w', work_dir, '--staged']
+
+    # Nothing staged
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 0
+
+    # Staged inconsistent notebook, unstaged consistent script
+    gen_notebook(cells=[('code', 'print("hi")')], tmp_dir=notebook_dir, file_name='hello.ipynb')
+    run_git(work_dir, 'add', join(notebook_dir, 'hello.ipynb'))
+    IPynbToPython().run('-n', join(notebook_dir, 'hello.ipynb'), '-w', work_dir, '--force')
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 1
+
+    run_git(work_dir, 'add', '-A')
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run(*arguments)
+    assert e.value.code == 0
+
+
+def test_should_check_staged_content_before_first_commit(work_dir):
+    """
+        Test staged mode checks the staged contents of a repository without commit
+    """
+    init_git_repo(work_dir)
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts')
+    notebook_path = gen_notebook(cells=[('code', 'print("hello")')], tmp_dir=work_dir, file_name='hello.ipynb')
+    IPynbToPython().run('-n', notebook_path, '-w', work_dir)
+    run_git(work_dir, 'add', '-A')
+
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckRevisions().run('-n', work_dir, '-w', work_dir, '--staged')
+    assert e.value.code == 0
+
+
+def test_should_raise_if_both_revisions_and_staged_are_provided(git_project):
+    """
+        Test revision range and staged mode are exclusive
+    """
+    work_dir, notebook_dir, *_ = git_project
+    with pytest.raises(MlVToolException):
+        IPynbCheckRevisions().run('-n', notebook_dir, '-w', work_dir, '-r', 'HEAD', '--staged')
+
+
+def test_should_not_compare_missing_objects():
+    """
+        Test a pair with an object missing from the object database fails without raising
+    """
+    verdict = compare_blobs((None, b'print("hello")', 'notebooks/hello.ipynb', 'scripts/mlvtools_hello.py', None))
+
+    assert not verdict.equals
+    assert verdict.error == 'object missing for notebooks/hello.ipynb'
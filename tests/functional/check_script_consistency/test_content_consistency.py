@@ -1,3 +1,4 @@
+import xml.etree.ElementTree as ET
 from os.path import join
 
 import pytest
@@ -89,3 +90,22 @@ def test_should_check_consistency_and_exit_with_error_if_same_but_diff_from_conf
     with pytest.raises(SystemExit) as e:
         IPynbCheckScript().run(*arguments)
     assert e.value.code != 0
+
+
+def test_should_write_junit_report_with_failure_location(work_dir, ref_notebook_path, ref_script_content):
+    """
+        Test the JUnit report of an inconsistent script gives the first difference location
+    """
+    script_path = join(work_dir, 'script.py')
+    with open(script_path, 'w') as fd:
+        fd.write(ref_script_content.replace("print('poney')", "print('horse')"))
+    report_path = join(work_dir, 'report.xml')
+
+    arguments = ['-n', ref_notebook_path, '-s', script_path, '--working-directory', work_dir,
+                 '--report', 'junit', report_path]
+    with pytest.raises(SystemExit) as e:
+        IPynbCheckScript().run(*arguments)
+    assert e.value.code == 1
+
+    failure = ET.parse(report_path).getroot().find('testcase/failure')
+    assert 'at line 5' in failure.get('message')
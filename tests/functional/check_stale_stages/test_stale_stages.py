@@ -0,0 +1,88 @@
+import hashlib
+from os import makedirs, remove
+from os.path import join
+
+import pytest
+import yaml
+
+from mlvtools.mlv_dvc.dvc_hash import get_dir_md5
+from mlvtools.stale_stages import MlCheckStaleStages, get_stale_stages, StageChange, MISSING, CHANGED, \
+    NOT_RECORDED
+
+
+def write_file(path: str, content: str):
+    with open(path, 'w') as fd:
+        fd.write(content)
+
+
+def md5(content: str) -> str:
+    return hashlib.md5(content.encode()).hexdigest()
+
+
+def write_stage(path: str, deps: dict, outs: dict, wdir: str = None):
+    data = {'cmd': 'python step.py',
+            'deps': [{'path': dep, 'md5': checksum} for dep, checksum in deps.items()],
+            'outs': [{'path': out, 'md5': checksum, 'cache': True} for out, checksum in outs.items()]}
+    if wdir:
+        data['wdir'] = wdir
+    with open(path, 'w') as fd:
+        yaml.dump(data, fd)
+
+
+@pytest.fixture
+def pipeline(work_dir):
+    data_dir = join(work_dir, 'data')
+    makedirs(join(data_dir, 'images'))
+    makedirs(join(work_dir, 'dvc'))
+    write_file(join(data_dir, 'in.csv'), 'a,b\n')
+    write_file(join(data_dir, 'out.csv'), 'c\n')
+    write_file(join(data_dir, 'images', 'img1'), 'x')
+    write_file(join(data_dir, 'images', 'img2'), 'y')
+    images_md5 = get_dir_md5([('img1', md5('x')), ('img2', md5('y'))])
+    write_stage(join(work_dir, 'dvc', 'step1.dvc'), {'data/in.csv': md5('a,b\n')}, {'data/out.csv': md5('c\n')},
+                wdir='..')
+    write_stage(join(work_dir, 'dvc', 'step2.dvc'), {'../data/out.csv': md5('c\n')},
+                {'../data/images': images_md5})
+    return work_dir
+
+
+def test_should_find_no_stale_stage(pipeline):
+    """
+        Test up to date stages with files and directories deps and outs, exit without error
+    """
+    arguments = ['--working-directory', pipeline, '-d', join(pipeline, 'dvc'), '--no-cache']
+    with pytest.raises(SystemExit) as e:
+        MlCheckStaleStages().run(*arguments)
+    assert e.value.code == 0
+
+
+def test_should_find_stale_stages(pipeline):
+    """
+        Test stages with changed, missing or never recorded deps and outs are stale
+    """
+    write_file(join(pipeline, 'data', 'images', 'img3'), 'z')
+    remove(join(pipeline, 'data', 'out.csv'))
+    write_stage(join(pipeline, 'dvc', 'step3.dvc'), {'../data/in.csv': None}, {})
+    stages = [join(pipeline, 'dvc', name) for name in ('step1.dvc', 'step2.dvc', 'step3.dvc')]
+
+    assert get_stale_stages(stages) == {
+        stages[0]: [StageChange('data/out.csv', MISSING)],
+        stages[1]: [StageChange('../data/out.csv', MISSING), StageChange('../data/images', CHANGED)],
+        stages[2]: [StageChange('../data/in.csv', NOT_RECORDED)]}
+
+
+def test_should_only_hash_changed_files(pipeline, mocker):
+    """
+        Test files md5 are cached by stat, only changed files are hashed again
+    """
+    mocker.patch('mlvtools.cache.RACY_DELAY', -10)
+    arguments = ['--working-directory', pipeline, '-d', join(pipeline, 'dvc'), '--jobs', '2']
+    with pytest.raises(SystemExit):
+        MlCheckStaleStages().run(*arguments)
+
+    get_file_md5 = mocker.patch('mlvtools.stale_stages.get_file_md5', return_value='')
+    write_file(join(pipeline, 'data', 'in.csv'), 'a,b,c\n')
+    with pytest.raises(SystemExit) as e:
+        MlCheckStaleStages().run(*arguments)
+    assert e.value.code == 1
+    get_file_md5.assert_called_once_with(join(pipeline, 'data', 'in.csv'))
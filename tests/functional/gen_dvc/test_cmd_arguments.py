@@ -1,9 +1,12 @@
-from os.path import join
+import io
+from os import remove
+from os.path import join, exists
 
 import pytest
 
 from mlvtools.exception import MlVToolException
 from mlvtools.gen_dvc import MlScriptToCmd
+from mlvtools.mlv_dvc.dvc_parser import get_dvc_meta
 from tests.helpers.utils import write_min_script
 
 
@@ -44,3 +47,51 @@ def test_should_overwrite_with_force_argument(work_dir):
 
     with open(dvc_cmd_path, 'r') as fd:
         assert fd.read()
+
+
+def test_should_raise_if_missing_script_path_and_script_from_stdin(work_dir):
+    """
+        Test command raise if script path is not provided when the script is read from stdin
+    """
+    arguments = ['-i', '-', '--out-dvc-cmd', '-', '--working-directory', work_dir]
+    with pytest.raises(MlVToolException):
+        MlScriptToCmd().run(*arguments)
+
+
+def test_should_read_script_from_stdin_and_write_dvc_command_on_stdout(work_dir, mocker, capsys):
+    """
+        Test script is read from stdin and dvc command written on stdout
+    """
+    script_path = join(work_dir, 'script_path.py')
+    write_min_script(script_path, docstring='""":dvc-in: ./data/in.csv"""')
+    with open(script_path, 'r') as fd:
+        mocker.patch('sys.stdin', io.StringIO(fd.read()))
+    remove(script_path)
+
+    arguments = ['-i', '-', '--script-path', script_path, '--out-dvc-cmd', '-', '--working-directory', work_dir]
+    MlScriptToCmd().run(*arguments)
+
+    dvc_bash_content = capsys.readouterr().out
+    assert 'MLV_DVC_META_FILENAME="script_path.dvc"' in dvc_bash_content
+    assert '-d ./data/in.csv' in dvc_bash_content
+    assert 'script_path.py' in dvc_bash_content
+    assert not exists(join(work_dir, '-'))
+
+
+def test_should_write_dvc_file_stage_instead_of_command(work_dir):
+    """
+        Test the DVC meta file is written directly and no DVC command is generated with --dvc-stage
+    """
+    script_path = join(work_dir, 'script_path.py')
+    write_min_script(script_path, '""":dvc-out: ./out.txt"""')
+    dvc_cmd_path = join(work_dir, 'dvc_cmd')
+
+    MlScriptToCmd().run('-i', script_path, '--out-dvc-cmd', dvc_cmd_path, '--working-directory', work_dir,
+                        '--dvc-stage', 'dvc-file')
+
+    assert not exists(dvc_cmd_path)
+    assert get_dvc_meta(join(work_dir, 'script_path.dvc')).outs == ['./out.txt']
+
+    with pytest.raises(MlVToolException):
+        MlScriptToCmd().run('-i', script_path, '--working-directory', work_dir, '--dvc-stage', 'dvc-file')
+    MlScriptToCmd().run('-i', script_path, '--working-directory', work_dir, '--dvc-stage', 'dvc-file', '--force')
@@ -0,0 +1,80 @@
+from os.path import join, exists
+
+import pytest
+import yaml
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME
+from mlvtools.exception import MlVToolException
+from mlvtools.gen_dvc import MlAllScriptsToCmd
+from tests.helpers.utils import write_conf, write_min_script
+
+
+def test_should_generate_dvc_commands_of_all_scripts(work_dir):
+    """
+        Test DVC commands of all scripts of the conf script directory are generated
+    """
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    for name in ('mlvtools_first.py', 'mlvtools_second.py', 'ignored.py'):
+        write_min_script(join(work_dir, 'scripts', name), '""":dvc-out: ./out.txt"""')
+
+    MlAllScriptsToCmd().run('--working-directory', work_dir, '--include', 'mlvtools_*.py', '-j', '2')
+
+    assert exists(join(work_dir, 'dvc', 'mlvtools_first_dvc'))
+    assert exists(join(work_dir, 'dvc', 'mlvtools_second_dvc'))
+    assert not exists(join(work_dir, 'dvc', 'ignored_dvc'))
+    with open(join(work_dir, 'dvc', 'mlvtools_first_dvc'), 'r') as fd:
+        assert 'scripts/mlvtools_first.py' in fd.read()
+
+
+def test_should_aggregate_errors_and_generate_valid_scripts(work_dir, caplog):
+    """
+        Test the DVC commands of valid scripts are generated and errors of other scripts reported
+    """
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    write_min_script(join(work_dir, 'scripts', 'mlvtools_valid.py'))
+    with open(join(work_dir, 'scripts', 'mlvtools_invalid.py'), 'w') as fd:
+        fd.write('import os\n')
+
+    with pytest.raises(MlVToolException) as e:
+        MlAllScriptsToCmd().run('--working-directory', work_dir)
+
+    assert '1 of 2' in str(e.value)
+    assert 'mlvtools_invalid.py' in caplog.text
+    assert exists(join(work_dir, 'dvc', 'mlvtools_valid_dvc'))
+    assert not exists(join(work_dir, 'dvc', 'mlvtools_invalid_dvc'))
+
+
+def test_should_raise_if_dvc_command_exists_and_no_force(work_dir):
+    """
+        Test no DVC command is generated if one already exists and no force argument
+    """
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    write_min_script(join(work_dir, 'scripts', 'mlvtools_first.py'))
+    write_min_script(join(work_dir, 'scripts', 'mlvtools_second.py'))
+    with open(join(work_dir, 'dvc', 'mlvtools_second_dvc'), 'w') as fd:
+        fd.write('')
+
+    with pytest.raises(MlVToolException):
+        MlAllScriptsToCmd().run('--working-directory', work_dir)
+    assert not exists(join(work_dir, 'dvc', 'mlvtools_first_dvc'))
+
+
+def test_should_write_dvc_stages_of_all_scripts(work_dir):
+    """
+        Test DVC stages are written directly in the dvc.yaml file instead of DVC commands
+    """
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    for name in ('mlvtools_first.py', 'mlvtools_second.py'):
+        write_min_script(join(work_dir, 'scripts', name), '""":dvc-out: ./out.txt"""')
+
+    MlAllScriptsToCmd().run('--working-directory', work_dir, '--dvc-stage', 'dvc-yaml')
+
+    assert not exists(join(work_dir, 'dvc', 'mlvtools_first_dvc'))
+    with open(join(work_dir, 'dvc.yaml'), 'r') as fd:
+        stages = yaml.safe_load(fd)['stages']
+    assert stages['mlvtools_first'] == {'cmd': 'scripts/mlvtools_first.py', 'outs': ['./out.txt']}
+    assert 'mlvtools_second' in stages
+
+    with pytest.raises(MlVToolException):
+        MlAllScriptsToCmd().run('--working-directory', work_dir, '--dvc-stage', 'dvc-yaml')
+    MlAllScriptsToCmd().run('--working-directory', work_dir, '--dvc-stage', 'dvc-yaml', '--force')
@@ -0,0 +1,53 @@
+from os import makedirs
+from os.path import join
+
+import pytest
+import yaml
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME, load_conf_or_default, get_script_output_path, \
+    get_dvc_cmd_output_path
+from mlvtools.gen_dvc import gen_dvc_command
+from mlvtools.ipynb_to_dvc import IPynbToDvc
+from mlvtools.ipynb_to_python import export_to_script
+from tests.helpers.utils import gen_notebook, write_conf
+
+
+def read(path: str) -> str:
+    with open(path, 'r') as fd:
+        return fd.read()
+
+
+@pytest.mark.parametrize('docstring, docstring_conf', (
+        (None, None),
+        ('"""\n:param str input_file: the input file\n:dvc-in input_file: ./data/in.csv\n'
+         ':dvc-out: {{ conf.output_file }}\n"""\ninput_file = "in.csv"', {'output_file': './data/other.txt'}),
+        ('"""A summary\n    :dvc-out: ./data/out.csv\n      indented line\n"""', None),
+        ('"""Escaped \\\\n and \\t"""\nprint("no param")', None),
+        ('# No effect\nprint("no docstring")', None)))
+def test_should_generate_same_outputs_as_separated_commands(work_dir, docstring, docstring_conf):
+    """
+        Test single pass ipynb_to_dvc generates the same script and DVC command as
+        ipynb_to_python followed by gen_dvc
+    """
+    if docstring_conf:
+        with open(join(work_dir, 'dc_conf.yml'), 'w') as fd:
+            yaml.dump(docstring_conf, fd)
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME),
+               docstring_conf='dc_conf.yml' if docstring_conf else None)
+    notebook_dir = join(work_dir, 'notebooks')
+    makedirs(notebook_dir)
+    notebook_path = gen_notebook(cells=[('code', 'print("hello")')], tmp_dir=notebook_dir,
+                                 file_name='My Notebook.ipynb', docstring=docstring)
+
+    conf = load_conf_or_default(join(work_dir, DEFAULT_CONF_FILENAME), work_dir)
+    expected_script = join(work_dir, 'expected.py')
+    expected_dvc_cmd = join(work_dir, 'expected_dvc')
+    export_to_script(notebook_path, expected_script, conf)
+    gen_dvc_command(expected_script, expected_dvc_cmd, conf, docstring_conf,
+                    script_path=get_script_output_path(notebook_path, conf))
+
+    IPynbToDvc().run('-n', notebook_path, '--working-directory', work_dir)
+
+    output_script = get_script_output_path(notebook_path, conf)
+    assert read(output_script) == read(expected_script)
+    assert read(get_dvc_cmd_output_path(output_script, conf)) == read(expected_dvc_cmd)
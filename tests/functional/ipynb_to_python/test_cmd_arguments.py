@@ -1,10 +1,12 @@
-from os.path import join
+import io
+from os.path import join, exists
 
 import pytest
 
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME
 from mlvtools.exception import MlVToolException
 from mlvtools.ipynb_to_python import IPynbToPython
-from tests.helpers.utils import gen_notebook
+from tests.helpers.utils import gen_notebook, write_conf
 
 
 def test_should_raise_if_missing_output_path_argument_and_no_conf():
@@ -41,3 +43,32 @@ def test_should_overwrite_with_force_argument(work_dir):
     IPynbToPython().run(*arguments)
     with open(output_path, 'r') as fd:
         assert fd.read()
+
+
+def test_should_raise_if_missing_output_path_argument_and_notebook_from_stdin(work_dir):
+    """
+        Test command raise if output path is not provided when the notebook is read from stdin
+    """
+    conf_path = join(work_dir, DEFAULT_CONF_FILENAME)
+    write_conf(work_dir=work_dir, conf_path=conf_path)
+    arguments = ['-n', '-', '--working-directory', work_dir]
+    with pytest.raises(MlVToolException):
+        IPynbToPython().run(*arguments)
+
+
+def test_should_read_notebook_from_stdin_and_write_script_on_stdout(work_dir, mocker, capsys):
+    """
+        Test notebook is read from stdin and python script written on stdout
+    """
+    notebook_path = gen_notebook(cells=[('code', 'print("poney")')], tmp_dir=work_dir, file_name='test_nb.ipynb')
+    with open(notebook_path, 'r') as fd:
+        mocker.patch('sys.stdin', io.StringIO(fd.read()))
+
+    arguments = ['-n', '-', '--working-directory', work_dir, '-o', '-']
+    IPynbToPython().run(*arguments)
+
+    script_content = capsys.readouterr().out
+    assert 'def mlvtools_notebook():' in script_content
+    assert '# Generated from' not in script_content
+    assert 'print("poney")' in script_content
+    assert not exists(join(work_dir, '-'))
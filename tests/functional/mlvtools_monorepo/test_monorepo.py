@@ -0,0 +1,76 @@
+from os import makedirs
+from os.path import join, exists
+
+import pytest
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME
+from mlvtools.exception import MlVToolException
+from mlvtools.monorepo import MlVToolsMonorepo
+from tests.helpers.utils import write_conf, gen_notebook
+
+
+def setup_project(project_dir: str, notebook_name: str) -> str:
+    makedirs(project_dir, exist_ok=True)
+    write_conf(project_dir, join(project_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    return gen_notebook(cells=[('code', 'pass')], tmp_dir=project_dir, file_name=notebook_name)
+
+
+def test_should_convert_and_check_all_projects(work_dir):
+    """
+        Test the monorepo command converts notebooks of each project with its own configuration,
+        notebooks of a nested project are only handled by the nested project
+    """
+    setup_project(join(work_dir, 'project_a'), 'first.ipynb')
+    setup_project(join(work_dir, 'project_a', 'nested'), 'second.ipynb')
+    setup_project(join(work_dir, 'project_b'), 'third.ipynb')
+
+    with pytest.raises(SystemExit) as e:
+        MlVToolsMonorepo().run('convert', '--working-directory', work_dir, '--recursive')
+    assert e.value.code == 0
+
+    assert exists(join(work_dir, 'project_a', 'scripts', 'mlvtools_first.py'))
+    assert exists(join(work_dir, 'project_a', 'dvc', 'mlvtools_first_dvc'))
+    assert exists(join(work_dir, 'project_a', 'nested', 'scripts', 'mlvtools_second.py'))
+    assert not exists(join(work_dir, 'project_a', 'scripts', 'mlvtools_second.py'))
+    assert exists(join(work_dir, 'project_b', 'scripts', 'mlvtools_third.py'))
+
+    for action in ('check-scripts', 'check-dvc'):
+        with pytest.raises(SystemExit) as e:
+            MlVToolsMonorepo().run(action, '--working-directory', work_dir, '--recursive', '-j', '2')
+        assert e.value.code == 0
+
+
+def test_should_fail_if_one_project_is_inconsistent(work_dir):
+    """
+        Test the monorepo command exits with error if a project check fails
+    """
+    setup_project(join(work_dir, 'project_a'), 'first.ipynb')
+    setup_project(join(work_dir, 'project_b'), 'third.ipynb')
+    with pytest.raises(SystemExit):
+        MlVToolsMonorepo().run('convert', '--working-directory', work_dir)
+
+    gen_notebook(cells=[('code', 'print("changed")')], tmp_dir=join(work_dir, 'project_b'), file_name='third.ipynb')
+
+    with pytest.raises(SystemExit) as e:
+        MlVToolsMonorepo().run('check-scripts', '--working-directory', work_dir, '--no-cache')
+    assert e.value.code == 1
+
+
+def test_should_only_overwrite_converted_notebooks_if_forced(work_dir):
+    """
+        Test the convert action does not overwrite existing scripts or DVC commands without --force
+    """
+    setup_project(join(work_dir, 'project_a'), 'first.ipynb')
+    setup_project(join(work_dir, 'project_b'), 'third.ipynb')
+    makedirs(join(work_dir, 'project_b', 'dvc'), exist_ok=True)
+    with open(join(work_dir, 'project_b', 'dvc', 'mlvtools_third_dvc'), 'w') as fd:
+        fd.write('')
+
+    with pytest.raises(MlVToolException):
+        MlVToolsMonorepo().run('convert', '--working-directory', work_dir)
+    assert not exists(join(work_dir, 'project_a', 'scripts', 'mlvtools_first.py'))
+
+    with pytest.raises(SystemExit) as e:
+        MlVToolsMonorepo().run('convert', '--working-directory', work_dir, '--force')
+    assert e.value.code == 0
+    assert exists(join(work_dir, 'project_b', 'scripts', 'mlvtools_third.py'))
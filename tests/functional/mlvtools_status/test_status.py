@@ -0,0 +1,41 @@
+from os import makedirs
+from os.path import join, exists
+
+import pytest
+
+from mlvtools.cache import get_default_cache_dir
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME
+from mlvtools.exception import MlVToolException
+from mlvtools.ipynb_to_dvc import IPynbToDvc
+from mlvtools.status import MlVToolsStatus
+from tests.helpers.utils import write_conf, gen_notebook
+
+
+def test_should_display_artifacts_status(work_dir, capsys):
+    """
+        Test the status command displays missing artifacts and writes the index in the cache directory
+    """
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    notebook_dir = join(work_dir, 'notebooks')
+    makedirs(notebook_dir)
+    notebook = gen_notebook(cells=[('code', 'print("hello")')], tmp_dir=notebook_dir, file_name='hello.ipynb')
+    gen_notebook(cells=[('code', 'print("bye")')], tmp_dir=notebook_dir, file_name='bye.ipynb')
+    IPynbToDvc().run('-n', notebook, '--working-directory', work_dir)
+    capsys.readouterr()
+
+    MlVToolsStatus().run('-n', notebook_dir, '--working-directory', work_dir)
+
+    output = capsys.readouterr().out
+    assert 'missing:  scripts/mlvtools_bye.py (notebooks/bye.ipynb)' in output
+    assert 'missing:  dvc/mlvtools_bye_dvc (notebooks/bye.ipynb)' in output
+    assert 'mlvtools_hello.py' not in output
+    assert exists(join(get_default_cache_dir(work_dir), 'index.json'))
+    assert not exists(join(work_dir, '.mlvtools_cache'))
+
+
+def test_should_raise_if_no_conf(work_dir):
+    """
+        Test the status command requires a configuration
+    """
+    with pytest.raises(MlVToolException):
+        MlVToolsStatus().run('-n', work_dir, '--working-directory', work_dir)
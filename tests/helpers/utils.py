@@ -1,4 +1,5 @@
 import json
+import subprocess
 from os import makedirs
 from os.path import join
 from typing import List, Tuple
@@ -77,3 +78,18 @@ def write_dvc_file(path: str, cmd: str, deps: List[str], outs: List[str]):
             'outs': [{'path': out} for out in outs]}
     with open(path, 'w') as fd:
         yaml.dump(data, fd)
+
+
+def run_git(work_dir: str, *args: str) -> str:
+    return subprocess.run(['git', '-c', 'user.name=mlvtools', '-c', 'user.email=mlvtools@test', *args],
+                          cwd=work_dir, check=True, stdout=subprocess.PIPE).stdout.decode()
+
+
+def init_git_repo(work_dir: str):
+    run_git(work_dir, 'init', '-q')
+
+
+def git_commit(work_dir: str, message: str) -> str:
+    run_git(work_dir, 'add', '-A')
+    run_git(work_dir, 'commit', '-q', '--allow-empty', '-m', message)
+    return run_git(work_dir, 'rev-parse', 'HEAD').strip()
@@ -0,0 +1,97 @@
+from os.path import join
+
+import pytest
+
+from mlvtools.conf.conf import MlVToolConf
+from mlvtools.diff.notebook import compare_notebook_to_script, UnsupportedNotebookException
+from mlvtools.diff.parse import get_ast
+from mlvtools.ipynb_to_python import get_converted_script, read_notebook
+from tests.helpers.utils import gen_notebook
+
+DOCSTRING = '"""\nA docstring\n:param str data: Some data\n:param List[int] sizes: Some sizes\n"""'
+
+
+@pytest.fixture
+def conf(work_dir):
+    return MlVToolConf(top_directory=work_dir, ignore_keys=['# No effect', '# Ignore'])
+
+
+NOTEBOOKS = (
+    (DOCSTRING, [('code', 'print(data)'), ('comment', '# A comment'), ('code', 'x = """a\nb"""\nprint(x)')]),
+    ('"""\nA docstring without params\n"""', [('code', 'import os'), ('code', 'print(os.sep)')]),
+    (None, [('code', 'print(0)'), ('code', '%matplotlib inline\nprint(1)'), ('code', '# Ignore\nprint(2)'),
+            ('code', 'def f():\n    return 3')]),
+    (None, [('code', 'print(1)'), ('code', '# No effect'), ('comment', 'Trailing comment')]),
+    (None, [('comment', 'Only a comment')]),
+    (None, []),
+)
+
+
+@pytest.mark.parametrize('docstring, cells', NOTEBOOKS)
+def test_should_find_notebook_conversion_consistent(conf, work_dir, docstring, cells):
+    """
+        Test a notebook is consistent with its conversion
+    """
+    notebook_path = gen_notebook(cells=cells, tmp_dir=work_dir, file_name='a notebook.ipynb', docstring=docstring)
+    script_ast = get_ast(get_converted_script(notebook_path, conf))
+
+    assert compare_notebook_to_script(read_notebook(notebook_path), 'a notebook', script_ast, conf) is None
+
+
+def test_should_not_generate_script(conf, work_dir, mocker):
+    """
+        Test nbconvert exporter is not used to compare a notebook with a script
+    """
+    notebook_path = gen_notebook(cells=NOTEBOOKS[0][1], tmp_dir=work_dir, file_name='nb.ipynb', docstring=DOCSTRING)
+    script_ast = get_ast(get_converted_script(notebook_path, conf))
+    exporter_mock = mocker.patch('mlvtools.ipynb_to_python.get_exporter')
+
+    assert compare_notebook_to_script(read_notebook(notebook_path), 'nb', script_ast, conf) is None
+    exporter_mock.assert_not_called()
+
+
+@pytest.mark.parametrize('old, new, cell_index', (('print(data)', 'print(sizes)', 1),
+                                                  ('print(x)', 'print(x)\n    print(x)', 3),
+                                                  ('"""a\n    b"""', '"""a\nb"""', 3),
+                                                  ('(data, sizes):', '(data):', None),
+                                                  ("nargs='+'", "nargs='*'", None)))
+def test_should_find_first_difference_cell(conf, work_dir, old, new, cell_index):
+    """
+        Test the first difference is located in the script and in the notebook
+    """
+    notebook_path = gen_notebook(cells=NOTEBOOKS[0][1], tmp_dir=work_dir, file_name='nb.ipynb', docstring=DOCSTRING)
+    script_content = get_converted_script(notebook_path, conf)
+    assert old in script_content
+    diff_script_content = script_content.replace(old, new)
+    diff_line = next(index + 1 for index, (line, diff_line) in
+                     enumerate(zip(script_content.split('\n'), diff_script_content.split('\n'))) if line != diff_line)
+
+    difference = compare_notebook_to_script(read_notebook(notebook_path), 'nb', get_ast(diff_script_content), conf)
+
+    assert difference.cell_index == cell_index
+    assert difference.script_line <= diff_line
+
+
+def test_should_raise_if_cell_is_not_complete(conf, work_dir):
+    """
+        Test a cell which can not be parsed on its own is not compared directly
+    """
+    notebook_path = gen_notebook(cells=[('code', 'print(0)'), ('code', 'x = (1,'), ('code', '2)')],
+                                 tmp_dir=work_dir, file_name='nb.ipynb')
+    script_ast = get_ast(get_converted_script(notebook_path, conf))
+
+    with pytest.raises(UnsupportedNotebookException):
+        compare_notebook_to_script(read_notebook(notebook_path), 'nb', script_ast, conf)
+
+
+def test_should_detect_extra_statement(conf, work_dir):
+    """
+        Test an extra script statement is detected
+    """
+    notebook_path = gen_notebook(cells=[('code', 'print(1)')], tmp_dir=work_dir, file_name='nb.ipynb')
+    script_content = get_converted_script(notebook_path, conf).replace('print(1)', 'print(1)\n    print(2)')
+    script_path = join(work_dir, 'script.py')
+
+    difference = compare_notebook_to_script(read_notebook(notebook_path), 'nb', get_ast(script_content, script_path),
+                                            conf)
+    assert 'unexpected' in difference.reason
@@ -1,8 +1,10 @@
+import ast
 from os.path import join
 
 import pytest
 
-from mlvtools.diff.parse import get_ast, is_ast_equal, get_ast_from_file
+from mlvtools.diff import parse
+from mlvtools.diff.parse import get_ast, is_ast_equal, get_ast_from_file, find_first_difference
 from mlvtools.exception import MlVToolException
 
 
@@ -149,3 +151,45 @@ def test_script_must_not_be_ast_equals(script_base, diff_script_content):
     diff_ast = get_ast(diff_script_content)
 
     assert not is_ast_equal(base_ast, diff_ast)
+
+
+def test_should_report_first_difference_lines(script_base):
+    """
+        Test the first difference is located in both trees
+    """
+    difference = find_first_difference(get_ast(script_base), get_ast(get_script_base_spaces_and_blank().replace(
+        'return os.listdir(dir_path)', 'return dir_path')))
+
+    assert difference.line_a == 8
+    assert difference.line_b == 12
+
+
+def test_should_report_extra_statement():
+    """
+        Test an extra statement is located at its line and at the end of the other tree
+    """
+    difference = find_first_difference(get_ast('a = 1\nb = 2\n'), get_ast('a = 1\nb = 2\nc = 3\n'))
+
+    assert (difference.line_a, difference.line_b) == (2, 3)
+    assert 'Assign' in difference.reason
+
+
+@pytest.mark.parametrize('content_a, content_b', (('a = 1', 'a = True'), ('a = 1', 'a = 1.0'),
+                                                  ('f(a, b=1)', 'f(a, c=1)'), ('import os', 'import sys')))
+def test_should_find_difference_like_ast_dump(content_a, content_b):
+    """
+        Test values considered different by ast dump are different
+    """
+    assert ast.dump(get_ast(content_a)) != ast.dump(get_ast(content_b))
+    assert find_first_difference(get_ast(content_a), get_ast(content_b))
+
+
+def test_should_stop_at_first_difference(mocker):
+    """
+        Test nodes after the first difference are not visited
+    """
+    content = 'a = 1\n' + 'b = 2\n' * 100
+    compare_spy = mocker.spy(parse, '_compare_nodes')
+
+    assert find_first_difference(get_ast(content), get_ast(content.replace('a = 1', 'a = 2', 1)))
+    assert compare_spy.call_count < 10
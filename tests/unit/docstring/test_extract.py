@@ -1,9 +1,11 @@
+import io
 from os.path import join
 from uuid import uuid4
 
 import pytest
 
-from mlvtools.docstring_helpers.extract import extract_docstring_from_file, extract_docstring
+from mlvtools.docstring_helpers.extract import extract_docstring_from_file, extract_docstring, \
+    get_first_function_docstring, extract_docstring_from_content
 from mlvtools.exception import MlVToolException
 
 
@@ -108,3 +110,33 @@ def test_should_extract_docstring():
     with pytest.raises(MlVToolException) as e:
         extract_docstring(docstring_cell.format(multiline_docstring))
     assert isinstance(e.value.__cause__, SyntaxError)
+
+
+def test_should_read_script_only_up_to_first_function_docstring():
+    """
+        Test the first function docstring is extracted without reading the rest of the script
+    """
+    script = io.StringIO('import os\n\n\n@decorator\ndef my_method(param: str,\n              other):\n'
+                         '    # A comment\n    """\n    :param param: A param\n    """\n    pass\n' +
+                         'print("unread")\n' * 1000)
+    read_lines = []
+
+    def readline() -> str:
+        read_lines.append(script.readline())
+        return read_lines[-1]
+
+    assert get_first_function_docstring(readline) == ('my_method', ':param param: A param')
+    assert len(read_lines) < 15
+
+
+@pytest.mark.parametrize('content', ('def my_method(): pass\nclass A:\n    """ Not a function docstring """\n',
+                                     'def my_method():\n    pass\n',
+                                     'class A:\n    def my_method(self):\n        """ A docstring """\n',
+                                     'def my_method():\n    """ A docstring """ " concatenated"\n'))
+def test_should_extract_docstring_from_ast_if_not_found_by_tokens(content):
+    """
+        Test the syntax tree is used when the docstring cannot be found from tokens
+    """
+    assert get_first_function_docstring(io.StringIO(content).readline) is None
+    docstring_info = extract_docstring_from_content(content, 'script.py')
+    assert docstring_info.method_name == 'my_method'
@@ -3,7 +3,8 @@ from docstring_parser import ParseError
 from jinja2 import TemplateSyntaxError, UndefinedError
 
 from mlvtools.docstring_helpers.parse import parse_docstring, DocstringDvc, DocstringDvcIn, DocstringDvcOut, \
-    get_dvc_params, DocstringDvcExtra, DocstringDvcCommand, resolve_docstring
+    get_dvc_params, DocstringDvcExtra, DocstringDvcCommand, resolve_docstring, get_docstring_cache_info, \
+    clear_docstring_cache
 from mlvtools.exception import MlVToolException
 
 
@@ -324,3 +325,37 @@ def test_should_raise_if_template_variable_is_missing(missing_pattern):
     with pytest.raises(MlVToolException) as e:
         resolve_docstring(docstring, docstring_conf={})
     assert isinstance(e.value.__cause__, UndefinedError)
+
+
+def test_should_memoize_parsed_docstring_and_dvc_params():
+    """
+        Test identical docstrings are parsed once and their DVC parameters extracted once
+    """
+    clear_docstring_cache()
+    docstring_str = ':param str param1: Param1 description\n:dvc-out param1: path/to/file.txt'
+
+    docstring = parse_docstring(docstring_str)
+    dvc_params = get_dvc_params(docstring)
+
+    assert parse_docstring(docstring_str) is docstring
+    assert get_dvc_params(parse_docstring(docstring_str)) is dvc_params
+    cache_info = get_docstring_cache_info()
+    assert (cache_info['parse'].hits, cache_info['parse'].misses) == (2, 1)
+    assert (cache_info['dvc_params'].hits, cache_info['dvc_params'].misses) == (1, 1)
+
+
+def test_should_return_immutable_parsed_results():
+    """
+        Test memoized docstrings and DVC parameters cannot be mutated by callers
+    """
+    docstring = parse_docstring(':param str param1: Param1 description\n:dvc-out param1: path/to/file.txt')
+    dvc_params = get_dvc_params(docstring)
+
+    with pytest.raises(AttributeError):
+        docstring.params[0].arg_name = 'other'
+    with pytest.raises(AttributeError):
+        docstring.meta.append(None)
+    with pytest.raises(AttributeError):
+        dvc_params.dvc_out[0].file_path = 'other'
+    with pytest.raises(AttributeError):
+        dvc_params.dvc_out.append(DocstringDvcOut('other'))
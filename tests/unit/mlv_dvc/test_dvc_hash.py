@@ -0,0 +1,57 @@
+import hashlib
+import json
+from os.path import join
+
+import pytest
+
+from mlvtools.mlv_dvc.dvc_hash import get_file_md5, get_dir_md5, is_text, CHUNK_SIZE
+
+
+def write_bytes(path: str, content: bytes) -> str:
+    with open(path, 'wb') as fd:
+        fd.write(content)
+    return path
+
+
+@pytest.mark.parametrize('block, expected', ((b'', True),
+                                             (b'a,b\r\n1,2\n', True),
+                                             (b'a\x00b', False),
+                                             (bytes(range(128, 256)), False)))
+def test_should_guess_text_files(block, expected):
+    """
+        Test text detection: empty and mostly printable blocks are text, null bytes are binary
+    """
+    assert is_text(block) == expected
+
+
+def test_should_hash_text_files_with_unix_line_endings(work_dir):
+    """
+        Test text files md5 is computed with unix line endings, binary files are hashed as is
+    """
+    text_path = write_bytes(join(work_dir, 'data.csv'), b'a,b\r\n1,2\r\n')
+    binary_path = write_bytes(join(work_dir, 'data.bin'), b'\x00\r\n')
+    empty_path = write_bytes(join(work_dir, 'empty'), b'')
+
+    assert get_file_md5(text_path) == hashlib.md5(b'a,b\n1,2\n').hexdigest()
+    assert get_file_md5(binary_path) == hashlib.md5(b'\x00\r\n').hexdigest()
+    assert get_file_md5(empty_path) == hashlib.md5(b'').hexdigest()
+
+
+def test_should_convert_line_endings_chunk_by_chunk(work_dir):
+    """
+        Test a line ending split between two chunks is kept, as DVC does
+    """
+    content = b'a' * (CHUNK_SIZE - 1) + b'\r\n' + b'b\r\n'
+    path = write_bytes(join(work_dir, 'large.txt'), content)
+
+    assert get_file_md5(path) == hashlib.md5(b'a' * (CHUNK_SIZE - 1) + b'\r\nb\n').hexdigest()
+
+
+def test_should_hash_directory_listing():
+    """
+        Test directory md5 is the md5 of its sorted JSON listing with the .dir suffix
+    """
+    listing = [{'md5': '1', 'relpath': 'a.csv'}, {'md5': '2', 'relpath': 'sub/b.csv'}]
+    expected = hashlib.md5(json.dumps(listing, sort_keys=True).encode()).hexdigest() + '.dir'
+
+    assert get_dir_md5([('sub/b.csv', '2'), ('a.csv', '1')]) == expected
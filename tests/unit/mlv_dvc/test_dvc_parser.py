@@ -142,7 +142,7 @@ def test_should_get_dvc_meta(work_dir):
     write_dvc_file(step_file, cmd, deps, outs)
 
     dvc_meta = get_dvc_meta(step_file)
-    assert dvc_meta == DvcMeta(name='step_test.dvc', cmd=cmd, deps=deps, outs=outs)
+    assert dvc_meta == DvcMeta(name='step_test.dvc', cmd=cmd, deps=deps, outs=outs, wdir='.', checksums={})
 
 
 def test_should_raise_if_not_exists():
@@ -0,0 +1,87 @@
+from os.path import join
+
+import pytest
+import yaml
+
+from mlvtools.exception import MlVToolException
+from mlvtools.mlv_dvc.dvc_parser import get_dvc_meta
+from mlvtools.mlv_dvc.dvc_stage import write_dvc_stage, DVC_FILE_FORMAT, DVC_YAML_FORMAT, get_stage_data
+
+
+def get_info(work_dir: str, meta_file_name: str = 'dvc/mlvtools_step.dvc') -> dict:
+    return {
+        'variables': ['PARAM_ONE="data/in.csv"'],
+        'values': {'PARAM_ONE': 'data/in.csv', 'MLV_META': meta_file_name},
+        'meta_file_name_var': 'MLV_META',
+        'whole_command': None,
+        'python_script': 'scripts/mlvtools_step.py',
+        'working_directory': work_dir,
+        'dvc_inputs': ['$PARAM_ONE', 'data/other.csv'],
+        'dvc_outputs': ['data/out.csv'],
+        'dvc_outputs_persist': ['data/model'],
+        'python_params': '--param-one $PARAM_ONE --rate 12'
+    }
+
+
+def test_should_write_dvc_file_stage(work_dir):
+    """
+        Test a legacy DVC meta file is written with resolved variables and relative working directory
+    """
+    dvc_file = write_dvc_stage(get_info(work_dir), DVC_FILE_FORMAT)
+
+    assert dvc_file == join(work_dir, 'dvc', 'mlvtools_step.dvc')
+    dvc_meta = get_dvc_meta(dvc_file)
+    assert dvc_meta.cmd == 'scripts/mlvtools_step.py --param-one data/in.csv --rate 12'
+    assert dvc_meta.deps == ['data/in.csv', 'data/other.csv']
+    assert dvc_meta.outs == ['data/out.csv', 'data/model']
+    assert dvc_meta.wdir == '..'
+    assert not dvc_meta.checksums
+    with open(dvc_file, 'r') as fd:
+        assert [out['persist'] for out in yaml.safe_load(fd)['outs']] == [False, True]
+
+
+def test_should_add_stages_to_dvc_yaml(work_dir):
+    """
+        Test stages are added to the dvc.yaml file of the meta file directory, other stages are kept
+    """
+    write_dvc_stage(get_info(work_dir, 'dvc/first.dvc'), DVC_YAML_FORMAT)
+    dvc_yaml = write_dvc_stage(get_info(work_dir, 'dvc/second.dvc'), DVC_YAML_FORMAT)
+
+    assert dvc_yaml == join(work_dir, 'dvc', 'dvc.yaml')
+    with open(dvc_yaml, 'r') as fd:
+        stages = yaml.safe_load(fd)['stages']
+    assert sorted(stages) == ['first', 'second']
+    assert stages['first'] == {'cmd': 'scripts/mlvtools_step.py --param-one data/in.csv --rate 12',
+                               'wdir': '..',
+                               'deps': ['data/in.csv', 'data/other.csv'],
+                               'outs': ['data/out.csv', {'data/model': {'persist': True}}]}
+
+
+def test_should_raise_if_whole_command():
+    """
+        Test a stage cannot be written from a whole DVC command
+    """
+    info = get_info('.')
+    info['whole_command'] = 'dvc run -o out.csv ./script.py'
+    with pytest.raises(MlVToolException):
+        get_stage_data(info)
+
+
+@pytest.mark.parametrize('stage_format', (DVC_FILE_FORMAT, DVC_YAML_FORMAT))
+def test_should_only_overwrite_existing_stage_if_forced(work_dir, stage_format):
+    """
+        Test an existing DVC meta file or dvc.yaml stage is not overwritten without force
+    """
+    write_dvc_stage(get_info(work_dir), stage_format)
+    other_info = get_info(work_dir)
+    other_info['python_params'] = ''
+
+    with pytest.raises(MlVToolException):
+        write_dvc_stage(other_info, stage_format)
+    write_dvc_stage(get_info(work_dir, 'dvc/other_step.dvc'), stage_format)
+
+    stage_file = write_dvc_stage(other_info, stage_format, force=True)
+    with open(stage_file, 'r') as fd:
+        content = yaml.safe_load(fd)
+    stage = content['stages']['mlvtools_step'] if stage_format == DVC_YAML_FORMAT else content
+    assert stage['cmd'] == 'scripts/mlvtools_step.py'
@@ -0,0 +1,93 @@
+from os.path import join, realpath
+
+import pytest
+
+from mlvtools.exception import MlVToolException
+from mlvtools.mlv_git.git_objects import GitObjectReader, get_revisions, get_tree_entries, get_git_top_directory, \
+    get_changed_paths, get_staged_paths
+from tests.helpers.utils import init_git_repo, git_commit, run_git
+
+
+@pytest.fixture
+def git_repo(work_dir):
+    init_git_repo(work_dir)
+    with open(join(work_dir, 'file.txt'), 'w') as fd:
+        fd.write('first')
+    first = git_commit(work_dir, 'first')
+    with open(join(work_dir, 'file.txt'), 'w') as fd:
+        fd.write('second')
+    second = git_commit(work_dir, 'second')
+    return work_dir, first, second
+
+
+def test_should_get_revisions_oldest_first(git_repo):
+    """
+        Test revisions of a range are returned oldest first
+    """
+    work_dir, first, second = git_repo
+    assert get_revisions('HEAD', work_dir) == [first, second]
+    assert get_revisions(f'{first}..HEAD', work_dir) == [second]
+
+
+def test_should_get_tree_entries(git_repo):
+    """
+        Test blob entries are listed for a revision
+    """
+    work_dir, first, _ = git_repo
+    entries = get_tree_entries(first, work_dir)
+    assert list(entries.keys()) == ['file.txt']
+    assert entries['file.txt'].sha
+
+
+def test_should_raise_if_not_a_git_repository(work_dir):
+    """
+        Test git errors are raised as MlVToolException
+    """
+    with pytest.raises(MlVToolException):
+        get_git_top_directory(work_dir)
+
+
+def test_should_read_objects_content(git_repo):
+    """
+        Test objects are read one by one or in batch, missing object are None
+    """
+    work_dir, first, second = git_repo
+    with GitObjectReader(work_dir) as reader:
+        assert reader.read(f'{first}:file.txt') == b'first'
+        assert reader.read(f'{first}:does_not_exist.txt') is None
+        contents = reader.read_all([f'{first}:file.txt', f'{second}:file.txt', 'HEAD:missing'])
+    assert contents == {f'{first}:file.txt': b'first',
+                        f'{second}:file.txt': b'second',
+                        'HEAD:missing': None}
+
+
+def test_should_get_paths_changed_since_revision(git_repo):
+    """
+        Test committed, unstaged and untracked changes are listed
+    """
+    work_dir, first, second = git_repo
+    with open(join(work_dir, 'other.txt'), 'w') as fd:
+        fd.write('other')
+    top_directory = realpath(work_dir)
+
+    assert get_changed_paths(second, work_dir) == {join(top_directory, 'other.txt')}
+    assert get_changed_paths(first, work_dir) == {join(top_directory, 'other.txt'), join(top_directory, 'file.txt')}
+
+
+def test_should_get_staged_paths_before_and_after_first_commit(work_dir):
+    """
+        Test staged paths are listed in a repository without commit, then compared to HEAD
+    """
+    init_git_repo(work_dir)
+    for name in ('file.txt', 'other.txt'):
+        with open(join(work_dir, name), 'w') as fd:
+            fd.write(name)
+    run_git(work_dir, 'add', 'file.txt')
+    assert get_staged_paths(work_dir) == {'file.txt'}
+
+    git_commit(work_dir, 'first')
+    assert get_staged_paths(work_dir) == set()
+    with open(join(work_dir, 'file.txt'), 'w') as fd:
+        fd.write('changed')
+    run_git(work_dir, 'add', 'file.txt')
+    assert get_staged_paths(work_dir) == {'file.txt'}
@@ -0,0 +1,136 @@
+import os
+import pickle
+from os.path import join
+
+from mlvtools.cache import MlVToolCache, hash_notebook, count_cache_misses, get_checks_jobs, get_default_cache_dir
+from mlvtools.check_script import run_consistency_check
+from mlvtools.conf.conf import MlVToolConf
+from tests.helpers.utils import gen_notebook
+
+
+def make_old(path: str):
+    """
+        Move the file modification time back so its stat can be trusted by the cache
+    """
+    os.utime(path, (1, 1))
+
+
+def test_should_hash_notebook_code_sources_only(work_dir):
+    """
+        Test notebook hash ignores outputs and markdown contents
+    """
+    notebook_path = gen_notebook(cells=[('comment', '# A comment'), ('code', 'print(1)')], tmp_dir=work_dir,
+                                 file_name='nb.ipynb')
+    with open(notebook_path, 'rb') as fd:
+        content = fd.read()
+    other_path = gen_notebook(cells=[('comment', '# Another comment'), ('code', 'print(1)')], tmp_dir=work_dir,
+                              file_name='other.ipynb')
+    with open(other_path, 'rb') as fd:
+        assert hash_notebook(content) == hash_notebook(fd.read())
+    changed_path = gen_notebook(cells=[('comment', '# A comment'), ('code', 'print(2)')], tmp_dir=work_dir,
+                                file_name='changed.ipynb')
+    with open(changed_path, 'rb') as fd:
+        assert hash_notebook(content) != hash_notebook(fd.read())
+
+
+def test_should_reuse_file_hash_while_stat_is_unchanged(work_dir, mocker):
+    """
+        Test file content is not read again if its stat is unchanged
+    """
+    file_path = join(work_dir, 'script.py')
+    with open(file_path, 'w') as fd:
+        fd.write('print(1)')
+    make_old(file_path)
+    cache = MlVToolCache(join(work_dir, 'cache'))
+    file_hash = cache.get_file_hash(file_path)
+
+    open_mock = mocker.patch('mlvtools.cache.open', side_effect=AssertionError('Should not be read'),
+                             create=True)
+    assert MlVToolCache(join(work_dir, 'cache')).get_file_hash(file_path) == file_hash
+    open_mock.assert_not_called()
+
+
+def test_should_not_trust_stat_of_recently_modified_file(work_dir):
+    """
+        Test a recently modified file is hashed again
+    """
+    file_path = join(work_dir, 'script.py')
+    with open(file_path, 'w') as fd:
+        fd.write('print(1)')
+    cache = MlVToolCache(join(work_dir, 'cache'))
+    file_hash = cache.get_file_hash(file_path)
+    with open(file_path, 'w') as fd:
+        fd.write('print(2)')
+    assert cache.get_file_hash(file_path) != file_hash
+
+
+def test_should_reuse_consistency_verdict(work_dir, mocker):
+    """
+        Test consistency check is not run again for unchanged notebook, script and conf
+        and run again if the script changes
+    """
+    notebook_path = gen_notebook(cells=[('code', 'print(1)')], tmp_dir=work_dir, file_name='nb.ipynb')
+    script_path = join(work_dir, 'mlvtools_nb.py')
+    with open(script_path, 'w') as fd:
+        fd.write('print(1)')
+    cache = MlVToolCache(join(work_dir, 'cache'))
+    compare_mock = mocker.patch('mlvtools.check_script.compare', return_value=True)
+
+    assert run_consistency_check(notebook_path, script_path, MlVToolConf(top_directory=work_dir), cache)
+    assert run_consistency_check(notebook_path, script_path, MlVToolConf(top_directory=work_dir), cache)
+    assert compare_mock.call_count == 1
+
+    assert run_consistency_check(notebook_path, script_path, MlVToolConf(top_directory=work_dir,
+                                                                         ignore_keys=['# Ignore']), cache)
+    assert compare_mock.call_count == 2
+
+    compare_mock.return_value = False
+    with open(script_path, 'w') as fd:
+        fd.write('print(2)')
+    assert not run_consistency_check(notebook_path, script_path, MlVToolConf(top_directory=work_dir), cache)
+    assert compare_mock.call_count == 3
+
+
+def test_should_be_picklable_after_use(work_dir):
+    """
+        Test a cache with an open connection can be sent to worker processes
+    """
+    cache = MlVToolCache(join(work_dir, 'cache'))
+    cache.set_consistency('key', True)
+    assert pickle.loads(pickle.dumps(cache)).get_consistency('key') is True
+
+
+def test_should_ignore_unusable_cache_directory(work_dir):
+    """
+        Test a cache which can not be created does not fail
+    """
+    blocking_file = join(work_dir, 'cache')
+    with open(blocking_file, 'w') as fd:
+        fd.write('')
+    cache = MlVToolCache(blocking_file)
+    cache.set_consistency('key', True)
+    assert cache.get_consistency('key') is None
+
+
+def test_should_count_checks_without_cached_verdict(work_dir):
+    """
+        Test checks with an unknown or a missing cache key are cache misses
+    """
+    cache = MlVToolCache(join(work_dir, 'cache'))
+    cache.set_consistency('known', False)
+    checks = [('known',), ('unknown',), (None,)]
+
+    assert count_cache_misses(cache, checks, lambda check: check[0]) == 2
+    assert get_checks_jobs(4, cache, checks, lambda check: check[0]) == 4
+    assert get_checks_jobs(4, cache, checks[:2], lambda check: check[0]) == 1
+    assert get_checks_jobs(4, None, checks[:2], lambda check: check[0]) == 4
+
+
+def test_should_default_to_a_cache_directory_per_working_directory_in_user_cache(work_dir, user_cache_dir):
+    """
+        Test default cache directories are outside of working directories, in the user cache directory
+    """
+    cache_dir = get_default_cache_dir(work_dir)
+    assert cache_dir.startswith(f'{user_cache_dir}/')
+    assert cache_dir == get_default_cache_dir(join(work_dir, '.'))
+    assert cache_dir != get_default_cache_dir(join(work_dir, 'other'))
@@ -146,3 +146,37 @@ def test_should_raise_if_invalid_script(conf, work_dir):
     with pytest.raises(MlVToolException) as e:
         compare(notebook_path, script_path, conf)
     assert isinstance(e.value.__cause__, SyntaxError)
+
+
+def test_should_report_first_difference_location(conf, work_dir, caplog):
+    """
+        Test the first difference is reported with its script line and its notebook cell
+    """
+    docstring = '"""\n:param str data: Some data\n"""'
+    cells = [('code', 'print(\'poney\')'),
+             ('comment', '# This is a comment'),
+             ('code', 'a = 1\nb = 2')]
+    notebook_path = gen_notebook(tmp_dir=work_dir, file_name='test.ipynb', docstring=docstring, cells=cells)
+    script_path = join(work_dir, 'script.py')
+    export_to_script(notebook_path, script_path, conf)
+    with open(script_path, 'r') as fd:
+        script_content = fd.read()
+    with open(script_path, 'w') as fd:
+        fd.write(script_content.replace('b = 2', 'b = 3'))
+    diff_line = script_content.split('\n').index('    b = 2') + 1
+
+    assert not compare(notebook_path, script_path, conf)
+    assert f'First difference at line {diff_line} of {script_path}' in caplog.text
+    assert '(notebook cell 4 of' in caplog.text
+
+
+def test_should_compare_generated_script_if_cells_can_not_be_compared_directly(conf, work_dir):
+    """
+        Test a notebook with an instruction split across cells is compared with its generated script
+    """
+    cells = [('code', 'print(0)'),
+             ('code', 'x = (1,'),
+             ('code', '2)')]
+    notebook_path, script_path = create_notebook_and_convert_it(cells, 'script.py', conf, work_dir)
+
+    assert compare(notebook_path, script_path, conf)
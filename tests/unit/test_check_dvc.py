@@ -0,0 +1,23 @@
+import pytest
+
+from mlvtools.check_dvc import get_first_line_difference, DvcCommandDifference
+
+
+@pytest.mark.parametrize('expected, actual', (('a\nb\n', 'a\nb'),
+                                              ('a  \nb', 'a\nb\n\n'),
+                                              ('pushd "/a/path"\nb', 'pushd "/another/path"\nb')))
+def test_should_find_no_difference(expected, actual):
+    """
+        Test trailing whitespaces and working directory path are ignored
+    """
+    assert get_first_line_difference(expected, actual) is None
+
+
+@pytest.mark.parametrize('expected, actual, difference', (('a\nb\nc', 'a\nd\nc', DvcCommandDifference(2, 'b', 'd')),
+                                                          ('a\nb', 'a', DvcCommandDifference(2, 'b', None)),
+                                                          ('a', 'a\nb', DvcCommandDifference(2, None, 'b'))))
+def test_should_find_first_line_difference(expected, actual, difference):
+    """
+        Test the first different line is returned, missing lines are None
+    """
+    assert get_first_line_difference(expected, actual) == difference
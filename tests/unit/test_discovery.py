@@ -0,0 +1,96 @@
+from os import makedirs
+from os.path import join, dirname
+
+import pytest
+
+from mlvtools.discovery import PathFilter, discover_files, discover_directories
+
+
+@pytest.mark.parametrize('pattern, path, is_dir, matches', (
+        ('hello.ipynb', 'hello.ipynb', False, True),
+        ('hello.ipynb', 'sub/dir/hello.ipynb', False, True),
+        ('/hello.ipynb', 'sub/hello.ipynb', False, False),
+        ('sub/*.ipynb', 'sub/hello.ipynb', False, True),
+        ('sub/*.ipynb', 'other/sub/hello.ipynb', False, False),
+        ('*.ipynb', 'sub/hello.ipynb', False, True),
+        ('**/data', 'a/b/data', True, True),
+        ('sub/**', 'sub/a/b.ipynb', False, True),
+        ('a/**/b.ipynb', 'a/b.ipynb', False, True),
+        ('a/**/b.ipynb', 'a/x/y/b.ipynb', False, True),
+        ('hel?o.ipynb', 'hello.ipynb', False, True),
+        ('[!h]ello.ipynb', 'hello.ipynb', False, False),
+        ('data/', 'data', False, False),
+        ('data/', 'data', True, True),
+))
+def test_should_match_gitignore_style_patterns(pattern, path, is_dir, matches):
+    """
+        Test gitignore style patterns: anchoring, wildcards and directory only patterns
+    """
+    path_filter = PathFilter(exclude=[pattern], use_default_exclude=False)
+    excluded = path_filter.is_excluded_dir(path) if is_dir else not path_filter.is_selected_file(path)
+    assert excluded == matches
+
+
+def test_should_apply_last_matching_pattern():
+    """
+        Test negated patterns re-include paths excluded by a previous pattern
+    """
+    path_filter = PathFilter(exclude=['*.ipynb', '!keep_*.ipynb'])
+
+    assert not path_filter.is_selected_file('drop.ipynb')
+    assert path_filter.is_selected_file('keep_me.ipynb')
+
+
+def test_should_select_paths_below_excluded_directories():
+    """
+        Test files in excluded directories are not selected, checkpoints are excluded by default
+    """
+    path_filter = PathFilter(include=['notebooks/**'], exclude=['data/'])
+
+    assert path_filter.is_selected('notebooks/sub/hello.ipynb')
+    assert not path_filter.is_selected('notebooks/.ipynb_checkpoints/hello-checkpoint.ipynb')
+    assert not path_filter.is_selected('notebooks/data/hello.ipynb')
+    assert not path_filter.is_selected('other/hello.ipynb')
+
+
+def test_should_discover_files_recursively_and_prune_excluded_directories(work_dir, mocker):
+    """
+        Test files are discovered in sub directories, excluded directories are not scanned
+    """
+    for path in ('a.ipynb', 'b.py', 'sub/c.ipynb', 'sub/deep/d.ipynb', '.ipynb_checkpoints/a-checkpoint.ipynb',
+                 'data/e.ipynb', 'sub/data/f.ipynb'):
+        makedirs(join(work_dir, dirname(path)), exist_ok=True)
+        with open(join(work_dir, path), 'w') as fd:
+            fd.write('')
+    path_filter = PathFilter(exclude=['data/'])
+    is_excluded_dir = mocker.spy(path_filter, 'is_excluded_dir')
+
+    files = discover_files(work_dir, '.ipynb', path_filter)
+
+    assert files == [join(work_dir, path) for path in ('a.ipynb', 'sub/c.ipynb', 'sub/deep/d.ipynb')]
+    assert sorted(call[0][0] for call in is_excluded_dir.call_args_list) == \
+        ['.ipynb_checkpoints', 'data', 'sub', 'sub/data', 'sub/deep']
+    assert discover_files(work_dir, '.ipynb', recursive=False) == [join(work_dir, 'a.ipynb')]
+
+
+def test_should_ignore_jupyter_temporary_files_by_default():
+    """
+        Test Jupyter temporary save files and checkpoints are never selected by default
+    """
+    path_filter = PathFilter()
+    assert not path_filter.is_selected('.~hello.ipynb')
+    assert not path_filter.is_selected('sub/.~hello.ipynb')
+    assert not path_filter.is_selected('.ipynb_checkpoints/hello-checkpoint.ipynb')
+    assert path_filter.is_selected('sub/hello.ipynb')
+
+
+def test_should_discover_directories_except_excluded_ones(work_dir):
+    """
+        Test the root directory and its sub directories are discovered, excluded directories are pruned
+    """
+    for directory in ('a/b', 'data/sub', '.ipynb_checkpoints'):
+        makedirs(join(work_dir, directory))
+
+    assert discover_directories(work_dir, PathFilter(exclude=['data/'])) == [work_dir, join(work_dir, 'a'),
+                                                                             join(work_dir, 'a', 'b')]
+    assert discover_directories(work_dir, recursive=False) == [work_dir]
@@ -0,0 +1,105 @@
+from os.path import join
+
+import pytest
+
+from mlvtools import check_script
+from mlvtools.check_script import compare
+from mlvtools.conf.conf import MlVToolConf
+from mlvtools.fingerprint import split_fingerprint, is_fingerprint_consistent
+from mlvtools.ipynb_to_python import export_to_script
+from tests.helpers.utils import gen_notebook
+
+CELLS = [('comment', '# A comment'), ('code', 'print(1)')]
+
+
+@pytest.fixture
+def conf(work_dir):
+    return MlVToolConf(top_directory=work_dir)
+
+
+@pytest.fixture
+def generated(work_dir, conf):
+    notebook_path = gen_notebook(cells=CELLS, tmp_dir=work_dir, file_name='nb.ipynb')
+    script_path = join(work_dir, 'nb.py')
+    export_to_script(notebook_path, script_path, conf)
+    return notebook_path, script_path
+
+
+def read(path: str) -> str:
+    with open(path, 'r') as fd:
+        return fd.read()
+
+
+def test_should_write_fingerprint_in_generated_script_header(generated):
+    """
+        Test the fingerprint line follows the generated from comment
+    """
+    _, script_path = generated
+    lines = read(script_path).split('\n')
+
+    assert lines[1].startswith('# Generated from')
+    assert lines[2].startswith('# mlvtools fingerprint: source=')
+    assert split_fingerprint(read(script_path))[0] == lines[2]
+
+
+def test_should_check_consistency_from_fingerprint_only(generated, conf, mocker):
+    """
+        Test a generated script is consistent without parsing
+    """
+    notebook_path, script_path = generated
+    compare_spy = mocker.spy(check_script, 'compare_notebook')
+    ast_spy = mocker.spy(check_script, 'get_ast')
+
+    assert compare(notebook_path, script_path, conf)
+    compare_spy.assert_not_called()
+    ast_spy.assert_not_called()
+
+
+def test_should_ignore_notebook_markdown_and_outputs(generated, conf, work_dir):
+    """
+        Test fingerprint still matches if only notebook markdown cells change
+    """
+    notebook_path, script_path = generated
+    gen_notebook(cells=[('comment', '# Another comment'), ('code', 'print(1)')], tmp_dir=work_dir,
+                 file_name='nb.ipynb')
+
+    assert is_fingerprint_consistent(read(notebook_path), read(script_path), 'nb', conf)
+
+
+@pytest.mark.parametrize('change', ('script', 'notebook', 'conf'))
+def test_should_fallback_on_comparison_if_fingerprint_does_not_match(generated, conf, work_dir, mocker, change):
+    """
+        Test fingerprint does not match if the script body, the notebook sources or the configuration
+        change, then the full comparison is used
+    """
+    notebook_path, script_path = generated
+    if change == 'script':
+        with open(script_path, 'a') as fd:
+            fd.write('\n# A new comment\n')
+    elif change == 'notebook':
+        gen_notebook(cells=[('comment', '# A comment'), ('code', 'print(2)')], tmp_dir=work_dir, file_name='nb.ipynb')
+    else:
+        conf = MlVToolConf(top_directory=work_dir, ignore_keys=['# Ignore'])
+
+    assert not is_fingerprint_consistent(read(notebook_path), read(script_path), 'nb', conf)
+    compare_spy = mocker.spy(check_script, 'compare_notebook')
+    assert compare(notebook_path, script_path, conf) == (change in ('script', 'conf'))
+    compare_spy.assert_called_once()
+
+
+def test_should_not_match_another_notebook_name(generated, conf):
+    """
+        Test fingerprint does not match a notebook with another name, the generated method name differs
+    """
+    notebook_path, script_path = generated
+
+    assert not is_fingerprint_consistent(read(notebook_path), read(script_path), 'other', conf)
+
+
+def test_should_not_have_fingerprint_without_generation(work_dir, conf):
+    """
+        Test a script without fingerprint is not consistent from fingerprint
+    """
+    notebook_path = gen_notebook(cells=CELLS, tmp_dir=work_dir, file_name='nb.ipynb')
+
+    assert not is_fingerprint_consistent(read(notebook_path), 'print(1)\n', 'nb', conf)
@@ -1,14 +1,18 @@
 import stat
-from os import stat as os_stat
+from os import stat as os_stat, utime
 from os.path import join, exists
 from tempfile import TemporaryDirectory
 
 import pytest
+import yaml
 from jinja2 import UndefinedError, TemplateSyntaxError
 
+from mlvtools import helper
 from mlvtools.exception import MlVToolException
+from mlvtools.gen_dvc import DVC_CMD_TEMPLATE_NAME
 from mlvtools.helper import extract_type, to_dvc_meta_filename, to_instructions_list, \
-    write_python_script, write_template, to_sanitized_path
+    write_python_script, write_template, to_sanitized_path, render_string_template, get_string_template, \
+    render_template, load_yaml_file
 from mlvtools.helper import to_cmd_param, to_method_name, to_bash_variable, to_script_name, to_dvc_cmd_name
 
 
@@ -127,6 +131,13 @@ def test_sanitize_should_not_change_path_starting_with_dot_slash():
     assert to_sanitized_path(path) == path
 
 
+def test_sanitize_should_not_change_stdio_path():
+    """
+        Test sanitize should not change the stdin/stdout path
+    """
+    assert to_sanitized_path('-') == '-'
+
+
 @pytest.fixture
 def valid_template_path(work_dir):
     template_data = 'a_value={{ given_data }}'
@@ -161,6 +172,21 @@ def test_should_create_directory_to_write_template(work_dir, valid_template_path
     assert exists(output_path)
 
 
+def test_should_render_user_template_named_as_a_bundled_template(work_dir, monkeypatch):
+    """
+        Test a user template path is not shadowed by a bundled template of the same name
+    """
+    monkeypatch.chdir(work_dir)
+    with open(join(work_dir, 'dvc-cmd.tpl'), 'w') as fd:
+        fd.write('user={{ given_data }}')
+
+    assert render_template('dvc-cmd.tpl', '-', given_data='test') == 'user=test'
+    assert render_template(join(work_dir, 'dvc-cmd.tpl'), '-', given_data='test') == 'user=test'
+    info = {'working_directory': work_dir, 'variables': [], 'meta_file_name_var_assign': 'META="a.dvc"',
+            'whole_command': 'echo bundled'}
+    assert 'echo bundled' in render_template(DVC_CMD_TEMPLATE_NAME, '-', info=info)
+
+
 def check_write_template_error_case(template_path: str, data: dict, exp_error: Exception):
     with TemporaryDirectory() as tmp_dir:
         output_path = join(tmp_dir, 'my_exe.sh')
@@ -270,3 +296,92 @@ def test_write_python_script_should_raise_if_python_syntax_error(work_dir):
     with pytest.raises(MlVToolException) as e:
         write_python_script(script_content, script_path)
     assert isinstance(e.value.__cause__, SyntaxError)
+
+
+def test_should_compile_string_template_once():
+    """
+        Test identical string templates are compiled once
+    """
+    get_string_template.cache_clear()
+    assert render_string_template('{{ value }}_compiled', value='a') == 'a_compiled'
+    assert render_string_template('{{ value }}_compiled', value='b') == 'b_compiled'
+    assert get_string_template.cache_info().misses == 1
+    assert get_string_template.cache_info().hits == 1
+
+
+def test_should_reload_template_file_when_modified(work_dir, valid_template_path):
+    """
+        Test a template file is compiled again when it is modified
+    """
+    assert render_template(valid_template_path, 'out', given_data='test') == 'a_value=test'
+    with open(valid_template_path, 'w') as fd:
+        fd.write('other_value={{ given_data }}')
+    utime(valid_template_path, (0, 0))
+
+    assert render_template(valid_template_path, 'out', given_data='test') == 'other_value=test'
+
+
+def test_should_render_bundled_template_by_name():
+    """
+        Test bundled templates are rendered from their name
+    """
+    content = render_template('pipeline-export.tpl', 'out', info={'work_dir': '.', 'cmds': []})
+    assert content.startswith('#!/bin/bash')
+
+
+def test_should_memoize_yaml_file_by_signature(work_dir, mocker):
+    """
+        Test a YAML file is parsed again only when it changes
+    """
+    mocker.patch('mlvtools.helper.RACY_DELAY', -10)
+    load = mocker.spy(helper.yaml, 'load')
+    yaml_path = join(work_dir, 'conf.yml')
+    with open(yaml_path, 'w') as fd:
+        fd.write('key: value\nitems: [1, 2]\n')
+
+    data = load_yaml_file(yaml_path)
+    assert data == {'key': 'value', 'items': [1, 2]}
+    assert load_yaml_file(yaml_path) is data
+    assert load.call_count == 1
+
+    with open(yaml_path, 'w') as fd:
+        fd.write('key: other\n')
+    utime(yaml_path, (0, 0))
+    assert load_yaml_file(yaml_path) == {'key': 'other'}
+    assert load.call_count == 2
+
+
+YAML_CORPUS = (
+    '',
+    'key: value\n',
+    'cmd: python script.py --rate 0.5\nwdir: ..\ndeps:\n- md5: 1a2b\n  path: data/in.csv\nouts:\n- cache: true\n'
+    '  metric: false\n  path: data/out.csv\n  persist: false\n',
+    'stages:\n  step:\n    cmd: ./step.py\n    outs:\n    - data/model:\n        persist: true\n',
+    'flags: [yes, No, on, OFF, true, ~, null]\nnumbers: [010, 0o10, 0x1F, 1_000, 1e3, .inf, -.Inf, 12:30:00]\n',
+    'date: 2020-06-30\ntime: 2020-06-30 12:00:00.5 +02:00\nversion: 1.10\n',
+    'base: &base {a: 1, b: [x, y]}\nchild:\n  <<: *base\n  b: z\n',
+    'text: |\n  line one\n  line two\nfolded: >-\n  folded\n  text\nquoted: "tab\\there \\u00e9"\n',
+    "single: 'it''s'\nunicode: caf\u00e9\nempty_map: {}\nempty_list: []\nkey with spaces: value # comment\n",
+    'key:\tvalue\n',
+    'a: 1\t# comment after a tab\n',
+    'items: [1,\t2]\n',
+    'a:\n\t- 1\n',
+    'key: [unclosed\n',
+)
+
+
+@pytest.mark.parametrize('content', YAML_CORPUS)
+def test_should_load_yaml_file_as_the_pure_python_loader(work_dir, content):
+    """
+        Test YAML files are loaded as the pure Python safe loader does, or rejected as it does
+    """
+    yaml_path = join(work_dir, 'file.yml')
+    with open(yaml_path, 'w') as fd:
+        fd.write(content)
+    try:
+        expected = yaml.load(content, Loader=yaml.SafeLoader)
+    except yaml.YAMLError:
+        with pytest.raises(yaml.YAMLError):
+            load_yaml_file(yaml_path)
+        return
+    assert load_yaml_file(yaml_path) == expected
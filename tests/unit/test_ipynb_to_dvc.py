@@ -0,0 +1,33 @@
+import ast
+
+import pytest
+
+from mlvtools.conf.conf import MlVToolConf
+from mlvtools.ipynb_to_dvc import get_generated_docstring
+from mlvtools.ipynb_to_python import get_converted_script
+from tests.helpers.utils import gen_notebook
+
+
+@pytest.mark.parametrize('docstring', (
+        '"""A summary\n:param str input_file: the input file\n"""\ninput_file = "in.csv"',
+        '"""\n    A summary\n      indented line\n\n    :dvc-out: ./data/out.csv\n"""\nprint("no param")',
+        '"""Escaped \\\\n and \\t"""\nprint("no param")'))
+def test_should_get_same_docstring_as_generated_script(work_dir, docstring):
+    """
+        Test the docstring obtained from conversion data is the one read back from the generated script
+    """
+    notebook_path = gen_notebook(cells=[('code', 'pass')], tmp_dir=work_dir, file_name='test.ipynb',
+                                 docstring=docstring)
+    conf = MlVToolConf(top_directory=work_dir)
+    script_root = ast.parse(get_converted_script(notebook_path, conf))
+    script_method = next(node for node in ast.walk(script_root) if isinstance(node, ast.FunctionDef))
+
+    wrapped_docstring = f'"""\n{ast.get_docstring(ast.parse(docstring))}\n"""'
+    assert get_generated_docstring(wrapped_docstring) == ast.get_docstring(script_method)
+
+
+def test_should_return_none_if_docstring_can_not_be_evaluated():
+    """
+        Test None is returned if the generated docstring is not a valid python string
+    """
+    assert get_generated_docstring('"""\nEnd of string """ in docstring\n"""') is None
@@ -0,0 +1,57 @@
+from os import makedirs
+from os.path import join, exists
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME
+from mlvtools.helper import to_script_name, to_dvc_cmd_name
+from mlvtools.jupyter_hook import find_conf_path, NotebookRegenerator, regenerate_notebook
+from tests.helpers.utils import write_conf, gen_notebook
+
+
+def test_should_find_conf_in_parent_directory(work_dir):
+    """
+        Test the closest configuration file is found from the notebook directory
+    """
+    conf_path = join(work_dir, DEFAULT_CONF_FILENAME)
+    write_conf(work_dir, conf_path)
+    notebook_dir = join(work_dir, 'notebooks', 'sub')
+    makedirs(notebook_dir)
+
+    assert find_conf_path(join(notebook_dir, 'notebook.ipynb')) == conf_path
+
+
+def test_should_not_find_conf(work_dir):
+    """
+        Test None is returned if there is no configuration file
+    """
+    assert find_conf_path(join(work_dir, 'notebook.ipynb')) is None
+
+
+def test_should_debounce_rapid_saves():
+    """
+        Test rapid saves of a notebook trigger only one regeneration
+    """
+    regenerated = []
+    regenerator = NotebookRegenerator(delay=0.1, regenerate=regenerated.append)
+    for _ in range(5):
+        regenerator.schedule('./notebook.ipynb')
+    regenerator.schedule('./other.ipynb')
+    regenerator.join()
+
+    assert sorted(regenerated) == ['./notebook.ipynb', './other.ipynb']
+
+
+def test_should_regenerate_script_and_dvc_command(work_dir):
+    """
+        Test notebook script and DVC command are generated using the project configuration
+    """
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    notebook_dir = join(work_dir, 'notebooks')
+    makedirs(notebook_dir)
+    notebook_path = gen_notebook(cells=[('code', 'print("hello")')], tmp_dir=notebook_dir,
+                                 file_name='notebook.ipynb')
+
+    regenerate_notebook(notebook_path)
+
+    script_name = to_script_name('notebook.ipynb')
+    assert exists(join(work_dir, 'scripts', script_name))
+    assert exists(join(work_dir, 'dvc', to_dvc_cmd_name(script_name)))
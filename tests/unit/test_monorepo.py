@@ -0,0 +1,41 @@
+from os import makedirs
+from os.path import join, relpath
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME
+from mlvtools.monorepo import discover_projects, get_notebooks
+from tests.helpers.utils import write_conf, gen_notebook
+
+
+def test_should_discover_projects_and_exclude_nested_notebooks(work_dir):
+    """
+        Test projects are discovered from their configuration file and nested projects notebooks are excluded
+    """
+    for project_dir in (work_dir, join(work_dir, 'sub'), join(work_dir, '.mlvtools_cache', 'ignored')):
+        makedirs(project_dir, exist_ok=True)
+        write_conf(project_dir, join(project_dir, DEFAULT_CONF_FILENAME))
+        gen_notebook(cells=[('code', 'pass')], tmp_dir=project_dir, file_name='nb.ipynb')
+
+    projects = discover_projects(work_dir)
+
+    assert [project.directory for project in projects] == [work_dir, join(work_dir, 'sub')]
+    assert projects[0].sub_projects == ['sub']
+    assert projects[0].conf.top_directory == work_dir
+    assert projects[1].conf.top_directory == join(work_dir, 'sub')
+    assert get_notebooks(projects[0], '.', [], [], recursive=True) == [join(work_dir, 'nb.ipynb')]
+    assert get_notebooks(projects[1], '.', [], [], recursive=True) == [join(work_dir, 'sub', 'nb.ipynb')]
+
+
+def test_should_discover_projects_except_hidden_and_ignored_directories(work_dir):
+    """
+        Test hidden directories are never scanned and projects are selected with ignore and include patterns
+    """
+    for project_dir in ('apps/first', 'apps/second', 'data/project', '.venv/project'):
+        makedirs(join(work_dir, project_dir))
+        write_conf(join(work_dir, project_dir), join(work_dir, project_dir, DEFAULT_CONF_FILENAME))
+
+    def discover(include=None, ignore=None):
+        return [relpath(project.directory, work_dir) for project in discover_projects(work_dir, include, ignore)]
+
+    assert discover() == ['apps/first', 'apps/second', 'data/project']
+    assert discover(ignore=['data/']) == ['apps/first', 'apps/second']
+    assert discover(include=['apps/**'], ignore=['second/']) == ['apps/first']
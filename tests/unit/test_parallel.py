@@ -0,0 +1,57 @@
+import logging
+
+import pytest
+
+from mlvtools.exception import MlVToolException
+from mlvtools.parallel import parallel_map
+
+
+def square_and_log(value: int) -> int:
+    logging.info(f'Square {value}')
+    return value * value
+
+
+WARMED_UP = []
+
+
+def warm_up():
+    WARMED_UP.append(True)
+
+
+def count_warm_ups(value: int) -> int:
+    return len(WARMED_UP)
+
+
+def fail_on_two(value: int) -> int:
+    logging.info(f'Process {value}')
+    if value == 2:
+        raise MlVToolException('Cannot process 2')
+    return value
+
+
+@pytest.mark.parametrize('jobs', (1, 3))
+def test_should_map_in_order_with_ordered_logs(caplog, jobs):
+    """
+        Test results and worker logs are in items order
+    """
+    caplog.set_level(logging.INFO)
+    assert parallel_map(square_and_log, range(6), jobs) == [0, 1, 4, 9, 16, 25]
+    assert [record.getMessage() for record in caplog.records] == [f'Square {i}' for i in range(6)]
+
+
+def test_should_raise_worker_exception_after_previous_logs(caplog):
+    """
+        Test a worker exception is raised in the main process once previous logs are replayed
+    """
+    caplog.set_level(logging.INFO)
+    with pytest.raises(MlVToolException):
+        parallel_map(fail_on_two, range(4), 2)
+    assert [record.getMessage() for record in caplog.records] == ['Process 0', 'Process 1', 'Process 2']
+
+
+def test_should_warm_up_each_worker_once():
+    """
+        Test workers are warmed up once, before their first task
+    """
+    assert parallel_map(count_warm_ups, range(4), 1, warm_up=warm_up) == [0, 0, 0, 0]
+    assert parallel_map(count_warm_ups, range(4), 2, warm_up=warm_up) == [1, 1, 1, 1]
@@ -0,0 +1,85 @@
+import json
+import xml.etree.ElementTree as ET
+from os.path import join
+
+import pytest
+
+from mlvtools.exception import MlVToolException
+from mlvtools.report import CheckResult, write_report, get_junit_report, timed, JSON_FORMAT
+
+RESULTS = [CheckResult('notebooks/hello.ipynb', 'scripts/hello.py', True, 0.5, 'direct', None,
+                       {'read': 0.1, 'compare': 0.2}, {'notebook': 1200, 'script': 300}),
+           CheckResult('notebooks/bye.ipynb', 'scripts/bye.py', False, 0.25, 'generated',
+                       {'script_line': 4, 'notebook_cell': 2, 'reason': 'different value'},
+                       {'conversion': 0.2}, {'notebook': 1000, 'script': 250}),
+           CheckResult('notebooks/hi.ipynb', 'scripts/hi.py', False, 0.01,
+                       error='Script scripts/hi.py does not exist')]
+
+
+def test_should_accumulate_phase_timings():
+    """
+        Test timed blocks add their duration to the phase timing and ignore missing stats
+    """
+    stats = {}
+    with timed(stats, 'parse'):
+        pass
+    first_duration = stats['timings']['parse']
+    with timed(stats, 'parse'):
+        pass
+    with timed(None, 'parse'):
+        pass
+
+    assert stats['timings']['parse'] >= first_duration > 0
+
+
+def test_should_write_json_report(work_dir):
+    """
+        Test the JSON report contains the global verdict and each check details
+    """
+    report_path = join(work_dir, 'report.json')
+    write_report(JSON_FORMAT, report_path, RESULTS, '1/2')
+
+    with open(report_path, 'r') as fd:
+        report = json.load(fd)
+    assert report['shard'] == '1/2'
+    assert not report['equals']
+    assert report['checks'][1]['location'] == {'script_line': 4, 'notebook_cell': 2, 'reason': 'different value'}
+    assert report['checks'][0]['timings'] == {'read': 0.1, 'compare': 0.2}
+    assert report['checks'][0]['sizes'] == {'notebook': 1200, 'script': 300}
+
+
+def test_should_get_junit_report_with_failures_and_errors():
+    """
+        Test each check is a test case, inconsistent scripts are failures and checks not run are errors
+    """
+    suite = get_junit_report(RESULTS).getroot()
+
+    assert suite.get('tests') == '3'
+    assert suite.get('failures') == '1'
+    assert suite.get('errors') == '1'
+    hello, bye, hi = suite.findall('testcase')
+    assert hello.find('failure') is None and hello.find('error') is None
+    properties = {prop.get('name'): prop.get('value') for prop in hello.iter('property')}
+    assert properties == {'method': 'direct', 'read_time': '0.100000', 'compare_time': '0.200000',
+                          'notebook_size': '1200', 'script_size': '300'}
+    assert 'at line 4' in bye.find('failure').get('message')
+    assert json.loads(bye.find('failure').text)['notebook_cell'] == 2
+    assert hi.find('error').get('message') == 'Script scripts/hi.py does not exist'
+
+
+def test_should_write_junit_report(work_dir):
+    """
+        Test the JUnit report is written as XML
+    """
+    report_path = join(work_dir, 'report.xml')
+    write_report('junit', report_path, RESULTS)
+
+    assert ET.parse(report_path).getroot().tag == 'testsuite'
+
+
+def test_should_raise_if_unknown_report_format(work_dir):
+    """
+        Test an unknown report format is rejected
+    """
+    with pytest.raises(MlVToolException):
+        write_report('html', join(work_dir, 'report.html'), RESULTS)
@@ -34,6 +34,9 @@ def test_should_get_dvc_param_from_docstring():
         'variables': [f'MLV_PY_CMD_PATH="{python_cmd_path}"', f'MLV_PY_CMD_NAME="{basename(python_cmd_path)}"',
                       'PARAM3="path/to/in/file"', 'PARAM_ONE="path/to/other"',
                       'PARAM_TWO="path/to/other-persist"'],
+        'values': {'MLV_PY_CMD_PATH': python_cmd_path, 'MLV_PY_CMD_NAME': basename(python_cmd_path),
+                   'PARAM3': 'path/to/in/file', 'PARAM_ONE': 'path/to/other', 'PARAM_TWO': 'path/to/other-persist',
+                   'MLV_META': 'some/path/Pipeline1.dvc'},
         'dvc_inputs': ['$PARAM3', 'path/to/other/infile.test'],
         'dvc_outputs': ['path/to/file.txt', '$PARAM_ONE'],
         'dvc_outputs_persist': ['path/to/file-persist.txt', '$PARAM_TWO'],
@@ -48,6 +51,7 @@ def test_should_get_dvc_param_from_docstring():
     assert expected_info.keys() == info.keys()
 
     assert sorted(expected_info['variables']) == sorted(info['variables'])
+    assert expected_info['values'] == info['values']
     assert expected_info['meta_file_name_var'] == info['meta_file_name_var']
     assert expected_info['meta_file_name_var_assign'] == info['meta_file_name_var_assign']
     assert sorted(expected_info['dvc_inputs']) == sorted(info['dvc_inputs'])
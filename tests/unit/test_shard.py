@@ -0,0 +1,95 @@
+import argparse
+import json
+from os.path import join
+
+import pytest
+
+from mlvtools.exception import MlVToolException
+from mlvtools.shard import parse_shard, Shard, select_shard, merge_reports, MergeConsistencyReports
+
+NOTEBOOKS = [f'/project/notebooks/notebook_{i}.ipynb' for i in range(20)]
+
+
+@pytest.mark.parametrize('value', ('0/2', '3/2', '1', 'a/b', '1/0'))
+def test_should_raise_if_invalid_shard(value):
+    """
+        Test invalid shards are rejected
+    """
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+@pytest.mark.parametrize('timings', (None, {f'notebooks/notebook_{i}.ipynb': i for i in range(15)}))
+def test_should_assign_each_notebook_to_exactly_one_shard(timings):
+    """
+        Test shards are disjoint, cover all notebooks and keep the notebooks order
+    """
+    shards = [select_shard(NOTEBOOKS, Shard(index, 3), '/project', timings) for index in (1, 2, 3)]
+
+    assert sorted(notebook for shard in shards for notebook in shard) == sorted(NOTEBOOKS)
+    for shard in shards:
+        assert shard == [notebook for notebook in NOTEBOOKS if notebook in shard]
+
+
+def test_should_assign_notebooks_by_relative_path():
+    """
+        Test assignment does not depend on the project location
+    """
+    moved = [notebook.replace('/project', '/other/location') for notebook in NOTEBOOKS]
+
+    assert [notebook.replace('/project', '/other/location')
+            for notebook in select_shard(NOTEBOOKS, Shard(2, 3), '/project')] == \
+        select_shard(moved, Shard(2, 3), '/other/location')
+
+
+def test_should_balance_shards_using_timings():
+    """
+        Test shards durations are balanced using timings
+    """
+    timings = {'notebooks/notebook_0.ipynb': 10., 'notebooks/notebook_1.ipynb': 6., 'notebooks/notebook_2.ipynb': 4.}
+    notebooks = NOTEBOOKS[:3]
+
+    assert select_shard(notebooks, Shard(1, 2), '/project', timings) == [NOTEBOOKS[0]]
+    assert select_shard(notebooks, Shard(2, 2), '/project', timings) == NOTEBOOKS[1:3]
+
+
+def get_report(shard: str, equals: bool, notebook: str) -> dict:
+    return {'shard': shard, 'equals': equals,
+            'checks': [{'notebook': notebook, 'script': 'script.py', 'equals': equals, 'duration': 1.5}]}
+
+
+def test_should_merge_reports():
+    """
+        Test merged report holds all checks and the global verdict
+    """
+    report = merge_reports([get_report('2/2', False, 'b.ipynb'), get_report('1/2', True, 'a.ipynb')])
+
+    assert not report['equals']
+    assert [check['notebook'] for check in report['checks']] == ['a.ipynb', 'b.ipynb']
+
+
+@pytest.mark.parametrize('shards', (('1/3', '2/3'), ('1/2', '1/2'), ('1/2', '2/3')))
+def test_should_raise_if_shard_is_missing(shards):
+    """
+        Test merge fails if a shard is missing, duplicated or from another shard count
+    """
+    with pytest.raises(MlVToolException):
+        merge_reports([get_report(shard, True, 'a.ipynb') for shard in shards])
+
+
+def test_should_merge_reports_and_write_timings(work_dir):
+    """
+        Test merge command exit code and timings output
+    """
+    report_paths = []
+    for shard, notebook in (('1/2', 'a.ipynb'), ('2/2', 'b.ipynb')):
+        report_paths.append(join(work_dir, f'report_{shard[0]}.json'))
+        with open(report_paths[-1], 'w') as fd:
+            json.dump(get_report(shard, True, notebook), fd)
+    timings_path = join(work_dir, 'timings.json')
+
+    with pytest.raises(SystemExit) as e:
+        MergeConsistencyReports().run(*report_paths, '--timings-output', timings_path)
+    assert e.value.code == 0
+    with open(timings_path, 'r') as fd:
+        assert json.load(fd) == {'a.ipynb': 1.5, 'b.ipynb': 1.5}
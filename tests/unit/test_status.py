@@ -0,0 +1,115 @@
+from os import makedirs, remove
+from os.path import join
+
+import pytest
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME, load_conf_or_default, get_script_output_path, \
+    get_dvc_cmd_output_path
+from mlvtools.ipynb_to_dvc import export_to_script_and_dvc
+from mlvtools.status import ProjectStatus, ArtifactIndex, UP_TO_DATE, MISSING, STALE, ORPHANED, SCRIPT, \
+    DVC_COMMAND, DVC_META
+from tests.helpers.utils import write_conf, gen_notebook
+
+
+@pytest.fixture
+def project(work_dir, mocker):
+    # Files written by the test must be trusted from their stat
+    mocker.patch('mlvtools.status.RACY_DELAY', -10)
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    notebook_dir = join(work_dir, 'notebooks')
+    makedirs(notebook_dir)
+    conf = load_conf_or_default(join(work_dir, DEFAULT_CONF_FILENAME), work_dir)
+    notebooks = []
+    for name in ('hello', 'bye'):
+        notebook = gen_notebook(cells=[('code', f'print("{name}")')], tmp_dir=notebook_dir,
+                                file_name=f'{name}.ipynb')
+        script = get_script_output_path(notebook, conf)
+        export_to_script_and_dvc(notebook, script, get_dvc_cmd_output_path(script, conf), conf)
+        notebooks.append(notebook)
+    return conf, notebooks, join(work_dir, 'index.json')
+
+
+def get_states(conf, notebooks, index_path):
+    statuses = ProjectStatus(conf, ArtifactIndex(index_path, conf)).get_status(notebooks)
+    return {(status.kind, status.path): status.state for status in statuses}
+
+
+def test_should_report_missing_stale_and_orphaned_artifacts(project, work_dir):
+    """
+        Test artifacts status of generated, modified, removed and orphaned artifacts
+    """
+    conf, notebooks, index_path = project
+    assert get_states(conf, notebooks, index_path) == {
+        (SCRIPT, 'scripts/mlvtools_hello.py'): UP_TO_DATE,
+        (DVC_COMMAND, 'dvc/mlvtools_hello_dvc'): UP_TO_DATE,
+        (DVC_META, 'mlvtools_hello.dvc'): MISSING,
+        (SCRIPT, 'scripts/mlvtools_bye.py'): UP_TO_DATE,
+        (DVC_COMMAND, 'dvc/mlvtools_bye_dvc'): UP_TO_DATE,
+        (DVC_META, 'mlvtools_bye.dvc'): MISSING}
+
+    gen_notebook(cells=[('code', 'print("hello world")')], tmp_dir=join(work_dir, 'notebooks'),
+                 file_name='hello.ipynb')
+    remove(join(work_dir, 'dvc', 'mlvtools_bye_dvc'))
+    with open(join(work_dir, 'mlvtools_bye.dvc'), 'w') as fd:
+        fd.write('cmd: ./dvc/mlvtools_bye_dvc')
+    states = get_states(conf, notebooks[1:], index_path)
+
+    assert states[(SCRIPT, 'scripts/mlvtools_bye.py')] == UP_TO_DATE
+    assert states[(DVC_COMMAND, 'dvc/mlvtools_bye_dvc')] == MISSING
+    assert states[(DVC_META, 'mlvtools_bye.dvc')] == UP_TO_DATE
+    assert states[(SCRIPT, 'scripts/mlvtools_hello.py')] == ORPHANED
+    assert states[(DVC_COMMAND, 'dvc/mlvtools_hello_dvc')] == ORPHANED
+
+    states = get_states(conf, notebooks, index_path)
+    assert states[(SCRIPT, 'scripts/mlvtools_hello.py')] == STALE
+    assert states[(DVC_COMMAND, 'dvc/mlvtools_hello_dvc')] == UP_TO_DATE
+
+
+def test_should_only_use_stat_for_unchanged_artifacts(project, mocker):
+    """
+        Test unchanged artifacts are neither read nor compared once indexed
+    """
+    conf, notebooks, index_path = project
+    get_states(conf, notebooks, index_path)
+
+    compare_mock = mocker.patch('mlvtools.status.compare')
+    hash_mock = mocker.patch('mlvtools.status.get_file_hash')
+    assert set(get_states(conf, notebooks, index_path).values()) == {UP_TO_DATE, MISSING}
+    compare_mock.assert_not_called()
+    hash_mock.assert_not_called()
+
+
+def test_should_reuse_states_if_content_is_unchanged(project, mocker):
+    """
+        Test a touched artifact is hashed but not compared again
+    """
+    conf, notebooks, index_path = project
+    get_states(conf, notebooks, index_path)
+    with open(notebooks[0], 'r') as fd:
+        content = fd.read()
+    with open(notebooks[0], 'w') as fd:
+        fd.write(content + '\n')
+
+    compare_mock = mocker.patch('mlvtools.status.compare')
+    assert get_states(conf, notebooks, index_path)[(SCRIPT, 'scripts/mlvtools_hello.py')] == UP_TO_DATE
+    compare_mock.assert_not_called()
+
+
+def test_should_use_dvc_meta_file_path_of_the_script_docstring(project, work_dir):
+    """
+        Test the DVC meta file path overridden in the notebook docstring is the one checked
+    """
+    conf, notebooks, index_path = project
+    notebook = gen_notebook(cells=[('code', 'print("hello")')], tmp_dir=join(work_dir, 'notebooks'),
+                            file_name='hello.ipynb',
+                            docstring='"""\n:dvc-meta-file: custom.dvc\n:dvc-cmd: echo hello\n"""')
+    script = get_script_output_path(notebook, conf)
+    export_to_script_and_dvc(notebook, script, get_dvc_cmd_output_path(script, conf), conf)
+
+    states = get_states(conf, notebooks, index_path)
+    assert states[(DVC_META, 'custom.dvc')] == MISSING
+    assert (DVC_META, 'mlvtools_hello.dvc') not in states
+
+    with open(join(work_dir, 'custom.dvc'), 'w') as fd:
+        fd.write('cmd: echo hello')
+    assert get_states(conf, notebooks, index_path)[(DVC_META, 'custom.dvc')] == UP_TO_DATE
@@ -0,0 +1,113 @@
+from os import makedirs
+from os.path import join
+
+import pytest
+
+from mlvtools.conf.conf import DEFAULT_CONF_FILENAME, load_conf_or_default
+from mlvtools.discovery import PathFilter
+from mlvtools.exception import MlVToolException
+from mlvtools.watch import PollingObserver, InotifyObserver, ProjectWatcher, CONSISTENT, REGENERATED, \
+    INCONSISTENT, MISSING_SCRIPT
+from tests.helpers.utils import write_conf, gen_notebook
+
+
+def write_file(path: str, content: str):
+    with open(path, 'w') as fd:
+        fd.write(content)
+
+
+def test_polling_observer_should_detect_changes(work_dir):
+    """
+        Test polling observer detects created, modified and removed files
+    """
+    write_file(join(work_dir, 'modified.txt'), 'a')
+    observer = PollingObserver([work_dir], poll_interval=0.01)
+    assert observer.wait_changes(0.05) == set()
+
+    write_file(join(work_dir, 'modified.txt'), 'ab')
+    write_file(join(work_dir, 'created.txt'), 'a')
+    assert observer.wait_changes(0.05) == {join(work_dir, 'modified.txt'), join(work_dir, 'created.txt')}
+
+
+def test_inotify_observer_should_detect_changes(work_dir):
+    """
+        Test inotify observer detects written files
+    """
+    try:
+        observer = InotifyObserver([work_dir])
+    except MlVToolException:
+        pytest.skip('inotify is not available')
+    try:
+        assert observer.wait_changes(0.01) == set()
+        write_file(join(work_dir, 'created.txt'), 'a')
+        assert observer.wait_changes(1) == {join(work_dir, 'created.txt')}
+    finally:
+        observer.close()
+
+
+@pytest.fixture
+def watcher(work_dir):
+    write_conf(work_dir, join(work_dir, DEFAULT_CONF_FILENAME), script_dir='scripts', dvc_cmd_dir='dvc')
+    notebook_dir = join(work_dir, 'notebooks')
+    makedirs(notebook_dir)
+    gen_notebook(cells=[('code', 'print("hello")')], tmp_dir=notebook_dir, file_name='hello.ipynb')
+    gen_notebook(cells=[('code', 'print("bye")')], tmp_dir=notebook_dir, file_name='bye.ipynb')
+    conf = load_conf_or_default(join(work_dir, DEFAULT_CONF_FILENAME), work_dir)
+    return ProjectWatcher(notebook_dir, conf)
+
+
+def test_should_regenerate_changed_notebooks_only(watcher, work_dir):
+    """
+        Test only changed notebooks are regenerated, own script writes are ignored
+    """
+    watcher.check_all()
+    assert list(watcher.status.values()) == [MISSING_SCRIPT, MISSING_SCRIPT]
+
+    hello_notebook = join(watcher.notebooks_dir, 'hello.ipynb')
+    watcher.process_changes({hello_notebook})
+    assert watcher.status[hello_notebook] == REGENERATED
+    assert watcher.status[join(watcher.notebooks_dir, 'bye.ipynb')] == MISSING_SCRIPT
+
+    # Generated script change event must not trigger a check
+    watcher.process_changes({join(work_dir, 'scripts', 'mlvtools_hello.py')})
+    assert watcher.status[hello_notebook] == REGENERATED
+
+
+def test_should_check_changed_scripts(watcher, work_dir):
+    """
+        Test a changed script is checked against its notebook
+    """
+    hello_notebook = join(watcher.notebooks_dir, 'hello.ipynb')
+    watcher.process_changes({hello_notebook})
+    script_path = join(work_dir, 'scripts', 'mlvtools_hello.py')
+
+    with open(script_path, 'a') as fd:
+        fd.write('\n# A comment\n')
+    watcher.process_changes({script_path})
+    assert watcher.status[hello_notebook] == CONSISTENT
+
+    with open(script_path, 'a') as fd:
+        fd.write('\nprint("other")\n')
+    watcher.process_changes({script_path})
+    assert watcher.status[hello_notebook] == INCONSISTENT
+
+
+def test_should_only_process_discovered_notebooks(watcher, work_dir):
+    """
+        Test Jupyter temporary files, checkpoints, ignored and nested notebooks are not processed unless discovered
+    """
+    makedirs(join(watcher.notebooks_dir, 'nested'))
+    ignored = [gen_notebook(cells=[('code', 'pass')], tmp_dir=watcher.notebooks_dir, file_name='.~hello.ipynb'),
+               join(watcher.notebooks_dir, '.ipynb_checkpoints', 'hello-checkpoint.ipynb'),
+               gen_notebook(cells=[('code', 'pass')], tmp_dir=join(watcher.notebooks_dir, 'nested'),
+                            file_name='nested.ipynb')]
+    assert not watcher.process_changes(set(ignored))
+    assert not watcher.status
+
+    recursive_watcher = ProjectWatcher(watcher.notebooks_dir, watcher.conf, path_filter=PathFilter(exclude=['bye*']),
+                                       recursive=True)
+    assert recursive_watcher.get_watched_directories() == [watcher.notebooks_dir,
+                                                           join(watcher.notebooks_dir, 'nested'),
+                                                           join(work_dir, 'scripts')]
+    assert recursive_watcher.process_changes({ignored[2], join(watcher.notebooks_dir, 'bye.ipynb')})
+    assert list(recursive_watcher.status) == [ignored[2]]